@@ -0,0 +1,101 @@
+"""
+Component.render() micro-benchmark
+
+Renders 100k components shaped like the built-in widgets (a tag, a class and
+style shared by widgets of one type, an onclick handler and per-component
+content) with the current Component and with the previous implementation,
+which translated and escaped every attribute on every render.
+
+Usage:
+    python benchmarks/bench_component_render.py
+"""
+
+import html
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from violit.component import Component
+
+N = 100_000
+
+
+class DictComponent:
+    """Previous implementation: plain class, attributes rendered from scratch."""
+    def __init__(self, tag, id, escape_content=False, **props):
+        self.tag = tag
+        self.id = id
+        self.escape_content = escape_content
+        self.props = props
+
+    def render(self):
+        if self.tag is None:
+            content = str(self.props.get('content', ''))
+            return html.escape(content) if self.escape_content else content
+        attrs = []
+        for k, v in self.props.items():
+            if k == 'content': continue
+            clean_k = k.replace('_', '-') if not k.startswith('on') else k
+            if clean_k.startswith('on'):
+                attrs.append(f'{clean_k}="{v}"')
+            else:
+                if v is True: attrs.append(clean_k)
+                elif v is False or v is None: continue
+                else:
+                    if clean_k == 'style':
+                        attrs.append(f'{clean_k}="{v}"')
+                    else:
+                        escaped_v = html.escape(str(v), quote=True)
+                        attrs.append(f'{clean_k}="{escaped_v}"')
+        props_str = " ".join(attrs)
+        content = self.props.get('content', '')
+        if self.escape_content:
+            content = html.escape(str(content))
+        return f"<{self.tag} id=\"{self.id}\" {props_str}>{content}</{self.tag}>"
+
+
+WIDGETS = [
+    ("p", {"class_": "text-medium", "style": None}),
+    ("div", {"class_": "card", "style": "padding: 1rem;"}),
+    ("sl-button", {"variant": "primary", "size": "medium", "class_": None}),
+    ("sl-input", {"label": "Name", "clearable": True, "disabled": False}),
+]
+
+
+def build(cls):
+    comps = []
+    for i in range(N):
+        tag, attrs = WIDGETS[i % len(WIDGETS)]
+        comps.append(cls(tag, f"w_{i}", content=f"item {i}",
+                         onclick=f"window.sendAction('w_{i}')", **attrs))
+    return comps
+
+
+def bench(cls):
+    tracemalloc.start()
+    comps = build(cls)
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    out = [c.render() for c in comps]
+    elapsed = time.perf_counter() - start
+    return elapsed, mem, out
+
+
+def main():
+    old_t, old_mem, old_out = bench(DictComponent)
+    new_t, new_mem, new_out = bench(Component)
+    assert old_out == new_out, "renderers disagree"
+    print(f"{N:,} components")
+    print(f"{'':>10} | {'render (ms)':>12} | {'objects (MB)':>13}")
+    print("-" * 42)
+    print(f"{'previous':>10} | {old_t * 1e3:>12.1f} | {old_mem / 2**20:>13.1f}")
+    print(f"{'current':>10} | {new_t * 1e3:>12.1f} | {new_mem / 2**20:>13.1f}")
+    print(f"speedup: {old_t / new_t:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+DependencyTracker micro-benchmark
+
+Measures the cost of unregister_component() (called for every dirty component
+on every re-render) as the number of states in a session grows. Each component
+reads a fixed number of states, so with the reverse index the cost should stay
+flat while the full-scan baseline grows linearly with the session size.
+
+Usage:
+    python benchmarks/bench_dependency_tracker.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from violit.state import DependencyTracker
+
+DEPS_PER_COMPONENT = 3
+SESSION_SIZES = [100, 1_000, 10_000, 50_000]
+ROUNDS = 2_000
+
+
+def build_tracker(n_states: int) -> DependencyTracker:
+    tracker = DependencyTracker()
+    for i in range(n_states):
+        for d in range(DEPS_PER_COMPONENT):
+            tracker.register_dependency(f"state_{(i + d) % n_states}", f"text_{i}")
+    return tracker
+
+
+def full_scan_unregister(tracker: DependencyTracker, component_id: str):
+    """Previous implementation: visit every state's subscriber set."""
+    empty_keys = []
+    for state_name, cids in tracker.subscribers.items():
+        cids.discard(component_id)
+        if not cids:
+            empty_keys.append(state_name)
+    for k in empty_keys:
+        del tracker.subscribers[k]
+
+
+def bench(n_states: int, unregister) -> float:
+    tracker = build_tracker(n_states)
+    cids = [f"text_{i % n_states}" for i in range(ROUNDS)]
+    start = time.perf_counter()
+    for i, cid in enumerate(cids):
+        unregister(tracker, cid)
+        # Re-register like a builder() re-run would
+        for d in range(DEPS_PER_COMPONENT):
+            tracker.register_dependency(f"state_{(i + d) % n_states}", cid)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def main():
+    print(f"{'states':>8} | {'indexed (us/op)':>16} | {'full scan (us/op)':>18} | {'speedup':>8}")
+    print("-" * 60)
+    for n in SESSION_SIZES:
+        indexed = bench(n, DependencyTracker.unregister_component)
+        scan = bench(n, full_scan_unregister)
+        print(f"{n:>8} | {indexed:>16.2f} | {scan:>18.2f} | {scan / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Parallel dirty rendering benchmark
+
+One state fans out to 40 components; a click re-renders all of them. Compares
+the update latency with App(render_workers=0) (builders run one after another)
+against a render pool, for two kinds of builders that release the GIL:
+
+    numpy   sorts a 200k-element array (scales with the number of CPU cores)
+    io      blocks 10 ms, like a database or HTTP call made while rendering
+
+Usage:
+    python benchmarks/bench_parallel_render.py
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+from starlette.testclient import TestClient
+
+import violit as vl
+
+COMPONENTS = 40
+WORKERS = [0, 4, 8, 16]
+CLICKS = 5
+
+
+def numpy_builder(i, n):
+    data = np.random.default_rng(i).random(200_000)
+
+    def content():
+        return f"chart {i}: {np.sort(data * n.value)[-1]:.3f}"
+    return content
+
+
+def io_builder(i, n):
+    def content():
+        time.sleep(0.01)
+        return f"row {i}: {n.value}"
+    return content
+
+
+def bench(make_builder, workers: int) -> float:
+    app = vl.App(mode="ws", render_workers=workers)
+    n = app.state(1)
+    for i in range(COMPONENTS):
+        app.text(make_builder(i, n))
+    app.button("inc", on_click=lambda: n.set(n.value + 1))
+
+    client = TestClient(app.fastapi)
+    html = client.get("/").text
+    token = re.search(r'window._csrf_token = "([^"]+)"', html)
+    token = token.group(1) if token else None
+    button = re.findall(r"sendAction\('(btn_\d+)'\)", html)[0]
+    with client.websocket_connect("/ws") as ws:
+        start = time.perf_counter()
+        for _ in range(CLICKS):
+            ws.send_json({"type": "click", "id": button, "value": None, "_csrf_token": token})
+            message = ws.receive_json()
+            assert len(message["payload"]) == COMPONENTS
+        return (time.perf_counter() - start) / CLICKS * 1000
+
+
+def main():
+    print(f"{COMPONENTS} dirty components per click, {os.cpu_count()} CPU(s)\n")
+    print(f"{'builder':>8} | {'workers':>7} | {'ms/update':>9} | {'speedup':>8}")
+    print("-" * 42)
+    for name, make_builder in (("numpy", numpy_builder), ("io", io_builder)):
+        serial = None
+        for workers in WORKERS:
+            ms = bench(make_builder, workers)
+            serial = serial or ms
+            print(f"{name:>8} | {workers:>7} | {ms:>9.1f} | {serial / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
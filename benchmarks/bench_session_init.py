@@ -0,0 +1,69 @@
+"""
+New-session cost benchmark
+
+Builds apps of growing size (static text components, each reading one of 20
+states) and opens new sessions against them after a first visitor warmed
+the shared initial renders. Reports, per new session, the page-load time and
+the memory retained by its session store (tracemalloc), with session stores
+as copy-on-write overlays (current) and with the dependencies of every
+static component registered in each session's tracker (previous
+behaviour, emulated by leaving the shared base tracker empty).
+
+Usage:
+    python benchmarks/bench_session_init.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from starlette.testclient import TestClient
+
+import violit as vl
+from violit.state import GLOBAL_STORE
+
+SIZES = [100, 500, 2000]
+SESSIONS = 20
+
+
+def build(components: int):
+    app = vl.App(mode="ws")
+    states = [app.state(i) for i in range(20)]
+    for i in range(components):
+        app.text(lambda s=states[i % 20], i=i: f"item {i}: {s.value}")
+    return app
+
+
+def bench(components: int, copy_on_write: bool):
+    app = build(components)
+    if not copy_on_write:
+        app._shared_tracker.share = lambda cid, state_names: None
+    TestClient(app.fastapi).get("/")  # warm the shared renders
+    clients = [TestClient(app.fastapi) for _ in range(SESSIONS)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for client in clients:
+        client.get("/")
+    ms = (time.perf_counter() - start) / SESSIONS * 1000
+    retained = (tracemalloc.get_traced_memory()[0] - before) / SESSIONS
+    tracemalloc.stop()
+    GLOBAL_STORE.stores.clear()
+    return ms, retained
+
+
+def main():
+    print(f"{SESSIONS} new sessions per app, after a first visitor\n")
+    print(f"{'components':>10} | {'overlay':>7} | {'ms/page load':>12} | {'KiB/session':>11}")
+    print("-" * 51)
+    for components in SIZES:
+        for copy_on_write in (False, True):
+            ms, retained = bench(components, copy_on_write)
+            print(f"{components:>10} | {'yes' if copy_on_write else 'no':>7} | {ms:>12.2f} | {retained / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
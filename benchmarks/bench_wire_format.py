@@ -0,0 +1,117 @@
+"""
+WebSocket wire format benchmark
+
+Drives the demo showcase (examples/1_demo_showcase) over a WebSocket: visits
+every page through the navigation menu and clicks every button on it,
+recording each message the server sends. Every recorded message is then
+encoded as JSON and as msgpack, reporting bytes per update (raw and after
+permessage-deflate, which compresses with a per-socket context) and the
+encode time on the event loop.
+
+Requires the optional msgpack package (pip install violit[msgpack]).
+
+Usage:
+    python benchmarks/bench_wire_format.py
+"""
+
+import os
+import re
+import sys
+import time
+import zlib
+import importlib.util
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from starlette.testclient import TestClient
+
+from violit import wire
+from violit.engine import WsEngine
+
+SHOWCASE = os.path.join(os.path.dirname(__file__), "..", "examples", "1_demo_showcase", "demo_showcase.py")
+ENCODE_ROUNDS = 200
+
+
+def load_showcase():
+    spec = importlib.util.spec_from_file_location("demo_showcase", SHOWCASE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def record_messages(app):
+    """Messages sent while navigating every page and clicking its buttons."""
+    messages = []
+    original_fan_out = WsEngine._fan_out
+
+    async def recording_fan_out(self, sid, message):
+        messages.append(message)
+        await original_fan_out(self, sid, message)
+
+    WsEngine._fan_out = recording_fan_out
+    try:
+        client = TestClient(app.fastapi)
+        html = client.get("/").text
+        token = re.search(r'window._csrf_token = "([^"]+)"', html)
+        token = token.group(1) if token else None
+        pages = re.findall(r"sendAction\('(nav_menu_\d+)', '([^']+)'\)", html)
+        with client.websocket_connect("/ws") as ws:
+            def click(cid, value=None):
+                ws.send_json({"type": "click", "id": cid, "value": value, "_csrf_token": token})
+
+            for nav_id, page_key in pages:
+                sent = len(messages)
+                click(nav_id, page_key)
+                ws.receive_text()
+                page_html = "".join(
+                    item.get("html", "") for m in messages[sent:] for item in m.get("payload", []))
+                for button in dict.fromkeys(re.findall(r"sendAction\('(btn_\d+)'\)", page_html)):
+                    before = len(messages)
+                    click(button)
+                    # An action may send nothing (unchanged output): no reply to wait for
+                    time.sleep(0.05)
+                    for _ in range(len(messages) - before):
+                        ws.receive_text()
+    finally:
+        WsEngine._fan_out = original_fan_out
+    return messages
+
+
+def deflated_sizes(frames):
+    """Frame sizes under permessage-deflate with context takeover."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return [len(compressor.compress(f) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4 for f in frames]
+
+
+def encode_time(codec, messages) -> float:
+    start = time.perf_counter()
+    for _ in range(ENCODE_ROUNDS):
+        for m in messages:
+            codec.encode(m)
+    return (time.perf_counter() - start) / (ENCODE_ROUNDS * len(messages)) * 1e6
+
+
+def main():
+    if wire.msgpack is None:
+        sys.exit("msgpack is not installed (pip install violit[msgpack])")
+    app = load_showcase()
+    messages = record_messages(app)
+    updates = [m for m in messages if m.get("type") == "update"]
+    print(f"{len(messages)} messages ({len(updates)} updates) from {SHOWCASE}\n")
+
+    print(f"{'format':>8} | {'bytes/update':>12} | {'deflated':>9} | {'encode (us/msg)':>15}")
+    print("-" * 54)
+    results = {}
+    for codec in (wire.JSON, wire.MsgpackCodec()):
+        frames = [codec.encode(m) for m in updates]
+        frames = [f.encode() if isinstance(f, str) else f for f in frames]
+        raw = sum(len(f) for f in frames) / len(frames)
+        deflated = sum(deflated_sizes(frames)) / len(frames)
+        us = encode_time(codec, updates)
+        results[codec.name] = us
+        print(f"{codec.name:>8} | {raw:>12.0f} | {deflated:>9.0f} | {us:>15.2f}")
+    print(f"\nmsgpack encodes {results['json'] / results['msgpack']:.1f}x faster than JSON")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
 from .app import App, Page
 from .component import Component
-from .state import State
+from .state import State, ListState, DictState
+from .sessions import MemoryBackend, SQLiteBackend, RedisBackend
@@ -14,10 +14,15 @@ import secrets
 import hmac
 import hashlib
 import logging
-from typing import Any, Callable, Dict, List, Optional, Set, Union
+import re
+import itertools
+import contextvars
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.middleware.gzip import GZipMiddleware
 import inspect
 import uvicorn
@@ -31,13 +36,31 @@ import plotly.io as pio
 
 from .context import session_ctx, rendering_ctx, fragment_ctx, app_instance_ref, layout_ctx, page_ctx, initial_render_ctx
 from .theme import Theme
-from .component import Component
-from .engine import LiteEngine, WsEngine
-from .state import State, get_session_store
+from .component import Component, PatchComponent
+from .engine import Inbox, LiteEngine, WsEngine
+from .sessions import MemoryBackend
+from . import wire
+from .state import State, ListState, DictState, CollectionState, Batch, DependencyTracker, get_session_store, reset_session_store, GLOBAL_STORE, COMPUTED_PREFIX, _validate_equality, _values_equal, recording_reads, read_versions, versions_current, current_reads, invoke, _log_read
 from .broadcast import Broadcaster
 from .background import BackgroundTask
 import asyncio
 
+# Stand-in for the output of an async builder until it has run (see App._async_builder)
+_ASYNC_MARKER = re.compile(r'<!--violit-async:\d+-->')
+_async_marker_ids = itertools.count()
+
+
+def _fill_markers(text: str, html: Dict[str, str]) -> str:
+    """Replace async builder markers with their output (which may contain markers)."""
+    return _ASYNC_MARKER.sub(lambda m: _fill_markers(html.get(m.group(0), ''), html), text)
+
+
+def _item_snapshot(item: Any) -> Any:
+    """What a keyed For entry compares the next item against: a shallow copy
+    of dicts, lists and sets (so in-place changes to their fields are seen
+    even when the same object comes back), the item itself otherwise."""
+    return item.copy() if item.__class__ in (dict, list, set) else item
+
 # Import all widget mixins
 from .widgets import (
     TextWidgetsMixin,
@@ -209,7 +232,7 @@ class App(
 ):
     """Main Violit App class"""
     
-    def __init__(self, mode='ws', title="Violit App", theme='violit_light_jewel', allow_selection=True, animation_mode='soft', icon=None, width=1024, height=768, on_top=True, container_width='800px', use_cdn=False):
+    def __init__(self, mode='ws', title="Violit App", theme='violit_light_jewel', allow_selection=True, animation_mode='soft', icon=None, width=1024, height=768, on_top=True, container_width='800px', use_cdn=False, state_equality=None, stream_index=False, wire_format='auto', ws_compression=True, action_policy='inline', action_budget_ms=100, render_workers=0, session_backend=None, max_sessions=1000, session_ttl=1800, max_session_bytes=None, session_spill=True, disconnect_grace=60, disconnect_reclaim='runtime'):
         self.mode = mode
         self.use_cdn = use_cdn
         self.app_title = title  # Renamed to avoid conflict with title() method
@@ -229,9 +252,22 @@ class App(
         self.native_token = os.environ.get("VIOLIT_NATIVE_TOKEN")
         self.is_native_mode = bool(os.environ.get("VIOLIT_NATIVE_MODE"))
         
-        # CSRF protection (disabled in native mode for local app security)
+        # Where session state values live (see sessions.py). A shared backend
+        # (SQLiteBackend, RedisBackend) lets uvicorn run several workers.
+        self.session_backend = session_backend or MemoryBackend()
+        
+        # Capacity policy of this process's session stores: LRU eviction of
+        # idle sessions past max_sessions, a per-session size budget, and
+        # spilling evicted state values to disk (sessions.SessionCache)
+        GLOBAL_STORE.configure(
+            max_sessions=max_sessions, ttl=session_ttl, max_session_bytes=max_session_bytes,
+            spill=session_spill and not self.session_backend.shared,
+            is_active=lambda sid: getattr(self, 'ws_engine', None) is not None and sid in self.ws_engine.sockets)
+        
+        # CSRF protection (disabled in native mode for local app security).
+        # The secret comes from the backend so tokens verify on every worker.
         self.csrf_enabled = not self.is_native_mode
-        self.csrf_secret = secrets.token_urlsafe(32)
+        self.csrf_secret = self.session_backend.secret()
         
         if self.debug_mode:
             if self.is_native_mode and self.native_token:
@@ -309,6 +345,48 @@ class App(
         else:
             self.container_max_width = container_width
 
+        # App-wide State.set() equality policy (None = every set() marks dirty).
+        # Individual states may override it with app.state(..., equals=...).
+        self.state_equality = _validate_equality(state_equality)
+        
+        # Stream the index page: send <head> and splash before rendering components
+        self.stream_index = stream_index
+        
+        # WebSocket wire: 'auto' sends msgpack frames to clients when the msgpack
+        # package is installed, 'json' always sends JSON (see wire.py).
+        # ws_compression enables permessage-deflate in the bundled uvicorn runs.
+        if wire_format not in ('auto', 'json'):
+            raise ValueError(f"wire_format must be 'auto' or 'json', got {wire_format!r}")
+        self.wire_formats = wire.available_formats() if wire_format == 'auto' else ['json']
+        self.ws_compression = ws_compression
+        
+        # Where actions (and the re-render they trigger) run: 'inline' on the
+        # event loop, 'threadpool' in the default executor, or 'auto': inline
+        # until an action takes longer than action_budget_ms, then in the
+        # threadpool from then on (see _run_action)
+        if action_policy not in ('inline', 'threadpool', 'auto'):
+            raise ValueError(f"action_policy must be 'inline', 'threadpool' or 'auto', got {action_policy!r}")
+        self.action_policy = action_policy
+        self.action_budget_ms = action_budget_ms
+        self._offloaded_actions: Set[Tuple[str, str]] = set()
+        self._session_locks = weakref.WeakValueDictionary()  # sid -> asyncio.Lock, alive while in use
+        
+        # Threads rendering the dirty components of one update in parallel
+        # (0 = one after another). Pays off for builders that release the GIL
+        # (NumPy, pandas, plotting); see _render_dirty for what runs there.
+        self.render_workers = render_workers
+        self._render_pool = ThreadPoolExecutor(render_workers, thread_name_prefix="violit-render") if render_workers else None
+        self._cid_lock = threading.Lock()
+        
+        # Memory of a session whose WebSocket stays disconnected for
+        # disconnect_grace seconds: 'runtime' frees its builders, actions,
+        # tracker and render caches but keeps its state values, 'all' evicts
+        # it (values spilled to disk), None keeps it until it expires
+        if disconnect_reclaim not in ('runtime', 'all', None):
+            raise ValueError(f"disconnect_reclaim must be 'runtime', 'all' or None, got {disconnect_reclaim!r}")
+        self.disconnect_grace = disconnect_grace
+        self.disconnect_reclaim = disconnect_reclaim
+        self._reclaim_tasks: Dict[str, asyncio.Task] = {}
         
         # Static definitions
         self.static_builders: Dict[str, Callable] = {}
@@ -317,6 +395,8 @@ class App(
         self.static_actions: Dict[str, Callable] = {}
         self.static_fragments: Dict[str, Callable] = {} # Deprecated. It was for the @app.fragments decorator.
         self.static_fragment_components: Dict[str, List[Any]] = {} # For children components of container widgets.
+        self._shared_renders: Dict[str, tuple] = {} # Initial renders at default state, shared by sessions (see _build)
+        self._shared_tracker = DependencyTracker()  # Their dependencies: base of every session's tracker
         
         self.state_count = 0
         self._fragments: Dict[str, Callable] = {} # Deprecated. It was used for dynamci fragment, but fragment_components in session store is used now.
@@ -324,6 +404,7 @@ class App(
         # Styling System: configure_widget defaults + user CSS
         self._widget_defaults: Dict[str, Dict[str, str]] = {}
         self._user_css: List[str] = []
+        self._page_template = None # (segments, slots), see _compile_page_template
         
         # Broadcasting System
         self.broadcaster = Broadcaster(self)
@@ -339,6 +420,8 @@ class App(
         self._animation_state = self.state(animation_mode)
         
         self.ws_engine = WsEngine() if mode == 'ws' else None
+        if self.ws_engine is not None:
+            self.ws_engine.rerender = self._rerender
         self.lite_engine = LiteEngine() if mode == 'lite' else None
         self._main_loop: asyncio.AbstractEventLoop | None = None
         app_instance_ref[0] = self
@@ -419,27 +502,73 @@ class App(
             ''')
         """
         self._user_css.append(css)
+        self._page_template = None
 
     def _get_widget_defaults(self, widget_type: str) -> Dict[str, str]:
         """Get default cls/style for a widget type (internal helper)."""
         return self._widget_defaults.get(widget_type, {})
 
-    def state(self, default_value, key=None) -> State:
-        """Create a reactive state variable"""
-        if key is None:
-            # Streamlit-style: Generate stable key from caller's location
-            frame = inspect.currentframe()
-            try:
-                caller_frame = frame.f_back
-                filename = os.path.basename(caller_frame.f_code.co_filename)
-                lineno = caller_frame.f_lineno
-                # Create stable key: filename_linenumber
-                name = f"state_{filename}_{lineno}"
-            finally:
-                del frame  # Avoid reference cycles
-        else:
-            name = key
-        return State(name, default_value)
+    def state(self, default_value, key=None, equals=None) -> State:
+        """Create a reactive state variable
+        
+        Args:
+            default_value: Initial value
+            key: Stable state name (derived from the call site if omitted)
+            equals: Optional no-op policy for set(). 'identity' (is), 'eq' (==)
+                    or a callable(old, new) -> bool. When the policy reports the
+                    new value equal to the current one, set() marks nothing dirty
+                    and fires no subscribers. Defaults to App(state_equality=...).
+                    Note: mutating a list in place and calling set() with the same
+                    object is a no-op under 'identity' and 'eq'.
+        """
+        return State(self._state_name(key), default_value, equals=equals)
+
+    def list_state(self, default_value=None, key=None, equals=None) -> ListState:
+        """Create a reactive list state with append/insert/remove/pop/update_at.
+        
+        Each mutation is recorded as a structural patch, so app.For and
+        app.reactive_list update only the affected items on the client.
+        """
+        return ListState(self._state_name(key), default_value, equals=equals)
+
+    def dict_state(self, default_value=None, key=None, equals=None) -> DictState:
+        """Create a reactive dict state with item set/delete (state[k] = v, del state[k]).
+        
+        Iterating it (e.g. in app.For) yields keys in insertion order; each
+        item set/delete is recorded as a structural patch.
+        """
+        return DictState(self._state_name(key), default_value, equals=equals)
+
+    def _state_name(self, key=None) -> str:
+        """Return key, or a stable name derived from the state factory's caller."""
+        if key is not None:
+            return key
+        # Streamlit-style: Generate stable key from caller's location
+        frame = inspect.currentframe()
+        try:
+            caller_frame = frame.f_back.f_back
+            filename = os.path.basename(caller_frame.f_code.co_filename)
+            lineno = caller_frame.f_lineno
+            # Create stable key: filename_linenumber
+            return f"state_{filename}_{lineno}"
+        finally:
+            del frame  # Avoid reference cycles
+
+    def batch(self) -> Batch:
+        """Coalesce state updates made inside a ``with`` block.
+        
+        Dirty states are published once when the block exits, and each
+        state's subscribers fire once with its final value. Useful for
+        actions that set many states, or background tasks that update
+        progress in tight loops.
+        
+        Example:
+            with app.batch():
+                progress.set(i / total)
+                status.set(f"Processing {name}")
+                rows.set(rows.value + [row])
+        """
+        return Batch()
 
     def _get_next_cid(self, prefix: str) -> str:
         """Generate next component ID
@@ -450,21 +579,43 @@ class App(
         store = get_session_store()
         parent_ctx = rendering_ctx.get()
         
+        with self._cid_lock:
+            count = store['component_count']
+            store['component_count'] += 1
+        
         # Check if we're inside a reactive block that needs namespacing
         if parent_ctx and any(parent_ctx.startswith(p) for p in ('if_', 'for_', 'reactivity_')):
             # Namespace the ID under the reactive block
-            cid = f"{parent_ctx}_{prefix}_{store['component_count']}"
+            cid = f"{parent_ctx}_{prefix}_{count}"
         else:
-            cid = f"{prefix}_{store['component_count']}"
+            cid = f"{prefix}_{count}"
         
-        store['component_count'] += 1
+        # Keyed For items collect the components they create
+        sink = store.get('cid_sink')
+        if sink is not None:
+            sink.append(cid)
         return cid
 
-    def _register_component(self, cid: str, builder: Callable, action: Optional[Callable] = None):
-        """Register a component with builder and optional action"""
+    def _register_component(self, cid: str, builder: Callable, action: Optional[Callable] = None,
+                            latest_wins: bool = False):
+        """Register a component with builder and optional action
+        
+        Both may be ``async def``: async builders are awaited after the
+        synchronous render (see _async_builder), async actions after the
+        synchronous part of the request (see _settle).
+
+        ``latest_wins`` marks an action that only sets a value (slider,
+        text input, ... without an on_change callback): a queued WebSocket
+        click for it is dropped when a newer one for the same component is
+        already waiting.
+        """
         store = get_session_store()
         sid = session_ctx.get()
         
+        if inspect.iscoroutinefunction(builder):
+            builder = self._async_builder(cid, builder)
+        if action and latest_wins:
+            action.latest_wins = True
         store['builders'][cid] = builder
         if action:
             store['actions'][cid] = action
@@ -621,6 +772,9 @@ class App(
                 if count.value > 5:
                     app.success("Big!")
             my_reactive_block()
+
+        The decorated function may be ``async def``; its awaits run
+        concurrently with other async builders of the same render.
             
         Example (Context Manager - Page Rerun):
             with app.reactivity():
@@ -636,26 +790,44 @@ class App(
             # Track if already registered
             registered = [False]
             
-            def fragment_builder():
-                token = fragment_ctx.set(fid)
-                render_token = rendering_ctx.set(fid)
-                store = get_session_store()
-                store['fragment_components'][fid] = []
-                
-                # Execute the user's function
-                func()
-                
-                # Render children
+            def render_fragment(store):
                 htmls = []
                 for cid, b in store['fragment_components'][fid]:
                     htmls.append(b().render())
-                
-                fragment_ctx.reset(token)
-                rendering_ctx.reset(render_token)
-                
                 inner = f'<div id="{fid}" class="fragment">{" ".join(htmls)}</div>'
                 return Component("div", id=f"{fid}_wrapper", content=inner)
             
+            if inspect.iscoroutinefunction(func):
+                async def async_fragment_builder():
+                    token = fragment_ctx.set(fid)
+                    render_token = rendering_ctx.set(fid)
+                    try:
+                        store = get_session_store()
+                        store['fragment_components'][fid] = []
+                        await func()
+                        return render_fragment(store)
+                    finally:
+                        fragment_ctx.reset(token)
+                        rendering_ctx.reset(render_token)
+                
+                fragment_builder = self._async_builder(fid, async_fragment_builder)
+            else:
+                def fragment_builder():
+                    token = fragment_ctx.set(fid)
+                    render_token = rendering_ctx.set(fid)
+                    store = get_session_store()
+                    store['fragment_components'][fid] = []
+                    
+                    # Execute the user's function
+                    func()
+                    
+                    # Render children
+                    comp = render_fragment(store)
+                    
+                    fragment_ctx.reset(token)
+                    rendering_ctx.reset(render_token)
+                    return comp
+            
             # Store builder
             self.static_builders[fid] = fragment_builder
             self.static_fragments[fid] = func
@@ -789,13 +961,25 @@ class App(
         
         self._register_component(cid, if_builder)
 
-    def For(self, items, render_fn=None, empty_fn=None, *, render=None, empty=None):
+    def For(self, items, render_fn=None, empty_fn=None, *, render=None, empty=None, key=None):
         """Reactive loop rendering widget.
         
         Args:
             items: List, State, or Callable[[], List].
             render_fn: Function(item) or Function(item, index)
             empty_fn: Function when list is empty
+            key: Optional Function(item) -> hashable, unique per item. Enables keyed
+                 reconciliation: each item's HTML and components are cached by key,
+                 only added or changed items re-run render_fn, and list changes are
+                 sent to the client as insert/move/remove ops. An item is re-rendered
+                 when it no longer equals (==) what it was at its last render:
+                 top-level changes to a dict/list/set item are seen even if it was
+                 mutated in place, but nested ones (item["tags"].append(...)) and
+                 in-place changes to other objects are not; replace such items
+                 (with a new object) instead.
+        
+        Example:
+            app.For(feed, render=lambda e: app.text(e["msg"]), key=lambda e: e["id"])
         """
         # Resolve positional vs keyword
         actual_render = render_fn if render_fn is not None else render
@@ -812,8 +996,54 @@ class App(
                 _render_with_index = False
 
         cid = self._get_next_cid("for")
+
+        # Items of a ListState/DictState (or keyed items) are wrapped one
+        # element per item so structural ops can address them by position.
+        wrap_items = key is not None or isinstance(items, CollectionState)
+
+        def render_item_htmls(store, item, idx):
+            # Swap in a fresh order list (restored below) instead of copying
+            prev_order = store['order']
+            store['order'] = []
+            
+            # Use the signature check cached at For() registration time
+            if _render_with_index:
+                actual_render(item, idx)
+            else:
+                actual_render(item)
+            
+            htmls = []
+            for child_cid in store['order']:
+                builder = store['builders'].get(child_cid) or self.static_builders.get(child_cid)
+                if builder:
+                    htmls.append(builder().render())
+            
+            store['order'] = prev_order
+            return htmls
+
+        def wrap_item(htmls):
+            return '<div class="for-item" style="display:contents">' + '\n'.join(htmls) + '</div>'
+
+        def render_keyed_entry(store, tracker, item, idx, item_key):
+            # Record the For's own deps and every component created for this
+            # item, so the entry can be reused (deps re-registered) or dropped.
+            prev_sink = store.get('cid_sink')
+            store['cid_sink'] = owned = []
+            try:
+                with tracker.recording(cid) as deps, recording_reads() as reads:
+                    html = wrap_item(render_item_htmls(store, item, idx))
+            finally:
+                store['cid_sink'] = prev_sink
+            if prev_sink is not None:
+                prev_sink.extend(owned)
+            for owned_cid in owned:
+                store['for_owners'][owned_cid] = (cid, item_key)
+            return {'item': _item_snapshot(item), 'idx': idx, 'html': html, 'deps': deps,
+                    'reads': read_versions(store, reads), 'cids': owned}
         
         def for_builder():
+            can_patch = self._can_patch()
+            patch_ops = self._take_patch_ops(cid, items) if key is None else None
             token = rendering_ctx.set(cid)
             try:
                 store = get_session_store()
@@ -830,8 +1060,28 @@ class App(
                 if isinstance(current_items, int):
                     current_items = range(max(0, current_items))
                 
+                # Structural patch: render only inserted/updated items
+                if patch_ops is not None and actual_render:
+                    dom_ops = self._patch_ops(
+                        patch_ops, len(current_items),
+                        lambda item, idx: wrap_item(render_item_htmls(store, item, idx)),
+                        positional=_render_with_index,
+                    )
+                    if dom_ops is not None:
+                        return PatchComponent(cid, dom_ops)
+                
+                # Keyed reconciliation against the cached previous render
+                if key is not None and actual_render and current_items:
+                    return self._reconcile_keyed(
+                        cid, current_items, key,
+                        lambda item, idx, k: render_keyed_entry(store, store['tracker'], item, idx, k),
+                        positional=_render_with_index, can_patch=can_patch,
+                    )
+                
                 # Check if empty
                 if not current_items or len(current_items) == 0:
+                    if key is not None:
+                        self._drop_keyed_cache(cid)
                     if actual_empty:
                         prev_order = store['order'].copy()
                         store['order'] = []
@@ -855,21 +1105,11 @@ class App(
                     all_htmls = []
                     
                     for idx, item in enumerate(current_items):
-                        prev_order = store['order'].copy()
-                        store['order'] = []
-                        
-                        # Use the signature check cached at For() registration time
-                        if _render_with_index:
-                            actual_render(item, idx)
+                        item_htmls = render_item_htmls(store, item, idx)
+                        if wrap_items:
+                            all_htmls.append(wrap_item(item_htmls))
                         else:
-                            actual_render(item)
-                        
-                        for child_cid in store['order']:
-                            builder = store['builders'].get(child_cid) or self.static_builders.get(child_cid)
-                            if builder:
-                                all_htmls.append(builder().render())
-                        
-                        store['order'] = prev_order
+                            all_htmls.extend(item_htmls)
                     
                     content = '\n'.join(all_htmls)
                     return Component("div", id=cid, content=content, class_="for-block")
@@ -880,88 +1120,909 @@ class App(
         
         self._register_component(cid, for_builder)
 
+    def _compile_page_template(self):
+        """Split HTML_TEMPLATE into static segments and per-request slots.
+        
+        Placeholders that are constant for the app (mode, title, splash,
+        vendor resources, user CSS, ...) are substituted once here; the result
+        is cached until add_css() changes it. Returns (segments, slots) with
+        len(segments) == len(slots) + 1.
+        """
+        # Debug flag injection
+        debug_script = f'<script>window._debug_mode = {str(self.debug_mode).lower()};</script>'
+        
+        # Vendor Resources Selection
+        if self.use_cdn:
+            vendor_resources = """
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@shoelace-style/shoelace@2.12.0/cdn/themes/light.css" />
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@shoelace-style/shoelace@2.12.0/cdn/themes/dark.css" />
+    <script type="module" src="https://cdn.jsdelivr.net/npm/@shoelace-style/shoelace@2.12.0/cdn/shoelace-autoloader.js"></script>
+    <script src="https://unpkg.com/htmx.org@1.9.10" defer></script>
+    <script src="https://cdn.jsdelivr.net/npm/ag-grid-community@31.0.0/dist/ag-grid-community.min.js" defer></script>
+    <script src="https://cdn.plot.ly/plotly-2.27.0.min.js" defer></script>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600&display=swap" rel="stylesheet">
+    <script src="https://cdn.jsdelivr.net/npm/@master/css-runtime@2.0.0-rc.67/dist/global.min.js" defer></script>
+    <script src="https://cdn.jsdelivr.net/gh/highlightjs/cdn-release@11.9.0/build/highlight.min.js" defer></script>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/highlightjs/cdn-release@11.9.0/build/styles/atom-one-dark.min.css" />
+    <style>
+        .violit-code-light pre code.hljs { background: transparent !important; }
+        .violit-code-dark pre code.hljs { background: transparent !important; }
+    </style>
+                """
+        else:
+            # Local/Offline Mode
+            # Note: Shoelace autoloader might need full assets for some components.
+            # Basic components should work with the downloaded files.
+            # Added 'defer' to non-critical heavy scripts to unblock rendering (LCP/FCP improvement)
+            vendor_resources = """
+    <link rel="stylesheet" href="/static/vendor/shoelace/themes/light.css" />
+    <link rel="stylesheet" href="/static/vendor/shoelace/themes/dark.css" />
+    <script type="module" src="/static/vendor/shoelace/shoelace-autoloader.js"></script>
+    <script src="/static/vendor/htmx/htmx.min.js" defer></script>
+    <script src="/static/vendor/ag-grid/ag-grid-community.min.js" defer></script>
+    <script src="/static/vendor/plotly/plotly-2.27.0.min.js" defer></script>
+    <script src="/static/vendor/master-css/master-css-runtime.js" defer></script>
+    <script src="/static/vendor/highlightjs/highlight.min.js" defer></script>
+    <link rel="stylesheet" href="/static/vendor/highlightjs/atom-one-dark.min.css" />
+    <style>
+        .violit-code-light pre code.hljs { background: transparent !important; }
+        .violit-code-dark pre code.hljs { background: transparent !important; }
+    </style>
+    <!-- Fonts: Inter (local vendor woff2) -->
+    <style>
+        @font-face {
+            font-family: 'Inter';
+            font-style: normal;
+            font-weight: 100 900;
+            font-display: swap;
+            src: url('/static/vendor/fonts/inter/inter-latin-ext.woff2') format('woff2');
+            unicode-range: U+0100-02BA, U+02BD-02C5, U+02C7-02CC, U+02CE-02D7, U+02DD-02FF, U+0304, U+0308, U+0329, U+1D00-1DBF, U+1E00-1E9F, U+1EF2-1EFF, U+2020, U+20A0-20AB, U+20AD-20C0, U+2113, U+2C60-2C7F, U+A720-A7FF;
+        }
+        @font-face {
+            font-family: 'Inter';
+            font-style: normal;
+            font-weight: 100 900;
+            font-display: swap;
+            src: url('/static/vendor/fonts/inter/inter-latin.woff2') format('woff2');
+            unicode-range: U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD;
+        }
+    </style>
+                """
+
+        # Build user CSS from add_css() calls
+        user_css = ""
+        if self._user_css:
+            user_css = "<style id=\"violit-user-css\">\n" + "\n".join(self._user_css) + "\n</style>"
+        
+        baked = {
+            'MODE': self.mode,
+            'TITLE': self.app_title,
+            'SPLASH': self._splash_html if self.show_splash else "",
+            'CONTAINER_MAX_WIDTH': self.container_max_width,
+            'DEBUG_SCRIPT': debug_script,
+            'VENDOR_RESOURCES': vendor_resources,
+            'USER_CSS': user_css,
+            'WIRE_PROTOCOLS': json.dumps([wire.SUBPROTOCOL_PREFIX + name for name in self.wire_formats]),
+        }
+        names = '|'.join(_PAGE_SLOTS + tuple(baked))
+        parts = re.split(f'%({names})%', HTML_TEMPLATE)
+        segments, slots = [parts[0]], []
+        for i in range(1, len(parts), 2):
+            name, text = parts[i], parts[i + 1]
+            if name in baked:
+                segments[-1] += baked[name] + text
+            else:
+                slots.append(name)
+                segments.append(text)
+        self._page_template = (segments, slots)
+        return self._page_template
+
+    async def _render_page_body_async(self) -> Dict[str, str]:
+        """_render_page_body() with the output of async builders filled in."""
+        body = self._render_page_body()
+        store = get_session_store()
+        if store.get('pending_builds'):
+            html = await self._run_pending_builds(store)
+            for slot in ('CONTENT', 'SIDEBAR_CONTENT'):
+                body[slot] = _fill_markers(body[slot], html)
+            replaced = store.get('replaced_pages') or {}
+            for page_cid, page_html in replaced.items():
+                if page_html is not None:
+                    replaced[page_cid] = _fill_markers(page_html, html)
+        return body
+
+    def _render_page_body(self) -> Dict[str, str]:
+        """Render all components for a page load into the body slots."""
+        # [CRITICAL] Set initial_render_ctx to True during first page load
+        # This allows widgets (like charts) to defer heavy data serialization
+        token = initial_render_ctx.set(True)
+        try:
+            main_c, sidebar_c = self._render_all()
+        finally:
+            initial_render_ctx.reset(token)
+        get_session_store()['page_rendered'] = True
+        
+        has_sidebar = sidebar_c or self.static_sidebar_order
+        return {
+            'CONTENT': main_c,
+            'SIDEBAR_CONTENT': sidebar_c,
+            'SIDEBAR_STYLE': "" if has_sidebar else "display: none;",
+            'MAIN_CLASS': "" if has_sidebar else "sidebar-collapsed",
+        }
+
+    async def _stream_page(self, sid: Optional[str], values: Dict[str, str]):
+        """Yield the page progressively for App(stream_index=True).
+        
+        Everything up to the main content (the <head> with vendor resources,
+        theme and splash) is sent before any builder runs, so the browser
+        starts fetching scripts and shows the splash while the body renders.
+        Main content follows one top-level component at a time, with its
+        async builders' output filled in. The sidebar precedes main in the
+        document but pages may add to it, so it is rendered last, sent in a
+        <template> and moved into place by an inline script. The render
+        holds the session's lock, like actions.
+        """
+        segments, slots = self._page_template or self._compile_page_template()
+        # Until the sidebar is rendered, assume only static components fill it
+        has_sidebar = bool(self.static_sidebar_order)
+        values.update({
+            'SIDEBAR_CONTENT': "",
+            'SIDEBAR_STYLE': "" if has_sidebar else "display: none;",
+            'MAIN_CLASS': "" if has_sidebar else "sidebar-collapsed",
+        })
+        out = [segments[0]]
+        for slot, text in zip(slots, segments[1:]):
+            if slot == 'CONTENT':
+                yield "".join(out)
+                out = []
+                async with self._session_lock(sid):
+                    async for chunk in self._stream_page_body(sid):
+                        yield chunk
+            else:
+                out.append(values[slot])
+            out.append(text)
+        yield "".join(out)
+
+    async def _stream_page_body(self, sid: Optional[str]):
+        """Main content per top-level component, then the sidebar (see _stream_page)."""
+        store = get_session_store()
+        self._sync_session(store)
+        store['patches'] = {}
+        sidebar_html, filled = [], {}
+        for cid, in_sidebar in self._page_cids(store):
+            # Builders block the loop: let the previous chunk go out first
+            await asyncio.sleep(0)
+            token = initial_render_ctx.set(True)
+            try:
+                html = self._render_top_level(store, cid)
+            finally:
+                initial_render_ctx.reset(token)
+            if html is None:
+                continue
+            if store.get('pending_builds'):
+                filled.update(await self._run_pending_builds(store))
+                html = _fill_markers(html, filled)
+            if in_sidebar:
+                sidebar_html.append(html)
+            else:
+                yield html
+        store['page_rendered'] = True
+        replaced = store.get('replaced_pages') or {}
+        for page_cid, page_html in replaced.items():
+            if page_html is not None:
+                replaced[page_cid] = _fill_markers(page_html, filled)
+        self._flush_session(store)
+        await self._push_replaced_pages(sid, store)
+        if sidebar_html:
+            # Template content is inert: execute its scripts explicitly, as
+            # the client does for updates
+            yield (
+                '<template id="violit-sidebar">' + "".join(sidebar_html) + '</template>'
+                '<script>(function () {'
+                'const tpl = document.getElementById("violit-sidebar");'
+                'const sidebar = document.getElementById("sidebar");'
+                'const scripts = Array.from(tpl.content.querySelectorAll("script"));'
+                'sidebar.appendChild(tpl.content);'
+                'sidebar.style.display = "";'
+                'document.getElementById("main").classList.remove("sidebar-collapsed");'
+                'tpl.remove();'
+                'scripts.forEach(s => {'
+                'const script = document.createElement("script");'
+                'script.textContent = s.textContent;'
+                'document.body.appendChild(script);'
+                'script.remove();'
+                '});'
+                'document.currentScript.remove();'
+                '})();</script>'
+            )
+
+    def _render_page(self, **values: str) -> str:
+        """Fill the per-request slots (_PAGE_SLOTS) of the compiled page template."""
+        segments, slots = self._page_template or self._compile_page_template()
+        out = [segments[0]]
+        for slot, text in zip(slots, segments[1:]):
+            out.append(values[slot])
+            out.append(text)
+        return "".join(out)
+
     def _render_all(self):
         """Render all components"""
         store = get_session_store()
+        # The client receives full HTML, so pending structural ops are moot
+        store['patches'] = {}
         
         main_html = []
         sidebar_html = []
+        for cid, in_sidebar in self._page_cids(store):
+            html = self._render_top_level(store, cid)
+            if html is not None:
+                (sidebar_html if in_sidebar else main_html).append(html)
+        
+        return "".join(main_html), "".join(sidebar_html)
 
-        def render_cids(cids, target_list):
-            for cid in cids:
-                builder = store['builders'].get(cid) or self.static_builders.get(cid)
-                if builder:
-                    try:
-                        target_list.append(builder().render())
-                    except Exception as e:
-                        import logging
-                        logging.getLogger(__name__).error(
-                            f"[render] component '{cid}' failed: {e}"
-                        )
-                        target_list.append(
-                            f'<div id="{cid}" style="border:1px solid var(--sl-color-danger-600,red);'
-                            f'padding:0.75rem;border-radius:0.375rem;color:var(--sl-color-danger-600,red);'
-                            f'font-size:0.85rem;">'
-                            f'⚠ Render error in <code>{cid}</code>: {e}'
-                            f'</div>'
-                        )
-
+    def _page_cids(self, store):
+        """Top-level component ids in render order, each with whether it
+        goes in the sidebar. The session's lists are read as rendering goes:
+        pages add components to them."""
         # Static Components
-        render_cids(self.static_order, main_html)
-        render_cids(self.static_sidebar_order, sidebar_html)
+        for cid in self.static_order:
+            yield cid, False
+        for cid in self.static_sidebar_order:
+            yield cid, True
         
         # Dynamic Components
-        render_cids(store['order'], main_html)
-        render_cids(store['sidebar_order'], sidebar_html)
+        for cid in store['order']:
+            yield cid, False
+        for cid in store['sidebar_order']:
+            yield cid, True
+
+    def _render_top_level(self, store, cid: str) -> Optional[str]:
+        """HTML of a top-level component for a page load (an error box if
+        its builder fails), or None if it has no builder."""
+        builder = store['builders'].get(cid) or self.static_builders.get(cid)
+        if not builder:
+            return None
+        try:
+            html = self._build(store, cid, builder).render()
+            if cid in store.get('replaced_pages', ()):
+                store['replaced_pages'][cid] = html
+            return html
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(
+                f"[render] component '{cid}' failed: {e}"
+            )
+            return (
+                f'<div id="{cid}" style="border:1px solid var(--sl-color-danger-600,red);'
+                f'padding:0.75rem;border-radius:0.375rem;color:var(--sl-color-danger-600,red);'
+                f'font-size:0.85rem;">'
+                f'⚠ Render error in <code>{cid}</code>: {e}'
+                f'</div>'
+            )
+
+    async def _reclaim_after_grace(self, sid: str):
+        """Reclaim a session's memory unless a socket of it reconnects
+        within disconnect_grace seconds (see App(disconnect_reclaim=...))."""
+        try:
+            await asyncio.sleep(self.disconnect_grace)
+            async with self._session_lock(sid):
+                if sid in self.ws_engine.sockets:
+                    return
+                GLOBAL_STORE.reclaim(sid, reset_session_store if self.disconnect_reclaim == 'runtime' else None)
+        finally:
+            if self._reclaim_tasks.get(sid) is asyncio.current_task():
+                del self._reclaim_tasks[sid]
+
+    def _session_lock(self, sid: Optional[str]) -> asyncio.Lock:
+        """Lock serializing a session's actions (asyncio.Lock wakes waiters in FIFO order)."""
+        lock = self._session_locks.get(sid)
+        if lock is None:
+            lock = self._session_locks[sid] = asyncio.Lock()
+        return lock
+
+    def _superseded(self, data: dict, queued) -> bool:
+        """Whether a WebSocket message can be dropped for a newer queued one.
+
+        Only clicks of latest_wins actions qualify, and only when a later
+        click for the same component is queued with nothing but other
+        latest_wins clicks in between (each of those just sets its own value,
+        so skipping ahead does not reorder anything observable). Inputs with
+        an on_change callback are not latest_wins: every value reaches it.
+        """
+        if data.get('type') != 'click':
+            return False
+        store = get_session_store()
         
-        return "".join(main_html), "".join(sidebar_html)
+        def latest_wins(cid):
+            act = store['actions'].get(cid) or self.static_actions.get(cid)
+            return getattr(act, 'latest_wins', False)
+        
+        cid = data.get('id')
+        if not latest_wins(cid):
+            return False
+        for later in queued:
+            if later.get('type') != 'click':
+                return False
+            if later.get('id') == cid:
+                return True
+            if not latest_wins(later.get('id')):
+                return False
+        return False
+
+    async def _run_action(self, key: Tuple[str, str], fn: Callable):
+        """Run fn() under the action policy and return its result.
+        
+        ``key`` is ('action', cid) for the callback and ('render', cid) for
+        the re-render it triggers, so 'auto' offloads each on its own
+        timing: a slow render doesn't move a cheap callback off the loop,
+        nor the other way round.
+        
+        Off the loop, fn runs in a copy of the caller's context, so
+        session_ctx and get_session_store() resolve to the calling session.
+        Callers hold _session_lock, which keeps a session's actions in order.
+        """
+        if self.action_policy == 'inline' or (self.action_policy == 'auto' and key not in self._offloaded_actions):
+            start = time.perf_counter()
+            result = fn()
+            if self.action_policy == 'auto' and (time.perf_counter() - start) * 1000 > self.action_budget_ms:
+                self.debug_print(f"[ACTION] {key[0]} of {key[1]} exceeded {self.action_budget_ms}ms, running it in the threadpool from now on")
+                self._offloaded_actions.add(key)
+            return result
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, ctx.run, fn)
 
     def _get_dirty_rendered(self):
         """Get components that need updating"""
         store = get_session_store()
         tracker = store['tracker']
         dirty_states = store.get('dirty_states', set())
+        patches = store.get('patches') or {}
+        store['patches'] = {}
         aff = set()
-        for s in dirty_states: aff.update(tracker.get_dirty_components(s))
+        # Components whose only dirty dependency is a collection state with
+        # recorded ops: cid -> (state_name, ops). See _take_patch_ops().
+        patchable = {}
+        for s in dirty_states:
+            ops = patches.get(s)
+            for cid in tracker.get_dirty_components(s):
+                if cid in aff:
+                    patchable.pop(cid, None)
+                else:
+                    aff.add(cid)
+                    if ops:
+                        patchable[cid] = (s, ops)
         
         # [NEW] Handle forced dirty components (async data loading)
         forced = store.get('forced_dirty', set())
         if forced:
             aff.update(forced)
+            for cid in forced:
+                patchable.pop(cid, None)
+                # Forced for a reason no state version reflects
+                self._drop_render_cache(store, cid)
             store['forced_dirty'] = set() # Clear after collection
             
         store['dirty_states'] = set()
+        store['render_patches'] = patchable
+        try:
+            return self._render_dirty(store, tracker, aff, patchable)
+        finally:
+            store['render_patches'] = None
+
+    def _render_dirty(self, store, tracker, aff, patchable):
+        """Run the builders of the affected components (see _get_dirty_rendered)
         
+        With render_workers, components whose last build created no child
+        components (``store['leaf_components']``, see _build) are built in
+        the render pool after the others, each in its own copy of the
+        context. Builders that create components, For/If blocks and patched
+        components stay on the calling thread: they use session-wide render
+        state (the cid counter order, cid_sink, render_patches).
+        """
         res = []
+        leaves = store.get('leaf_components', ()) if self._render_pool else ()
+        parallel = []
         for cid in aff:
+            # ComputedStates are tracker subscribers too, but are invalidated
+            # in State.set() and have no builder of their own.
+            if cid.startswith(COMPUTED_PREFIX):
+                continue
             builder = store['builders'].get(cid) or self.static_builders.get(cid)
             if builder:
                 # Clear stale subscriptions before re-rendering so that:
                 # 1. Dependencies that are no longer read get removed.
                 # 2. The upcoming builder() call re-registers only current deps.
-                tracker.unregister_component(cid)
+                # A patchable component keeps its subscriptions, since a
+                # structural patch re-runs only the changed items.
+                if cid not in patchable:
+                    tracker.unregister_component(cid)
+                # A component inside a keyed For item re-rendered on its own:
+                # the item's cached HTML is stale now.
+                owner = store['for_owners'].get(cid)
+                if owner:
+                    entry = store['for_cache'].get(owner[0], {}).get('entries', {}).get(owner[1])
+                    if entry:
+                        entry['html'] = None
+                if cid in leaves and cid not in patchable:
+                    parallel.append((cid, builder))
+                    continue
                 try:
-                    res.append(builder())
+                    res.append(self._build(store, cid, builder))
                 except Exception as e:
-                    import logging
-                    logging.getLogger(__name__).error(
-                        f"[render] dirty component '{cid}' failed: {e}"
-                    )
-                    from .component import Component
-                    res.append(Component(
-                        "div", id=cid,
-                        content=(
-                            f'<span style="color:var(--sl-color-danger-600,red);font-size:0.85rem;">'
-                            f'⚠ Render error in <code>{cid}</code>: {e}</span>'
-                        )
-                    ))
+                    res.append(self._render_error(cid, e))
             else:
                 # Component is permanently gone (e.g. navigation page switch,
                 # If-block condition flip).  Clean it from the tracker so it
                 # never appears in future dirty sets.
                 tracker.unregister_component(cid)
+                self._drop_render_cache(store, cid)
+        if len(parallel) > 1:
+            res.extend(self._render_parallel(store, parallel))
+        else:
+            for cid, builder in parallel:
+                try:
+                    res.append(self._build(store, cid, builder))
+                except Exception as e:
+                    res.append(self._render_error(cid, e))
         return res
 
+    def _render_parallel(self, store, items) -> List[Component]:
+        """Build ``(cid, builder)`` pairs in the render pool."""
+        def build(cid, builder):
+            try:
+                return self._build(store, cid, builder)
+            except Exception as e:
+                return self._render_error(cid, e)
+        
+        # A context can only be entered by one thread at a time: one copy each
+        futures = [self._render_pool.submit(contextvars.copy_context().run, build, cid, builder)
+                   for cid, builder in items]
+        return [f.result() for f in futures]
+
+    def _render_error(self, cid: str, e: Exception) -> Component:
+        """Stand-in for a component whose builder raised during a dirty render."""
+        logging.getLogger(__name__).error(
+            f"[render] dirty component '{cid}' failed: {e}"
+        )
+        return Component(
+            "div", id=cid,
+            content=(
+                f'<span style="color:var(--sl-color-danger-600,red);font-size:0.85rem;">'
+                f'⚠ Render error in <code>{cid}</code>: {e}</span>'
+            )
+        )
+
+    def _async_builder(self, cid: str, builder: Callable) -> Callable:
+        """Sync stand-in for an ``async def`` builder.
+        
+        Renders a marker and queues the coroutine in the session's
+        ``pending_builds`` with the calling context (session, rendering
+        scope). Whoever started the render awaits the queue with
+        _finish_render(), which runs the pending builders concurrently and
+        puts their HTML in place of the markers. This works wherever the
+        builder is called from, including inside containers and For items.
+        """
+        def deferred():
+            store = get_session_store()
+            # The output is only known later: no cache may keep the marker
+            _log_read(None)
+            marker = f'<!--violit-async:{next(_async_marker_ids)}-->'
+            store.setdefault('pending_builds', []).append(
+                (marker, cid, builder(), contextvars.copy_context()))
+            return Component(None, cid, content=marker)
+        return deferred
+
+    async def _finish_render(self, store, components: List[Component]) -> List[Component]:
+        """Run the async builders deferred while rendering ``components`` and
+        fill in their output (see _async_builder).
+        
+        A component that is itself deferred is sent under the id of the
+        component its builder returned (e.g. the wrapper of an async
+        reactivity block), as the sync builder's output would be.
+        """
+        if not store.get('pending_builds'):
+            return components
+        roots: Dict[str, Component] = {}
+        html = await self._run_pending_builds(store, roots)
+        done = []
+        for c in components:
+            ops = getattr(c, 'ops', None)
+            if ops is not None:
+                for op in ops:
+                    if op.get('html'):
+                        op['html'] = _fill_markers(op['html'], html)
+                done.append(c)
+                continue
+            rendered = c.render()
+            if '<!--violit-async:' not in rendered:
+                done.append(c)
+                continue
+            root = roots.get(rendered)
+            done.append(Component(None, c.id if root is None else root.id,
+                                  content=_fill_markers(rendered, html)))
+        return done
+
+    async def _run_pending_builds(self, store, roots: Optional[Dict[str, Component]] = None) -> Dict[str, str]:
+        """Await the queued async builders concurrently, each in the context
+        it was queued from. Builders they render may queue more: those run in
+        the next round. Returns marker -> HTML, and fills ``roots`` with
+        marker -> component returned."""
+        html = {}
+        loop = asyncio.get_running_loop()
+        while store.get('pending_builds'):
+            pending, store['pending_builds'] = store['pending_builds'], []
+            # A task runs in a copy of the context current at its creation
+            tasks = [ctx.run(loop.create_task, coro) for _, _, coro, ctx in pending]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for (marker, cid, _, _), comp in zip(pending, results):
+                if isinstance(comp, BaseException):
+                    comp = self._render_error(cid, comp)
+                html[marker] = comp.render()
+                if roots is not None:
+                    roots[marker] = comp
+        return html
+
+    async def _settle(self, store):
+        """Await the async callbacks queued by invoke() (actions, on_change
+        handlers, subscribers), in order, each in the context it was queued
+        from. Callbacks they trigger are awaited too. Like a sync action, a
+        failing async action raises here."""
+        while store.get('pending_awaits'):
+            pending, store['pending_awaits'] = store['pending_awaits'], []
+            for i, (awaitable, ctx) in enumerate(pending):
+                try:
+                    await ctx.run(asyncio.ensure_future, awaitable)
+                except BaseException:
+                    for rest, _ in pending[i + 1:]:
+                        if inspect.iscoroutine(rest):
+                            rest.close()
+                    raise
+
+    async def _ensure_registered(self, store):
+        """Register the session's builders and actions in this process.
+        
+        Components created at runtime (pages, fragments, containers) are
+        registered while the page renders. A worker that did not render the
+        session's page (another worker served it, or the local store
+        expired) renders it once and discards the HTML.
+        """
+        if not store.get('page_rendered') and session_ctx.get() is not None:
+            await self._render_page_body_async()
+
+    def _sync_session(self, store):
+        """Pick up state values other workers set (see sessions.py).
+        
+        The version-keyed render caches can't tell those values changed:
+        they are dropped along with memoized computed values, and the
+        session no longer uses shared initial renders (which assume every
+        state it never set has its default).
+        """
+        if self.session_backend.sync(store['states']):
+            self._drop_foreign(store)
+
+    @staticmethod
+    def _drop_foreign(store):
+        store['render_cache'].clear()
+        store['for_cache'].clear()
+        store['computed'].clear()
+        store['foreign_states'] = True
+
+    def _flush_session(self, store):
+        """Persist the state values set while handling a request, and
+        measure the session against max_session_bytes.
+        
+        Values other workers set meanwhile are picked up by the flush;
+        caches are dropped for them as in _sync_session.
+        """
+        if self.session_backend.flush(store['states']):
+            self._drop_foreign(store)
+        GLOBAL_STORE.account(session_ctx.get(), store)
+
+    async def _enter_session(self, sid: Optional[str], store):
+        """Before handling an action: sync the session's state values and
+        make sure its components are registered in this process."""
+        async with self._session_lock(sid):
+            self._sync_session(store)
+            await self._ensure_registered(store)
+
+    async def _rerender(self, sid: str, cids: Set[str]) -> List[Component]:
+        """Current render of components whose pending updates a session's
+        outbox dropped (see engine.Outbox)."""
+        if sid not in GLOBAL_STORE:
+            return []
+        token = session_ctx.set(sid)
+        try:
+            async with self._session_lock(sid):
+                store = get_session_store()
+                tracker = store['tracker']
+                components = []
+                for cid in cids:
+                    builder = store['builders'].get(cid) or self.static_builders.get(cid)
+                    if builder is None:
+                        continue
+                    tracker.unregister_component(cid)
+                    try:
+                        components.append(self._build(store, cid, builder))
+                    except Exception as e:
+                        components.append(self._render_error(cid, e))
+                return await self._finish_render(store, components)
+        finally:
+            session_ctx.reset(token)
+
+    async def _push_rendered(self, sid: str, store, components: List[Component]):
+        """Push components rendered off the loop (background tasks) to a
+        session, after awaiting the async callbacks queued meanwhile and
+        rendering what they changed."""
+        if store.get('pending_awaits'):
+            await self._settle(store)
+            components = components + self._get_dirty_rendered()
+            self._flush_session(store)
+        await self.ws_engine.push_updates(sid, await self._finish_render(store, components))
+
+    def _build(self, store, cid: str, builder: Callable) -> Component:
+        """Run a component's builder, or reuse its last output.
+        
+        ``store['render_cache']`` keeps, per component, the rendered HTML, the
+        versions of every state read while building it (nested components
+        included) and its own tracker dependencies. While none of those states
+        was set, the cached HTML is returned without running the builder and
+        the dependencies are re-registered. Initial (page load) and later
+        renders are cached separately, since widgets may render differently
+        (see initial_render_ctx). Builders that read no state are not cached:
+        their output may depend on plain Python values.
+        
+        Initial renders of static components are also shared across sessions
+        (``self._shared_renders``) while every state they read still has its
+        default value in the session (version 0), so a new visitor only runs
+        the builders whose inputs differ. Only self-contained renders are
+        shared: ones that create no child components (those would have to be
+        registered in each session) and read no ComputedState (its deps live
+        in the session's tracker). Neither the shared entry nor its
+        dependencies are copied into the session: the dependencies live in
+        ``self._shared_tracker``, the base of every session's tracker.
+        """
+        initial = initial_render_ctx.get()
+        key = (cid, initial)
+        cache = store['render_cache']
+        tracker = store['tracker']
+        entry = cache.get(key)
+        shareable = initial and builder is self.static_builders.get(cid) and not store.get('foreign_states')
+        inherited = False
+        if entry is None and shareable:
+            shared = self._shared_renders.get(cid)
+            if shared is not None and shared[3] is builder:
+                entry = shared[:3]
+                inherited = tracker.inherits(cid)
+        if entry is not None and versions_current(store, entry[0]):
+            if not inherited:
+                for state_name in entry[1]:
+                    tracker.register_dependency(state_name, cid)
+            reads = current_reads()
+            if reads is not None:
+                reads.update(entry[0])
+            return entry[2]
+        count = store['component_count']
+        with recording_reads() as reads:
+            comp = builder()
+        leaf = store['component_count'] == count
+        leaves = store.setdefault('leaf_components', set())
+        if leaf and not cid.startswith(('if_', 'for_', 'reactivity_', 'fragment_')):
+            leaves.add(cid)
+        else:
+            leaves.discard(cid)
+        if not reads or None in reads or isinstance(comp, PatchComponent):
+            cache.pop(key, None)
+            return comp
+        # Tag-less Component renders its content verbatim
+        comp = Component(None, comp.id, content=comp.render())
+        entry = cache[key] = (read_versions(store, reads), tuple(tracker.dependencies.get(cid, ())), comp)
+        if (shareable and leaf
+                and not any(v for v in entry[0].values())
+                and not any(name.startswith(COMPUTED_PREFIX) for name in entry[0])):
+            self._shared_renders[cid] = entry + (builder,)
+            self._shared_tracker.share(cid, entry[1])
+        return comp
+
+    def _drop_render_cache(self, store, cid: str):
+        cache = store['render_cache']
+        cache.pop((cid, False), None)
+        cache.pop((cid, True), None)
+
+    def _take_patch_ops(self, cid: str, source: Any) -> Optional[List[Dict[str, Any]]]:
+        """Return the structural ops recorded for ``source`` if ``cid`` may be
+        updated incrementally in this dirty render, else None.
+        
+        Only root-level dirty renders in WS mode qualify; a nested render
+        (e.g. a For inside a re-rendering If) always produces full HTML.
+        """
+        if not isinstance(source, CollectionState) or not self._can_patch():
+            return None
+        pending = get_session_store().get('render_patches')
+        if not pending:
+            return None
+        entry = pending.pop(cid, None)
+        if entry is None or entry[0] != source.name:
+            return None
+        return entry[1]
+
+    def _can_patch(self) -> bool:
+        """True while a root-level builder runs inside _get_dirty_rendered in
+        WS mode, i.e. when the client is known to hold the previous HTML."""
+        return (
+            self.mode == 'ws'
+            and rendering_ctx.get() is None
+            and get_session_store().get('render_patches') is not None
+        )
+
+    def _reconcile_keyed(self, cid: str, current_items, key_fn: Callable, render_entry: Callable,
+                         positional: bool = False, can_patch: bool = False) -> Component:
+        """Render a keyed For, reusing cached item entries.
+        
+        An item is re-rendered when its key is new, its value changed (==
+        against a snapshot taken when it was rendered, see _item_snapshot),
+        a state read while rendering it (also by components inside it) was
+        set since (version mismatch),
+        its cached HTML was invalidated (a component inside it re-rendered on
+        its own), or, for index-aware render functions, its index moved.
+        Returns a PatchComponent with insert/move/update/remove ops when the
+        client holds the previous render, otherwise the full container.
+        """
+        store = get_session_store()
+        tracker = store['tracker']
+        cache = store['for_cache'].get(cid) or {'keys': [], 'entries': {}}
+        old_keys, old_entries = cache['keys'], cache['entries']
+        
+        reads = current_reads()
+        new_keys, new_entries, changed = [], {}, set()
+        for idx, item in enumerate(current_items):
+            k = key_fn(item)
+            if k in new_entries:
+                raise ValueError(f"For(key=...) returned duplicate key {k!r}")
+            entry = old_entries.get(k)
+            if (entry is None or entry['html'] is None
+                    or (positional and entry['idx'] != idx)
+                    or not versions_current(store, entry['reads'])
+                    or not _values_equal('eq', entry['item'], item)):
+                if entry is not None:
+                    self._drop_keyed_entry(store, tracker, entry)
+                entry = render_entry(item, idx, k)
+                changed.add(k)
+            else:
+                for state_name in entry['deps']:
+                    tracker.register_dependency(state_name, cid)
+                if reads is not None:
+                    reads.update(entry['reads'])
+            new_keys.append(k)
+            new_entries[k] = entry
+        for k, entry in old_entries.items():
+            if k not in new_entries:
+                self._drop_keyed_entry(store, tracker, entry)
+        store['for_cache'][cid] = {'keys': new_keys, 'entries': new_entries}
+        
+        if can_patch and old_keys:
+            ops = self._keyed_ops(old_keys, new_keys, new_entries, changed)
+            if ops is not None:
+                return PatchComponent(cid, ops)
+        content = '\n'.join(new_entries[k]['html'] for k in new_keys)
+        return Component("div", id=cid, content=content, class_="for-block")
+
+    @staticmethod
+    def _keyed_ops(old_keys: List[Any], new_keys: List[Any], entries: Dict[Any, Dict],
+                   changed: Set[Any]) -> Optional[List[Dict[str, Any]]]:
+        """Diff two key orders into client DOM ops (None if a full render is cheaper)."""
+        limit = max(8, len(new_keys) // 2)
+        ops = []
+        for i in range(len(old_keys) - 1, -1, -1):
+            if old_keys[i] not in entries:
+                ops.append({'op': 'remove', 'index': i})
+        if len(ops) > limit:
+            return None
+        old_set = set(old_keys)
+        cur = [k for k in old_keys if k in entries]
+        for i, k in enumerate(new_keys):
+            if i < len(cur) and cur[i] == k:
+                if k in changed:
+                    ops.append({'op': 'update', 'index': i, 'html': entries[k]['html']})
+            elif k in old_set:
+                j = cur.index(k, i)
+                cur.insert(i, cur.pop(j))
+                ops.append({'op': 'move', 'from': j, 'index': i})
+                if k in changed:
+                    ops.append({'op': 'update', 'index': i, 'html': entries[k]['html']})
+            else:
+                cur.insert(i, k)
+                ops.append({'op': 'insert', 'index': i, 'html': entries[k]['html']})
+            if len(ops) > limit:
+                return None
+        return ops
+
+    def _drop_component(self, store, tracker, cid: str):
+        """Forget a component of the session that is no longer rendered."""
+        tracker.unregister_component(cid)
+        self._drop_render_cache(store, cid)
+        store['builders'].pop(cid, None)
+        store['actions'].pop(cid, None)
+        store['for_owners'].pop(cid, None)
+
+    def _drop_keyed_entry(self, store, tracker, entry: Dict[str, Any]):
+        """Forget the components created for one keyed For item."""
+        for owned_cid in entry['cids']:
+            self._drop_component(store, tracker, owned_cid)
+
+    def _replace_page_components(self, store, cid: str, owned: List[str]):
+        """Record the components a run of page renderer ``cid`` created and
+        forget those of its previous run, which would otherwise stay
+        subscribed (and be re-rendered and pushed) for the session's life.
+        
+        When a page load re-ran the page, other open tabs of the session
+        still show the previous components: the new page is pushed to them
+        after the load (see _push_replaced_pages). Lite mode cannot push, so
+        it keeps previous runs' components for its other tabs.
+        """
+        if self.mode != 'ws':
+            return
+        pages = store.setdefault('page_components', {})
+        stale = set(pages.get(cid, ())).difference(owned)
+        pages[cid] = owned
+        if not stale:
+            return
+        tracker = store['tracker']
+        for stale_cid in stale:
+            self._drop_component(store, tracker, stale_cid)
+            if stale_cid in store['for_cache']:
+                self._drop_keyed_cache(stale_cid)
+        store['sidebar_order'] = [c for c in store['sidebar_order'] if c not in stale]
+        if initial_render_ctx.get():
+            store.setdefault('replaced_pages', {})[cid] = None
+
+    async def _push_replaced_pages(self, sid: Optional[str], store):
+        """Send the pages a page load re-rendered to the session's open tabs."""
+        replaced = store.pop('replaced_pages', None)
+        if not replaced or self.mode != 'ws' or sid not in self.ws_engine.sockets:
+            return
+        await self.ws_engine.push_updates(sid, [
+            Component(None, page_cid, content=html) for page_cid, html in replaced.items() if html is not None])
+
+    def _drop_keyed_cache(self, cid: str):
+        store = get_session_store()
+        cache = store['for_cache'].pop(cid, None)
+        if cache:
+            for entry in cache['entries'].values():
+                self._drop_keyed_entry(store, store['tracker'], entry)
+
+    def _patch_ops(self, ops: List[Dict[str, Any]], size: int, render_item: Callable,
+                   reverse: bool = False, positional: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Translate recorded collection ops into client DOM ops.
+        
+        Args:
+            ops: Ops recorded by a CollectionState since the last push
+            size: Current number of items
+            render_item: Function(item, index) returning one item's wrapper HTML
+            reverse: Items are displayed in reverse order
+            positional: Items render their index, so ops that shift other
+                        items cannot be applied incrementally
+        
+        Returns None when a full re-render is required (or cheaper).
+        """
+        first = ops[0]
+        prev_size = first['size'] - {'insert': 1, 'remove': -1}.get(first['op'], 0)
+        if prev_size == 0 or size == 0 or len(ops) > max(8, size // 2):
+            return None
+        
+        dom_ops = []
+        for op in ops:
+            kind, index, n = op['op'], op['index'], op['size']
+            if positional and ((kind == 'insert' and index != n - 1) or (kind == 'remove' and index != n)):
+                return None
+            dom_index = index
+            if reverse:
+                dom_index = n - index if kind == 'remove' else n - 1 - index
+            entry = {'op': kind, 'index': dom_index}
+            if kind != 'remove':
+                entry['html'] = render_item(op['item'], index)
+            dom_ops.append(entry)
+        return dom_ops
+
     # Theme and settings methods
     def set_theme(self, p):
         """Set theme preset"""
@@ -1168,9 +2229,9 @@ class App(
             return
 
         async def _push():
-            for sid, ws_sock in list(self.ws_engine.sockets.items()):
+            for sid in list(self.ws_engine.sockets):
                 try:
-                    await ws_sock.send_json({
+                    await self.ws_engine.send(sid, {
                         'type': 'interval_ctrl',
                         'id':   interval_id,
                         'action': action,
@@ -1178,13 +2239,9 @@ class App(
                 except Exception:
                     pass
 
-        def _run():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(_push())
-            loop.close()
-
-        threading.Thread(target=_run, daemon=True).start()
+        # Outboxes belong to the server loop (callers may be worker threads)
+        if self._main_loop is not None and self._main_loop.is_running():
+            asyncio.run_coroutine_threadsafe(_push(), self._main_loop)
 
     # ─── End Interval API ─────────────────────────────────────────
 
@@ -1356,6 +2413,8 @@ class App(
                             previous_fragments = {k: v.copy() for k, v in store['fragment_components'].items()}
                             store['order'] = []
                             store['fragment_components'] = {}  # Clear fragments to prevent duplicates
+                            prev_sink = store.get('cid_sink')
+                            store['cid_sink'] = owned = []
                             
                             try:
                                 # Start executing page function
@@ -1377,11 +2436,16 @@ class App(
                                         htmls.append(builder().render())
                                 
                                 content = '\n'.join(htmls)
-                                return Component("div", id=cid, content=content, class_="page-container")
+                                page = Component("div", id=cid, content=content, class_="page-container")
                             finally:
                                 # Restore previous state (always, even on exception)
                                 store['order'] = previous_order
                                 store['fragment_components'] = previous_fragments
+                                store['cid_sink'] = prev_sink
+                            if prev_sink is not None:
+                                prev_sink.extend(owned)
+                            self.app._replace_page_components(store, cid, owned)
+                            return page
                         
                         return Component("div", id=cid, content="", class_="page-container")
                     finally:
@@ -1478,21 +2542,9 @@ class App(
         async def index(request: Request):
             # Note: _theme_state, _selection_state, _animation_state and their updaters
             # are already initialized in __init__, no need to re-initialize here
-            
-            # [CRITICAL] Set initial_render_ctx to True during first page load
-            # This allows widgets (like charts) to defer heavy data serialization
-            token = initial_render_ctx.set(True)
-            try:
-                main_c, sidebar_c = self._render_all()
-            finally:
-                initial_render_ctx.reset(token)
-                
             store = get_session_store()
             t = store['theme']
             
-            sidebar_style = "" if (sidebar_c or self.static_sidebar_order) else "display: none;"
-            main_class = "" if (sidebar_c or self.static_sidebar_order) else "sidebar-collapsed"
-            
             # Generate CSRF token
             # Get sid from context (set by middleware) instead of cookies (not set yet on first visit)
             try:
@@ -1502,80 +2554,27 @@ class App(
             
             csrf_token = self._generate_csrf_token(sid) if sid and self.csrf_enabled else ""
             csrf_script = f'<script>window._csrf_token = "{csrf_token}";</script>' if csrf_token else ""
+            if sid and self.lite_engine is not None:
+                # Fresh page: nothing swapped into other pages applies to its DOM
+                tab = self.lite_engine.new_tab(sid)
+                csrf_script += f'<script>window._tab_id = "{tab}";</script>'
             
             if self.debug_mode:
                 print(f"[DEBUG] Session ID: {sid[:8] if sid else 'None'}...")
                 print(f"[DEBUG] CSRF enabled: {self.csrf_enabled}")
                 print(f"[DEBUG] CSRF token generated: {bool(csrf_token)}")
             
-            # Debug flag injection
-            debug_script = f'<script>window._debug_mode = {str(self.debug_mode).lower()};</script>'
-            
-            # Vendor Resources Selection
-            if self.use_cdn:
-                vendor_resources = """
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@shoelace-style/shoelace@2.12.0/cdn/themes/light.css" />
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@shoelace-style/shoelace@2.12.0/cdn/themes/dark.css" />
-    <script type="module" src="https://cdn.jsdelivr.net/npm/@shoelace-style/shoelace@2.12.0/cdn/shoelace-autoloader.js"></script>
-    <script src="https://unpkg.com/htmx.org@1.9.10" defer></script>
-    <script src="https://cdn.jsdelivr.net/npm/ag-grid-community@31.0.0/dist/ag-grid-community.min.js" defer></script>
-    <script src="https://cdn.plot.ly/plotly-2.27.0.min.js" defer></script>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600&display=swap" rel="stylesheet">
-    <script src="https://cdn.jsdelivr.net/npm/@master/css-runtime@2.0.0-rc.67/dist/global.min.js" defer></script>
-    <script src="https://cdn.jsdelivr.net/gh/highlightjs/cdn-release@11.9.0/build/highlight.min.js" defer></script>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/highlightjs/cdn-release@11.9.0/build/styles/atom-one-dark.min.css" />
-    <style>
-        .violit-code-light pre code.hljs { background: transparent !important; }
-        .violit-code-dark pre code.hljs { background: transparent !important; }
-    </style>
-                """
-            else:
-                # Local/Offline Mode
-                # Note: Shoelace autoloader might need full assets for some components.
-                # Basic components should work with the downloaded files.
-                # Added 'defer' to non-critical heavy scripts to unblock rendering (LCP/FCP improvement)
-                vendor_resources = """
-    <link rel="stylesheet" href="/static/vendor/shoelace/themes/light.css" />
-    <link rel="stylesheet" href="/static/vendor/shoelace/themes/dark.css" />
-    <script type="module" src="/static/vendor/shoelace/shoelace-autoloader.js"></script>
-    <script src="/static/vendor/htmx/htmx.min.js" defer></script>
-    <script src="/static/vendor/ag-grid/ag-grid-community.min.js" defer></script>
-    <script src="/static/vendor/plotly/plotly-2.27.0.min.js" defer></script>
-    <script src="/static/vendor/master-css/master-css-runtime.js" defer></script>
-    <script src="/static/vendor/highlightjs/highlight.min.js" defer></script>
-    <link rel="stylesheet" href="/static/vendor/highlightjs/atom-one-dark.min.css" />
-    <style>
-        .violit-code-light pre code.hljs { background: transparent !important; }
-        .violit-code-dark pre code.hljs { background: transparent !important; }
-    </style>
-    <!-- Fonts: Inter (local vendor woff2) -->
-    <style>
-        @font-face {
-            font-family: 'Inter';
-            font-style: normal;
-            font-weight: 100 900;
-            font-display: swap;
-            src: url('/static/vendor/fonts/inter/inter-latin-ext.woff2') format('woff2');
-            unicode-range: U+0100-02BA, U+02BD-02C5, U+02C7-02CC, U+02CE-02D7, U+02DD-02FF, U+0304, U+0308, U+0329, U+1D00-1DBF, U+1E00-1E9F, U+1EF2-1EFF, U+2020, U+20A0-20AB, U+20AD-20C0, U+2113, U+2C60-2C7F, U+A720-A7FF;
-        }
-        @font-face {
-            font-family: 'Inter';
-            font-style: normal;
-            font-weight: 100 900;
-            font-display: swap;
-            src: url('/static/vendor/fonts/inter/inter-latin.woff2') format('woff2');
-            unicode-range: U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD;
-        }
-    </style>
-                """
-
-            # Build user CSS from add_css() calls
-            user_css = ""
-            if self._user_css:
-                user_css = "<style id=\"violit-user-css\">\n" + "\n".join(self._user_css) + "\n</style>"
-            
-            html = HTML_TEMPLATE.replace("%CONTENT%", main_c).replace("%SIDEBAR_CONTENT%", sidebar_c).replace("%SIDEBAR_STYLE%", sidebar_style).replace("%MAIN_CLASS%", main_class).replace("%MODE%", self.mode).replace("%TITLE%", self.app_title).replace("%THEME_CLASS%", t.theme_class).replace("%CSS_VARS%", t.to_css_vars()).replace("%SPLASH%", self._splash_html if self.show_splash else "").replace("%CONTAINER_MAX_WIDTH%", self.container_max_width).replace("%CSRF_SCRIPT%", csrf_script).replace("%DEBUG_SCRIPT%", debug_script).replace("%VENDOR_RESOURCES%", vendor_resources).replace("%USER_CSS%", user_css)
-            return HTMLResponse(html)
+            values = {'THEME_CLASS': t.theme_class, 'CSS_VARS': t.to_css_vars(), 'CSRF_SCRIPT': csrf_script}
+            if self.stream_index:
+                return StreamingResponse(self._stream_page(sid, values), media_type="text/html")
+            # Renders run the builders against the session store: not while
+            # an action of the session (maybe in the threadpool) changes it
+            async with self._session_lock(sid):
+                self._sync_session(store)
+                values.update(await self._render_page_body_async())
+                self._flush_session(store)
+                await self._push_replaced_pages(sid, store)
+            return HTMLResponse(self._render_page(**values))
 
         @self.fastapi.post("/action/{cid}")
         async def action(request: Request, cid: str):
@@ -1598,6 +2597,7 @@ class App(
             
             v = f.get("value")
             store = get_session_store()
+            await self._enter_session(sid, store)
             act = store['actions'].get(cid) or self.static_actions.get(cid)
             if act:
                 if not callable(act):
@@ -1605,84 +2605,106 @@ class App(
                     self.debug_print(f"ERROR: Action for {cid} is not callable. Got: {type(act)} = {repr(act)}")
                     return HTMLResponse("")
                 
-                store['eval_queue'] = []
-                act(v) if v is not None else act()
-                
-                dirty = self._get_dirty_rendered()
+                def run_action():
+                    store['eval_queue'] = []
+                    invoke(act, v) if v is not None else invoke(act)
                 
-                # Separate clicked component from other updates
-                clicked_component = None
-                other_dirty = []
-                for c in dirty:
-                    if c.id == cid:
-                        clicked_component = c
+                def render():
+                    dirty = self._get_dirty_rendered()
+                    
+                    # Separate clicked component from other updates
+                    clicked_component = None
+                    other_dirty = []
+                    for c in dirty:
+                        if c.id == cid:
+                            clicked_component = c
+                        else:
+                            other_dirty.append(c)
+                    
+                    # Re-render clicked component if not dirty
+                    if clicked_component is None:
+                        builder = store['builders'].get(cid) or self.static_builders.get(cid)
+                        if builder:
+                            clicked_component = self._build(store, cid, builder)
+                    
+                    return clicked_component, other_dirty
+                    
+                # One action per session at a time, in arrival order
+                async with self._session_lock(sid):
+                    await self._run_action(('action', cid), run_action)
+                    await self._settle(store)
+                    clicked_component, other_dirty = await self._run_action(('render', cid), render)
+                    if clicked_component is not None:
+                        clicked_component, *other_dirty = await self._finish_render(store, [clicked_component] + other_dirty)
                     else:
-                        other_dirty.append(c)
-                
-                # Re-render clicked component if not dirty
-                if clicked_component is None:
-                    builder = store['builders'].get(cid) or self.static_builders.get(cid)
-                    if builder:
-                        clicked_component = builder()
-                
-                # Build response: clicked component HTML + OOB for others
-                response_html = clicked_component.render() if clicked_component else ""
-                response_html += self.lite_engine.wrap_oob(other_dirty)
-                
-                # Process Toasts
-                toasts = store.get('toasts', [])
-                if toasts:
-                    import html as html_lib
-                    toasts_json = json.dumps(toasts)
-                    toasts_escaped = html_lib.escape(toasts_json)
+                        other_dirty = await self._finish_render(store, other_dirty)
+                    self._flush_session(store)
                     
-                    toast_injector = f'''<div id="toast-injector" hx-swap-oob="true" data-toasts="{toasts_escaped}">
-                    <script>
-                    (function() {{
-                        var container = document.getElementById('toast-injector');
-                        if (!container) return;
-                        var toastsAttr = container.getAttribute('data-toasts');
-                        if (!toastsAttr) return;
-                        var toasts = JSON.parse(toastsAttr);
-                        toasts.forEach(function(t) {{
-                            if (typeof createToast === 'function') {{
-                                createToast(t.message, t.variant, t.icon);
-                            }}
-                        }});
-                        container.removeAttribute('data-toasts');
-                    }})();
-                    </script>
-                    </div>'''
-                    response_html += toast_injector
-                    store['toasts'] = []
-                
-                # Process Effects (Balloons, Snow)
-                effects = store.get('effects', [])
-                if effects:
-                    effects_json = json.dumps(effects)
-                    effect_injector = f'''<div id="effects-injector" hx-swap-oob="true" data-effects='{effects_json}'>
-                    <script>
-                    (function() {{
-                        const container = document.getElementById('effects-injector');
-                        if (!container) return;
-                        const effects = JSON.parse(container.getAttribute('data-effects'));
-                        effects.forEach(e => {{
-                            if (e === 'balloons') createBalloons();
-                            if (e === 'snow') createSnow();
-                        }});
-                        container.removeAttribute('data-effects');
-                    }})();
-                    </script>
-                    </div>'''
-                    response_html += effect_injector
-                    store['effects'] = []
-                
-                return HTMLResponse(response_html)
+                    # Build response: clicked component HTML + OOB for others
+                    response_html = clicked_component.render() if clicked_component else ""
+                    tab_key = self.lite_engine.tab_key(sid, f.get("_tab"))
+                    if clicked_component is not None and tab_key:
+                        # Swapped (or not) by the element's own hx-target: not recorded
+                        self.lite_engine.sent.remember(tab_key, cid, inner_html=response_html)
+                    response_html += self.lite_engine.wrap_oob(other_dirty, tab_key)
+                    
+                    # Process Toasts
+                    toasts = store.get('toasts', [])
+                    if toasts:
+                        import html as html_lib
+                        toasts_json = json.dumps(toasts)
+                        toasts_escaped = html_lib.escape(toasts_json)
+                    
+                        toast_injector = f'''<div id="toast-injector" hx-swap-oob="true" data-toasts="{toasts_escaped}">
+                        <script>
+                        (function() {{
+                            var container = document.getElementById('toast-injector');
+                            if (!container) return;
+                            var toastsAttr = container.getAttribute('data-toasts');
+                            if (!toastsAttr) return;
+                            var toasts = JSON.parse(toastsAttr);
+                            toasts.forEach(function(t) {{
+                                if (typeof createToast === 'function') {{
+                                    createToast(t.message, t.variant, t.icon);
+                                }}
+                            }});
+                            container.removeAttribute('data-toasts');
+                        }})();
+                        </script>
+                        </div>'''
+                        response_html += toast_injector
+                        store['toasts'] = []
+                    
+                    # Process Effects (Balloons, Snow)
+                    effects = store.get('effects', [])
+                    if effects:
+                        effects_json = json.dumps(effects)
+                        effect_injector = f'''<div id="effects-injector" hx-swap-oob="true" data-effects='{effects_json}'>
+                        <script>
+                        (function() {{
+                            const container = document.getElementById('effects-injector');
+                            if (!container) return;
+                            const effects = JSON.parse(container.getAttribute('data-effects'));
+                            effects.forEach(e => {{
+                                if (e === 'balloons') createBalloons();
+                                if (e === 'snow') createSnow();
+                            }});
+                            container.removeAttribute('data-effects');
+                        }})();
+                        </script>
+                        </div>'''
+                        response_html += effect_injector
+                        store['effects'] = []
+                    
+                    return HTMLResponse(response_html)
             return HTMLResponse("")
 
         @self.fastapi.websocket("/ws")
         async def ws(ws: WebSocket):
-            await ws.accept()
+            offered = [p for p in ws.scope.get('subprotocols', [])
+                       if p[len(wire.SUBPROTOCOL_PREFIX):] in self.wire_formats]
+            codec, subprotocol = wire.negotiate(offered)
+            await ws.accept(subprotocol=subprotocol)
             
             # Session ID: get from cookie (all tabs share same session)
             sid = ws.cookies.get("ss_sid") or str(uuid.uuid4())
@@ -1697,7 +2719,10 @@ class App(
             
             # Set session context (outside while loop - very important!)
             t = session_ctx.set(sid)
-            self.ws_engine.sockets[sid] = ws
+            self.ws_engine.connect(sid, ws, codec)
+            pending_reclaim = self._reclaim_tasks.pop(sid, None)
+            if pending_reclaim is not None:
+                pending_reclaim.cancel()
             
             # Message processing function
             async def process_message(data):
@@ -1705,20 +2730,31 @@ class App(
                 
                 # ── Interval tick handler ──────────────────────────
                 if msg_type == 'tick':
+                    # Every tab runs the interval timers: tick once per session
+                    if not self.ws_engine.is_primary(sid, ws):
+                        return
                     interval_id = data.get('id')
                     info = self._interval_callbacks.get(interval_id)
                     if info and info['state'] == 'running':
                         condition = info.get('condition')
+                        store = get_session_store()
+                        await self._enter_session(sid, store)
                         if condition is None or condition():
-                            store = get_session_store()
-                            store['eval_queue'] = []
-                            info['callback']()
-                            for code in store.get('eval_queue', []):
-                                await self.ws_engine.push_eval(sid, code)
-                            store['eval_queue'] = []
-                            dirty = self._get_dirty_rendered()
-                            if dirty:
-                                await self.ws_engine.push_updates(sid, dirty)
+                            def run_callback():
+                                store['eval_queue'] = []
+                                invoke(info['callback'])
+                            
+                            async with self._session_lock(sid):
+                                await self._run_action(('action', interval_id), run_callback)
+                                await self._settle(store)
+                                dirty = await self._run_action(('render', interval_id), self._get_dirty_rendered)
+                                dirty = await self._finish_render(store, dirty)
+                                self._flush_session(store)
+                                for code in store.get('eval_queue', []):
+                                    await self.ws_engine.push_eval(sid, code)
+                                store['eval_queue'] = []
+                                if dirty:
+                                    await self.ws_engine.push_updates(sid, dirty)
                     return
                 # ── End interval tick handler ──────────────────────
                 
@@ -1736,7 +2772,7 @@ class App(
                     native_token = data.get('_native_token')
                     if native_token != self.native_token:
                         self.debug_print(f"  [X] Native token mismatch!")
-                        await ws.send_json({"type": "error", "message": "Invalid native token"})
+                        await self.ws_engine.send(sid, {"type": "error", "message": "Invalid native token"})
                         return
                     else:
                         self.debug_print(f"  [OK] Native token valid - Skipping CSRF check")
@@ -1746,13 +2782,14 @@ class App(
                         csrf_token = data.get('_csrf_token')
                         if not csrf_token or not self._verify_csrf_token(sid, csrf_token):
                             self.debug_print(f"  [X] CSRF token invalid")
-                            await ws.send_json({"type": "error", "message": "Invalid CSRF token"})
+                            await self.ws_engine.send(sid, {"type": "error", "message": "Invalid CSRF token"})
                             return
                         else:
                             self.debug_print(f"  [OK] CSRF token valid")
                 
                 cid, v = data.get('id'), data.get('value')
                 store = get_session_store()
+                await self._enter_session(sid, store)
                 act = store['actions'].get(cid) or self.static_actions.get(cid)
                 
                 self.debug_print(f"  Action found: {act is not None}")
@@ -1761,37 +2798,74 @@ class App(
                 is_navigation = cid.startswith('nav_menu')
                 
                 if act:
-                    store['eval_queue'] = []
-                    self.debug_print(f"  Executing action for CID: {cid} (navigation={is_navigation})...")
-                    act(v) if v is not None else act()
-                    self.debug_print(f"  Action executed")
+                    def run_action():
+                        store['eval_queue'] = []
+                        self.debug_print(f"  Executing action for CID: {cid} (navigation={is_navigation})...")
+                        invoke(act, v) if v is not None else invoke(act)
                     
-                    for code in store.get('eval_queue', []):
-                        await self.ws_engine.push_eval(sid, code)
-                    store['eval_queue'] = []
-                    
-                    dirty = self._get_dirty_rendered()
-                    self.debug_print(f"  Dirty components: {len(dirty)} ({[c.id for c in dirty]})")
-                    
-                    # Send all dirty components via WebSocket
-                    # Pass is_navigation flag to enable/disable smooth transitions
-                    if dirty:
-                        self.debug_print(f"  Sending {len(dirty)} updates via WebSocket (navigation={is_navigation})...")
-                        await self.ws_engine.push_updates(sid, dirty, is_navigation=is_navigation)
-                        self.debug_print(f"  [OK] Updates sent successfully")
-                    else:
-                        self.debug_print(f"  [!] No dirty components found - nothing to update")
+                    # One action per session at a time, in arrival order
+                    async with self._session_lock(sid):
+                        await self._run_action(('action', cid), run_action)
+                        await self._settle(store)
+                        self.debug_print(f"  Action executed")
+                        dirty = await self._run_action(('render', cid), self._get_dirty_rendered)
+                        dirty = await self._finish_render(store, dirty)
+                        self._flush_session(store)
+                        
+                        for code in store.get('eval_queue', []):
+                            await self.ws_engine.push_eval(sid, code)
+                        store['eval_queue'] = []
+                        
+                        self.debug_print(f"  Dirty components: {len(dirty)} ({[c.id for c in dirty]})")
+                        
+                        # Send all dirty components via WebSocket
+                        # Pass is_navigation flag to enable/disable smooth transitions
+                        if dirty:
+                            self.debug_print(f"  Sending {len(dirty)} updates via WebSocket (navigation={is_navigation})...")
+                            await self.ws_engine.push_updates(sid, dirty, is_navigation=is_navigation)
+                            self.debug_print(f"  [OK] Updates queued")
+                        else:
+                            self.debug_print(f"  [!] No dirty components found - nothing to update")
+            
+            # Frames are read by their own task, so messages arriving while an
+            # action runs queue up in the inbox (clicks before ticks, stale
+            # ticks and superseded clicks dropped; see Inbox, _superseded)
+            inbox = Inbox(self.ws_engine.max_pending)
+            close_code = [1000]
+            
+            async def receive_frames():
+                try:
+                    while True:
+                        message = await ws.receive()
+                        if message["type"] == "websocket.disconnect":
+                            close_code[0] = message.get("code", 1000)
+                            break
+                        data = wire.decode_frame(codec, message)
+                        if data is not None and await inbox.put(data):
+                            self.ws_engine.stats['stale_ticks'] += 1
+                finally:
+                    inbox.close()
             
+            reader = asyncio.create_task(receive_frames())
             try:
                 # Message processing loop
                 while True:
-                    data = await ws.receive_json()
+                    data = await inbox.get()
+                    if data is None:
+                        await reader  # re-raises a receive/decode error
+                        raise WebSocketDisconnect(close_code[0])
+                    if self._superseded(data, inbox.messages):
+                        self.ws_engine.stats['coalesced_clicks'] += 1
+                        continue
                     await process_message(data)
             except WebSocketDisconnect:
-                if sid and sid in self.ws_engine.sockets: 
-                    del self.ws_engine.sockets[sid]
-                    self.debug_print(f"[WEBSOCKET] Disconnected: {sid[:8]}...")
+                self.debug_print(f"[WEBSOCKET] Disconnected: {sid[:8]}...")
             finally:
+                reader.cancel()
+                # Other tabs of the session may still be connected
+                self.ws_engine.disconnect(sid, ws)
+                if sid not in self.ws_engine.sockets and self.disconnect_reclaim is not None:
+                    self._reclaim_tasks[sid] = asyncio.create_task(self._reclaim_after_grace(sid))
                 if t is not None:
                     session_ctx.reset(t)
 
@@ -1846,7 +2920,8 @@ class App(
                     reload=True,
                     reload_dirs=[reload_dir],
                     reload_includes=["*.py"], # 속도 확보를 위해 py 확장자만 감시
-                    reload_delay=0.1  # Reduce watch delay from 0.25s (default) to 0.1s
+                    reload_delay=0.1,  # Reduce watch delay from 0.25s (default) to 0.1s
+                    ws_per_message_deflate=self.ws_compression,
                 )
             except Exception as e:
                 self.debug_print(f"[HOT RELOAD] Failed to start uvicorn: {e}")
@@ -2087,7 +3162,7 @@ class App(
                 print(f"INFO:     Violit desktop app running on port {args.port}")
             
             def srv(): 
-                uvicorn.run(self.fastapi, host="127.0.0.1", port=args.port)
+                uvicorn.run(self.fastapi, host="127.0.0.1", port=args.port, ws_per_message_deflate=self.ws_compression)
             
             t = threading.Thread(target=srv, daemon=True)
             t.start()
@@ -2136,7 +3211,7 @@ class App(
                 logging.getLogger("uvicorn.access").addFilter(_SuppressForbiddenAndRunningFilter())
                 logging.getLogger("uvicorn.error").addFilter(_SuppressForbiddenAndRunningFilter())
                 print(f"INFO:     Violit desktop app running on port {args.port} (hot reload)")
-            uvicorn.run(self.fastapi, host="0.0.0.0", port=args.port)
+            uvicorn.run(self.fastapi, host="0.0.0.0", port=args.port, ws_per_message_deflate=self.ws_compression)
         else:
             # Web mode: 커스텀 startup 메시지
             @self.fastapi.on_event("startup")
@@ -2149,9 +3224,12 @@ class App(
                 
                 reload_tag = " (hot reload)" if args.reload else ""
                 print(f"INFO:     Violit web app running on http://localhost:{args.port}{reload_tag}")
-            uvicorn.run(self.fastapi, host="0.0.0.0", port=args.port)
+            uvicorn.run(self.fastapi, host="0.0.0.0", port=args.port, ws_per_message_deflate=self.ws_compression)
 
 
+# HTML_TEMPLATE placeholders filled per request; the others are baked in once
+_PAGE_SLOTS = ('CONTENT', 'SIDEBAR_CONTENT', 'SIDEBAR_STYLE', 'MAIN_CLASS', 'THEME_CLASS', 'CSS_VARS', 'CSRF_SCRIPT')
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html class="%THEME_CLASS%">
@@ -2447,10 +3525,12 @@ HTML_TEMPLATE = """
         };
         
         // [LOCK] HTMX에 CSRF 토큰 자동 추가 (Lite Mode)
-        if (mode === 'lite' && window._csrf_token) {
+        // The tab id lets the server skip swaps only for what this page shows
+        if (mode === 'lite' && (window._csrf_token || window._tab_id)) {
             document.addEventListener('DOMContentLoaded', function() {
                 document.body.addEventListener('htmx:configRequest', function(evt) {
-                    evt.detail.parameters['_csrf_token'] = window._csrf_token;
+                    if (window._csrf_token) evt.detail.parameters['_csrf_token'] = window._csrf_token;
+                    if (window._tab_id) evt.detail.parameters['_tab'] = window._tab_id;
                 });
             });
         }
@@ -2655,8 +3735,71 @@ HTML_TEMPLATE = """
                 }
             };
             
+            // sendAction for inputs that stream values (debounce_ms / throttle_ms):
+            // debounce waits for a pause, throttle sends at most once per period
+            // (trailing value included); with both, a pending send is held back
+            // at most throttleMs. With neither, any pending send is replaced now.
+            window._rateLimits = {};
+            window.sendActionLimited = (cid, val, debounceMs, throttleMs) => {
+                const rl = window._rateLimits[cid] || (window._rateLimits[cid] = {timer: null, last: 0, since: 0});
+                const now = Date.now();
+                rl.val = val;
+                if (rl.timer) clearTimeout(rl.timer); else rl.since = now;
+                rl.timer = null;
+                const flush = () => { rl.timer = null; rl.last = Date.now(); window.sendAction(cid, rl.val); };
+                let wait = 0;
+                if (debounceMs) wait = throttleMs ? Math.min(debounceMs, throttleMs - (now - rl.since)) : debounceMs;
+                else if (throttleMs) wait = throttleMs - (now - rl.last);
+                if (wait > 0) rl.timer = setTimeout(flush, wait); else flush();
+            };
+            
             // Now connect WebSocket
-            window._ws = new WebSocket((location.protocol === 'https:' ? 'wss:' : 'ws:') + "//" + location.host + "/ws");
+            // Minimal msgpack decoder for binary frames (server -> client only)
+            const textDecoder = new TextDecoder();
+            const decodeMsgpack = (buffer) => {
+                const bytes = new Uint8Array(buffer), view = new DataView(buffer);
+                let pos = 0;
+                const uint = (n) => { let v = 0; for (let i = 0; i < n; i++) v = v * 256 + bytes[pos++]; return v; };
+                const str = (n) => { const s = textDecoder.decode(bytes.subarray(pos, pos + n)); pos += n; return s; };
+                const arr = (n) => { const a = new Array(n); for (let i = 0; i < n; i++) a[i] = read(); return a; };
+                const map = (n) => { const o = {}; for (let i = 0; i < n; i++) { const k = read(); o[k] = read(); } return o; };
+                const fixed = (get, n) => { const v = view[get](pos); pos += n; return v; };
+                const read = () => {
+                    const t = bytes[pos++];
+                    if (t < 0x80) return t;
+                    if (t < 0x90) return map(t & 0x0f);
+                    if (t < 0xa0) return arr(t & 0x0f);
+                    if (t < 0xc0) return str(t & 0x1f);
+                    if (t >= 0xe0) return t - 0x100;
+                    switch (t) {
+                        case 0xc0: return null;
+                        case 0xc2: return false;
+                        case 0xc3: return true;
+                        case 0xc4: case 0xc5: case 0xc6: {
+                            const n = uint(1 << (t - 0xc4));
+                            pos += n;
+                            return bytes.slice(pos - n, pos);
+                        }
+                        case 0xca: return fixed('getFloat32', 4);
+                        case 0xcb: return fixed('getFloat64', 8);
+                        case 0xcc: case 0xcd: case 0xce: case 0xcf: return uint(1 << (t - 0xcc));
+                        case 0xd0: return fixed('getInt8', 1);
+                        case 0xd1: return fixed('getInt16', 2);
+                        case 0xd2: return fixed('getInt32', 4);
+                        case 0xd3: return Number(fixed('getBigInt64', 8));
+                        case 0xd9: case 0xda: case 0xdb: return str(uint(1 << (t - 0xd9)));
+                        case 0xdc: case 0xdd: return arr(uint(2 << (t - 0xdc)));
+                        case 0xde: case 0xdf: return map(uint(2 << (t - 0xde)));
+                    }
+                    throw new Error('msgpack: unsupported type 0x' + t.toString(16));
+                };
+                return read();
+            };
+            
+            // Offer the server's wire formats as subprotocols (see violit/wire.py);
+            // binary frames are msgpack, text frames JSON
+            window._ws = new WebSocket((location.protocol === 'https:' ? 'wss:' : 'ws:') + "//" + location.host + "/ws", %WIRE_PROTOCOLS%);
+            window._ws.binaryType = 'arraybuffer';
             
             // Auto-reconnect/reload logic
             window._ws.onclose = () => {
@@ -2711,15 +3854,98 @@ HTML_TEMPLATE = """
 
             window._ws.onmessage = (e) => {
                 debugLog("[WebSocket] Message received");
-                const msg = JSON.parse(e.data);
+                const msg = typeof e.data === 'string' ? JSON.parse(e.data) : decodeMsgpack(e.data);
                 if(msg.type === 'update') {
                     // Check if this is a navigation update (page transition)
                     // Server sends isNavigation flag based on action type
                     const isNavigation = msg.isNavigation === true;
                     
+                    // Structural patch (ListState/DictState): per-item DOM ops on the
+                    // container's children instead of replacing the whole component
+                    const applyOps = (item) => {
+                        const container = document.getElementById(item.target || item.id);
+                        if (!container) return;
+                        item.ops.forEach(op => {
+                            const current = container.children[op.index];
+                            if (op.op === 'remove') {
+                                if (current) { purgePlotly(current); current.remove(); }
+                                return;
+                            }
+                            if (op.op === 'move') {
+                                const moved = container.children[op.from];
+                                if (moved) {
+                                    moved.remove();
+                                    container.insertBefore(moved, container.children[op.index] || null);
+                                }
+                                return;
+                            }
+                            const tpl = document.createElement('template');
+                            tpl.innerHTML = op.html;
+                            const node = tpl.content.firstElementChild;
+                            if (!node) return;
+                            if (op.op === 'update' && current) {
+                                purgePlotly(current);
+                                current.replaceWith(node);
+                            } else {
+                                container.insertBefore(node, current || null);
+                            }
+                            // Template content is inert: execute item scripts explicitly
+                            node.querySelectorAll('script').forEach(s => {
+                                const script = document.createElement('script');
+                                script.textContent = s.textContent;
+                                document.body.appendChild(script);
+                                script.remove();
+                            });
+                        });
+                    };
+
+                    // DOM patch (server-side diff against the last HTML sent for this
+                    // component): ops address elements by their children-index path
+                    const applyPatch = (item) => {
+                        const root = document.getElementById(item.id);
+                        if (!root) return;
+                        const fromHtml = (html) => {
+                            const tpl = document.createElement('template');
+                            tpl.innerHTML = html;
+                            return tpl.content.firstElementChild;
+                        };
+                        item.patch.forEach(op => {
+                            let node = root;
+                            for (const i of op[1]) { node = node && node.children[i]; }
+                            if (!node) return;
+                            if (op[0] === 'a') {
+                                const name = op[2], value = op[3];
+                                if (value === null) node.removeAttribute(name);
+                                else node.setAttribute(name, value);
+                                // Attributes no longer drive these once the user interacted
+                                if (name === 'value' && 'value' in node) node.value = value === null ? '' : value;
+                                if (name === 'checked' && 'checked' in node) node.checked = value !== null;
+                            } else if (op[0] === 't') {
+                                node.textContent = op[2];
+                            } else if (op[0] === 'h') {
+                                const fresh = fromHtml(op[2]);
+                                if (fresh) { purgePlotly(node); node.replaceWith(fresh); }
+                            } else if (op[0] === 'i') {
+                                const fresh = fromHtml(op[3]);
+                                if (fresh) node.insertBefore(fresh, node.children[op[2]] || null);
+                            } else if (op[0] === 'r') {
+                                const child = node.children[op[2]];
+                                if (child) { purgePlotly(child); child.remove(); }
+                            }
+                        });
+                    };
+
                     // Helper function to apply updates
                     const applyUpdates = (items) => {
                         items.forEach(item => {
+                            if (item.ops) {
+                                applyOps(item);
+                                return;
+                            }
+                            if (item.patch) {
+                                applyPatch(item);
+                                return;
+                            }
                             const el = document.getElementById(item.id);
                             
                             // Focus Guard: Skip update if element is focused input to prevent interrupting typing
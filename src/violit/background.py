@@ -18,6 +18,7 @@ from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
 from typing import Any, Callable, Optional
 
 from .context import session_ctx
+from .state import get_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -257,33 +258,38 @@ class BackgroundTask:
 
     def _push_dirty_to_session(self, sid: str):
         """Push any dirty component updates to the specific user session."""
-        if not sid or not self._app.ws_engine:
+        if not sid:
             return
 
-        if sid not in self._app.ws_engine.sockets:
+        if not self._app.ws_engine or sid not in self._app.ws_engine.sockets:
             logger.debug(f"[background] Session {sid[:8]}... not connected, skipping push")
+            # Values set meanwhile still have to reach the session backend
+            self._app._flush_session(get_session_store())
             return
 
         try:
+            store = get_session_store()
             dirty = self._app._get_dirty_rendered()
-            if not dirty:
+            self._app._flush_session(store)
+            if not dirty and not store.get('pending_awaits'):
                 return
 
             main_loop = getattr(self._app, '_main_loop', None)
             if main_loop is not None and main_loop.is_running():
                 # Submit the coroutine to uvicorn's loop from this worker thread.
-                # run_coroutine_threadsafe is thread-safe and reuses the existing loop.
+                # run_coroutine_threadsafe is thread-safe and reuses the existing loop;
+                # the coroutine runs in a copy of this thread's context (session_ctx).
                 future = asyncio.run_coroutine_threadsafe(
-                    self._app.ws_engine.push_updates(sid, dirty),
+                    self._app._push_rendered(sid, store, dirty),
                     main_loop,
                 )
-                future.result(timeout=5)  # block until sent (or timeout)
+                future.result(timeout=5)  # block until queued (or timeout)
             else:
                 # Fallback: main loop not captured yet (e.g. HTMX/lite mode)
                 loop = asyncio.new_event_loop()
                 try:
                     loop.run_until_complete(
-                        self._app.ws_engine.push_updates(sid, dirty)
+                        self._app._push_rendered(sid, store, dirty)
                     )
                 finally:
                     loop.close()
@@ -1,7 +1,30 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 import html
 
+# prop name -> (attribute name, is event handler). 'class_' -> 'class-'
+_ATTR_SPECS: Dict[str, tuple] = {}
+
+# Rendered 'name="escaped value"' per (prop name, value). Widgets of one type
+# share most attribute values (class, variant, size, ...), so escaping them is
+# done once; the cache is dropped when full to bound memory for apps with many
+# distinct values. Long values (data, per-item text) are rarely shared and are
+# escaped directly, so they neither fill the cache nor evict the short ones.
+_ATTR_CACHE: Dict[tuple, str] = {}
+_ATTR_CACHE_SIZE = 4096
+_ATTR_CACHE_MAX_VALUE = 200
+
+
+def _attr_spec(k: str) -> tuple:
+    spec = _ATTR_SPECS.get(k)
+    if spec is None:
+        name = k.replace('_', '-') if not k.startswith('on') else k
+        spec = _ATTR_SPECS[k] = (name, name.startswith('on'))
+    return spec
+
+
 class Component:
+    __slots__ = ('tag', 'id', 'escape_content', 'props')
+
     def __init__(self, tag: Optional[str], id: str, escape_content: bool = False, **props):
         self.tag = tag
         self.id = id
@@ -9,34 +32,68 @@ class Component:
         self.props = props
 
     def render(self) -> str:
+        props = self.props
         if self.tag is None:
-            content = str(self.props.get('content', ''))
+            content = str(props.get('content', ''))
             # Escape content if enabled
             return html.escape(content) if self.escape_content else content
             
         attrs = []
-        for k, v in self.props.items():
+        specs = _ATTR_SPECS
+        cache = _ATTR_CACHE
+        for k, v in props.items():
             if k == 'content': continue
-            clean_k = k.replace('_', '-') if not k.startswith('on') else k
-            if clean_k.startswith('on'):
-                attrs.append(f'{clean_k}="{v}"')
+            name, handler = specs.get(k) or _attr_spec(k)
+            if handler:
+                attrs.append(f'{name}="{v}"')
+            elif v is True: attrs.append(name)
+            elif v is False or v is None: continue
+            elif name == 'style':
+                # Don't escape style attribute (CSS needs special characters like > + etc.)
+                attrs.append(f'{name}="{v}"')
+            elif v.__class__ is str:
+                if len(v) > _ATTR_CACHE_MAX_VALUE:
+                    attrs.append(f'{name}="{html.escape(v, quote=True)}"')
+                    continue
+                item = cache.get((k, v))
+                if item is None:
+                    # Escape attribute values for XSS protection
+                    item = f'{name}="{html.escape(v, quote=True)}"'
+                    if len(cache) >= _ATTR_CACHE_SIZE:
+                        cache.clear()
+                    cache[(k, v)] = item
+                attrs.append(item)
             else:
-                if v is True: attrs.append(clean_k)
-                elif v is False or v is None: continue
-                else: 
-                    # Don't escape style attribute (CSS needs special characters like > + etc.)
-                    if clean_k == 'style':
-                        attrs.append(f'{clean_k}="{v}"')
-                    else:
-                        # Escape attribute values for XSS protection
-                        escaped_v = html.escape(str(v), quote=True)
-                        attrs.append(f'{clean_k}="{escaped_v}"')
+                attrs.append(f'{name}="{html.escape(str(v), quote=True)}"')
         
         props_str = " ".join(attrs)
-        content = self.props.get('content', '')
+        content = props.get('content', '')
         
         # Escape content if enabled
         if self.escape_content:
             content = html.escape(str(content))
         
         return f"<{self.tag} id=\"{self.id}\" {props_str}>{content}</{self.tag}>"
+
+
+class PatchComponent(Component):
+    """Incremental update for an already-rendered container.
+
+    Instead of HTML, carries a list of per-child DOM ops applied on the client
+    to the element ``target`` (defaults to ``id``)::
+
+        {'op': 'insert' | 'update', 'index': i, 'html': '...'}
+        {'op': 'move', 'from': j, 'index': i}
+        {'op': 'remove', 'index': i}
+
+    Only produced for WebSocket pushes (see App._patch_ops).
+    """
+    __slots__ = ('ops', 'target')
+
+    def __init__(self, id: str, ops: List[Dict[str, Any]], target: Optional[str] = None):
+        super().__init__(None, id)
+        self.ops = ops
+        self.target = target or id
+
+    def render(self) -> str:
+        raise TypeError(f"PatchComponent '{self.id}' has no full HTML; send its ops instead")
@@ -0,0 +1,222 @@
+"""Server-side diff of a component's HTML against what the client already has.
+
+WsEngine keeps the last HTML sent for every component and, when a component
+is pushed again, sends a list of small DOM ops instead of the full outerHTML
+(e.g. a metric flipping from 41 to 42 becomes one text op). Ops address
+elements by their path of ``element.children`` indices from the component's
+root element and carry absolute values::
+
+    ['a', path, name, value]   set attribute (value None = remove)
+    ['t', path, text]          set textContent of a text-only element
+    ['h', path, html]          replace the element
+    ['i', path, index, html]   insert a child element before children[index]
+    ['r', path, index]         remove children[index]
+
+Only HTML that the browser is known to parse into the same element tree is
+diffed; anything else (unbalanced tags, self-closing non-void tags, block
+elements inside <p>, multiple roots, ...) makes parse() return None and the
+component is sent as full HTML.
+"""
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'source', 'track', 'wbr',
+))
+
+# Never descended into: the browser re-parses their content (<table> gains a
+# <tbody>, <pre>/<textarea> drop a leading newline, SVG/MathML are
+# case-sensitive while HTMLParser lowercases). Replaced as a whole on change.
+OPAQUE_ELEMENTS = frozenset((
+    'table', 'pre', 'textarea', 'svg', 'math', 'select', 'template', 'iframe',
+    'object', 'noscript', 'script', 'style',
+))
+
+# A start tag of these implicitly closes an open <p>
+_CLOSES_P = frozenset((
+    'address', 'article', 'aside', 'blockquote', 'details', 'div', 'dl',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'header', 'hgroup', 'hr', 'main', 'menu', 'nav', 'ol',
+    'p', 'pre', 'section', 'table', 'ul',
+))
+
+
+class Node:
+    """One element of a parsed component. ``text`` is set for text-only
+    elements; ``mixed`` marks elements with both text and element children."""
+    __slots__ = ('tag', 'attrs', 'children', 'text', 'mixed', 'start', 'end')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], start: int):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List['Node'] = []
+        self.text: List[str] = []
+        self.mixed = False
+        self.start = start
+        self.end = start
+
+
+class ParsedHTML:
+    """Root element of a component plus the source it was parsed from."""
+    __slots__ = ('html', 'root', 'ids')
+
+    def __init__(self, html: str, root: Node, ids: set):
+        self.html = html
+        self.root = root
+        self.ids = ids  # ids of all elements below the root
+
+    def source(self, node: Node) -> str:
+        return self.html[node.start:node.end]
+
+
+class _Unsafe(Exception):
+    pass
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.line_offsets = [0]
+        i = html.find('\n')
+        while i != -1:
+            self.line_offsets.append(i + 1)
+            i = html.find('\n', i + 1)
+        self.stack: List[Node] = []
+        self.roots: List[Node] = []
+        self.ids = set()
+        self.opaque = 0  # depth inside an opaque element
+        self.open_p = 0
+
+    def _offset(self) -> int:
+        line, col = self.getpos()
+        return self.line_offsets[line - 1] + col
+
+    def _open(self, tag, attrs) -> Node:
+        node = Node(tag, {k: ('' if v is None else v) for k, v in attrs}, self._offset())
+        if self.open_p and tag in _CLOSES_P and not self.opaque:
+            raise _Unsafe()
+        if self.stack:
+            parent = self.stack[-1]
+            if not self.opaque:
+                parent.children.append(node)
+                if parent.text and ''.join(parent.text).strip():
+                    parent.mixed = True
+        else:
+            self.roots.append(node)
+        node_id = node.attrs.get('id')
+        if node_id and self.stack:
+            self.ids.add(node_id)
+        return node
+
+    def handle_starttag(self, tag, attrs):
+        node = self._open(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            node.end = node.start + len(self.get_starttag_text())
+            return
+        self.stack.append(node)
+        if tag in OPAQUE_ELEMENTS or self.opaque:
+            self.opaque += 1
+        elif tag == 'p':
+            self.open_p += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # <div/> stays open in HTML (only foreign content may self-close)
+        if tag not in VOID_ELEMENTS and not self.opaque:
+            raise _Unsafe()
+        node = self._open(tag, attrs)
+        node.end = node.start + len(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if not self.stack or self.stack[-1].tag != tag:
+            raise _Unsafe()
+        node = self.stack.pop()
+        node.end = self.html.index('>', self._offset()) + 1
+        if self.opaque:
+            self.opaque -= 1
+        elif tag == 'p':
+            self.open_p -= 1
+
+    def handle_data(self, data):
+        if not self.stack:
+            if data.strip():
+                raise _Unsafe()
+            return
+        if self.opaque:
+            return
+        parent = self.stack[-1]
+        parent.text.append(data)
+        if parent.children and data.strip():
+            parent.mixed = True
+
+
+def parse(html: str) -> Optional[ParsedHTML]:
+    """Parse a component's HTML, or None if it can't be diffed safely."""
+    builder = _TreeBuilder(html)
+    try:
+        builder.feed(html)
+        builder.close()
+    except (_Unsafe, ValueError, AssertionError):
+        return None
+    if builder.stack or len(builder.roots) != 1:
+        return None
+    return ParsedHTML(html, builder.roots[0], builder.ids)
+
+
+def diff(old: ParsedHTML, new: ParsedHTML) -> Optional[List[List[Any]]]:
+    """Ops turning ``old`` into ``new``, or None if the root itself changed."""
+    if old.root.tag != new.root.tag or old.root.attrs.get('id') != new.root.attrs.get('id'):
+        return None
+    ops: List[List[Any]] = []
+    _diff_node(old, old.root, new, new.root, [], ops)
+    return ops
+
+
+def _same_kind(a: Node, b: Node) -> bool:
+    return a.tag == b.tag and a.attrs.get('id') == b.attrs.get('id')
+
+
+def _diff_node(old: ParsedHTML, a: Node, new: ParsedHTML, b: Node, path: List[int], ops: List[List[Any]]):
+    if a.tag != b.tag:
+        ops.append(['h', path, new.source(b)])
+        return
+    if a.tag in OPAQUE_ELEMENTS or a.mixed or b.mixed or bool(a.children) != bool(b.children):
+        if old.source(a) != new.source(b):
+            ops.append(['h', path, new.source(b)])
+        return
+
+    for name, value in b.attrs.items():
+        if a.attrs.get(name) != value:
+            ops.append(['a', path, name, value])
+    for name in a.attrs:
+        if name not in b.attrs:
+            ops.append(['a', path, name, None])
+
+    if not b.children:
+        text = ''.join(b.text)
+        if ''.join(a.text) != text:
+            ops.append(['t', path, text])
+        return
+
+    old_children, new_children = a.children, b.children
+    n_old, n_new = len(old_children), len(new_children)
+    prefix = 0
+    while prefix < n_old and prefix < n_new and _same_kind(old_children[prefix], new_children[prefix]):
+        prefix += 1
+    suffix = 0
+    while (suffix < n_old - prefix and suffix < n_new - prefix
+           and _same_kind(old_children[n_old - 1 - suffix], new_children[n_new - 1 - suffix])):
+        suffix += 1
+
+    for i in range(prefix):
+        _diff_node(old, old_children[i], new, new_children[i], path + [i], ops)
+    for i in range(n_old - suffix - 1, prefix - 1, -1):
+        ops.append(['r', path, i])
+    for i in range(prefix, n_new - suffix):
+        ops.append(['i', path, i, new.source(new_children[i])])
+    for k in range(suffix):
+        _diff_node(old, old_children[n_old - 1 - k], new, new_children[n_new - 1 - k],
+                   path + [n_new - 1 - k], ops)
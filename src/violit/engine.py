@@ -1,30 +1,420 @@
-from typing import List, Dict, Callable
+import asyncio
+import collections
+import hashlib
+import json
+import logging
+import re
+import secrets
+from typing import Any, Awaitable, List, Dict, Callable, Optional, Set, Tuple
 from starlette.websockets import WebSocket
 from .component import Component
+from .dom_diff import ParsedHTML, parse, diff
+from . import wire
+
+_ID_ATTR = re.compile(r'\sid="([^"]*)"')
+
+# Widgets whose client-side update reads item.html (see applyUpdates in the
+# page template), and markup the client treats specially on replacement
+_HTML_ONLY_WIDGETS = ('checkbox', 'toggle', 'data')
+_HTML_ONLY_MARKUP = ('<script', '<input', '<textarea', '<sl-input', '<sl-textarea')
+
+
+class SentRecord:
+    """What the client shows for one component: digest of its last pushed
+    HTML, ids of the elements inside it and, if diffable, the parsed HTML."""
+    __slots__ = ('digest', 'ids', 'parsed')
+
+    def __init__(self, digest: bytes, ids: Set[str], parsed: Optional[ParsedHTML]):
+        self.digest = digest
+        self.ids = ids
+        self.parsed = parsed
+
+
+class SentCache:
+    """Per-session record of the HTML last pushed for each component.
+    
+    Lets engines drop pushes whose HTML the client already shows and diff
+    against it (WsEngine). ``stats`` counts what skipping saved.
+    """
+    def __init__(self):
+        self.sessions: Dict[str, Dict[str, SentRecord]] = {}
+        self.stats = {'skipped_components': 0, 'saved_bytes': 0, 'saved_messages': 0}
+
+    @staticmethod
+    def digest(html: str) -> bytes:
+        return hashlib.blake2b(html.encode(), digest_size=16).digest()
+
+    def reset(self, sid: str):
+        """The client's DOM was rebuilt from a full page (load, reconnect) or
+        changed by a script: nothing can be assumed about it."""
+        self.sessions[sid] = {}
+
+    def forget(self, sid: str):
+        self.sessions.pop(sid, None)
+
+    def get(self, sid: str, cid: str) -> Optional[SentRecord]:
+        return self.sessions.get(sid, {}).get(cid)
+
+    def unchanged(self, sid: str, cid: str, html: str) -> bool:
+        """True (and counted as saved) if ``html`` is what the client shows."""
+        record = self.get(sid, cid)
+        if record is None or record.digest != self.digest(html):
+            return False
+        self.stats['skipped_components'] += 1
+        self.stats['saved_bytes'] += len(html.encode())
+        return True
+
+    def remember(self, sid: str, cid: str, html: Optional[str] = None,
+                 parsed: Optional[ParsedHTML] = None, inner_html: str = ""):
+        """Record a push of ``cid``.
+        
+        The pushed component replaced part of the DOM of every component that
+        contains it, and of every component inside it: their records are
+        dropped. ``html`` None means the component's DOM changed in a way
+        that is not recorded (e.g. structural ops, whose item HTML is passed
+        as ``inner_html``).
+        """
+        sent = self.sessions.setdefault(sid, {})
+        for other_id, other in list(sent.items()):
+            if cid in other.ids:
+                del sent[other_id]
+        if parsed is not None:
+            ids = parsed.ids
+        else:
+            ids = set(_ID_ATTR.findall(html if html is not None else inner_html))
+            ids.discard(cid)
+        old = sent.pop(cid, None)
+        for inner_id in (old.ids | ids if old is not None else ids):
+            sent.pop(inner_id, None)
+        if html is not None:
+            sent[cid] = SentRecord(self.digest(html), ids, parsed)
+
 
 class LiteEngine:
+    # Page loads per session whose sent records are kept; requests from
+    # older ones get every component swapped
+    max_tabs = 8
+
+    def __init__(self):
+        # Kept per page load (tab): a response only swaps into the DOM of
+        # the tab that sent the request, so what one tab shows says nothing
+        # about another. Keys are tab_key(sid, tab).
+        self.sent = SentCache()
+        self.tabs: Dict[str, collections.OrderedDict] = {}
+
+    def new_tab(self, sid: str) -> str:
+        """Start the sent record of a page load; returns the id its requests
+        send back (as ``_tab``)."""
+        tab = secrets.token_urlsafe(8)
+        tabs = self.tabs.setdefault(sid, collections.OrderedDict())
+        tabs[tab] = None
+        self.sent.reset(f"{sid}/{tab}")
+        while len(tabs) > self.max_tabs:
+            old, _ = tabs.popitem(last=False)
+            self.sent.forget(f"{sid}/{old}")
+        return tab
+
+    def tab_key(self, sid: Optional[str], tab: Optional[str]) -> Optional[str]:
+        """Sent-record key of a request's tab; None when the tab is unknown,
+        in which case nothing may be skipped."""
+        if sid and tab and tab in self.tabs.get(sid, ()):
+            return f"{sid}/{tab}"
+        return None
+
     def click_attrs(self, cid: str):
         return {"hx-post": f"/action/{cid}", "hx-swap": "none"}
 
-    def wrap_oob(self, components: List[Component]):
+    def wrap_oob(self, components: List[Component], key: Optional[str] = None):
+        """Render components as htmx out-of-band swaps.
+        
+        With a tab ``key`` (see tab_key), components whose HTML that tab
+        already shows are left out.
+        """
         html = ""
         for comp in components:
             rendered = comp.render().strip()
+            if key is not None:
+                if self.sent.unchanged(key, comp.id, rendered):
+                    continue
+                self.sent.remember(key, comp.id, rendered)
             # Inject hx-swap-oob="true" into the root tag of the component
             tag_end = rendered.find(' ')
             if tag_end == -1: tag_end = rendered.find('>')
             html += rendered[:tag_end] + ' hx-swap-oob="true"' + rendered[tag_end:]
         return html
 
+class Outbox:
+    """Messages waiting to be written to one session's sockets.
+    
+    Entries are ``['update', component, is_navigation]``, ``['eval', code]``
+    or ``['message', dict]`` and are written in order by a single task
+    (WsEngine._writer). A full-HTML update supersedes the pending updates of
+    the same component; evals are barriers nothing is coalesced across, since
+    a script may depend on the DOM the updates before it produced.
+
+    Past ``max_pending`` live entries (a slow client under a burst of
+    updates to many components), the components with the oldest updates
+    lose all their pending ones, half the queue's worth, and are listed in
+    ``stale``: the writer sends them re-rendered instead (WsEngine.rerender).
+    Only when what is left (evals, messages) still exceeds the limit, or
+    without ``compact``, is the box ``overflowed``.
+    """
+    def __init__(self, max_pending: int, compact: bool = False):
+        self.max_pending = max_pending
+        self.compact = compact
+        self.entries: List[list] = []
+        self.live = 0
+        self.pending: Dict[str, List[list]] = {}  # cid -> its live update entries since the last barrier
+        self.stale: Set[str] = set()
+        self.compacted = 0
+        self.wakeup = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        self.overflowed = False
+        self.closed = False
+        self.task: Optional[asyncio.Task] = None
+
+    def put_updates(self, components: List[Component], is_navigation: bool):
+        for c in components:
+            self.put_update(c, is_navigation)
+
+    def put_update(self, component: Component, is_navigation: bool):
+        entries = self.pending.setdefault(component.id, [])
+        if getattr(component, 'ops', None) is None:
+            # Full HTML replaces whatever the pending entries would have produced
+            for entry in entries:
+                entry[0] = None
+            self.live -= len(entries)
+            entries.clear()
+            self.stale.discard(component.id)
+        entry = ['update', component, is_navigation]
+        entries.append(entry)
+        self._append(entry)
+
+    def put(self, kind: str, value: Any):
+        if kind == 'eval':
+            self.pending.clear()
+        self._append([kind, value])
+
+    def _append(self, entry: list):
+        if self.closed:
+            return
+        self.entries.append(entry)
+        self.live += 1
+        if self.live > self.max_pending and self.compact:
+            self._compact()
+        if self.live > self.max_pending:
+            # Nothing left that can be dropped without desyncing the client
+            self.overflowed = True
+        elif len(self.entries) > 2 * self.max_pending:
+            self.entries = [e for e in self.entries if e[0] is not None]
+        self.wakeup.set()
+
+    def _compact(self):
+        counts = collections.Counter(e[1].id for e in self.entries if e[0] == 'update')
+        stale, freed = set(), 0
+        for e in self.entries:  # oldest first
+            if freed >= self.max_pending // 2:
+                break
+            if e[0] == 'update' and e[1].id not in stale:
+                stale.add(e[1].id)
+                freed += counts[e[1].id]
+        self.entries = [e for e in self.entries
+                        if e[0] is not None and not (e[0] == 'update' and e[1].id in stale)]
+        self.live = len(self.entries)
+        for cid in stale:
+            self.pending.pop(cid, None)
+        self.stale |= stale
+        self.compacted += freed
+
+    def take(self) -> Tuple[List[list], int, Set[str]]:
+        """Live entries, how many superseded ones were dropped, and the
+        components to send re-rendered (see ``stale``)."""
+        entries = [e for e in self.entries if e[0] is not None]
+        dropped = len(self.entries) - len(entries) + self.compacted
+        stale = self.stale
+        self.entries, self.live, self.stale, self.compacted = [], 0, set(), 0
+        self.pending.clear()
+        self.wakeup.clear()
+        return entries, dropped, stale
+
+
+class Inbox:
+    """Messages received on one socket and not yet processed.
+    
+    Filled by a reader task and drained by the /ws handler, so the socket is
+    read while an action runs. Clicks (and anything else that is not a tick)
+    are served first, in arrival order; interval ticks only when no click is
+    waiting, and a tick replaces a still queued older tick of the same
+    interval. When more than ``max_pending`` clicks are queued the reader
+    waits, leaving further frames in the socket buffer.
+    """
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.messages: collections.deque = collections.deque()
+        self.ticks: Dict[str, dict] = {}  # interval id -> latest tick
+        self.arrived = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.closed = False
+
+    async def put(self, message: dict) -> bool:
+        """Queue a message; True if it replaced a stale tick."""
+        if message.get('type') == 'tick':
+            stale = message.get('id') in self.ticks
+            self.ticks[message.get('id')] = message
+            self.arrived.set()
+            return stale
+        while len(self.messages) >= self.max_pending:
+            self.drained.clear()
+            await self.drained.wait()
+        self.messages.append(message)
+        self.arrived.set()
+        return False
+
+    def close(self):
+        """End of stream: get() returns None once the queued clicks are done."""
+        self.closed = True
+        self.arrived.set()
+
+    async def get(self) -> Optional[dict]:
+        while True:
+            if self.messages:
+                message = self.messages.popleft()
+                self.drained.set()
+                return message
+            if self.closed:
+                return None
+            if self.ticks:
+                return self.ticks.pop(next(iter(self.ticks)))
+            self.arrived.clear()
+            await self.arrived.wait()
+
+
 class WsEngine:
+    # Pending messages per session before the oldest component updates are
+    # dropped for re-renders, or, when those can't make room, the client is
+    # considered stuck (see Outbox)
+    max_pending = 1024
+
     def __init__(self):
-        self.sockets: Dict[str, WebSocket] = {}
+        # Open sockets per session (one per browser tab; all tabs share the
+        # session cookie), each with its negotiated wire format
+        self.sockets: Dict[str, Dict[WebSocket, Any]] = {}
+        # What the clients show per component, for skipping unchanged
+        # pushes and sending DOM patches (see dom_diff). Kept per session:
+        # every tab gets the same messages, and the record is reset when a
+        # tab connects with a freshly rendered page
+        self.sent = SentCache()
+        self.outboxes: Dict[str, Outbox] = {}
+        # async (sid, cids) -> current components, set by the App: lets
+        # outboxes drop the pending updates of components and resend them
+        self.rerender: Optional[Callable[[str, Set[str]], Awaitable[List[Component]]]] = None
+        # coalesced_clicks and stale_ticks are counted by the /ws handler
+        self.stats = {'coalesced_updates': 0, 'overflows': 0, 'coalesced_clicks': 0, 'stale_ticks': 0}
         
     def click_attrs(self, cid: str):
         return {"onclick": f"window.sendAction('{cid}')"}
+
+    def connect(self, sid: str, ws: WebSocket, codec=wire.JSON):
+        """Register an accepted socket of a session, starting the session's
+        writer task with its first socket.
+        
+        Tabs of a session share its components: a page load that re-runs a
+        page replaces them, and the new page is pushed to the open tabs
+        (App._push_replaced_pages). The sent record is shared as well, so a
+        tab connecting resets it and the next push of each component is full
+        HTML to every tab, not a diff.
+        """
+        self.sockets.setdefault(sid, {})[ws] = codec
+        # New page: the client holds the HTML from the index render
+        self.sent.reset(sid)
+        if sid not in self.outboxes:
+            box = Outbox(self.max_pending, compact=self.rerender is not None)
+            box.task = asyncio.get_running_loop().create_task(self._writer(sid, box))
+            self.outboxes[sid] = box
+
+    def disconnect(self, sid: str, ws: Optional[WebSocket] = None):
+        """Forget a socket of a session (all of them without ``ws``); the
+        writer task stops with the last one."""
+        sockets = self.sockets.get(sid, {})
+        if ws is not None:
+            sockets.pop(ws, None)
+        if ws is not None and sockets:
+            return
+        box = self.outboxes.pop(sid, None)
+        if box is not None and box.task is not None:
+            box.task.cancel()
+        self.sockets.pop(sid, None)
+        self.sent.forget(sid)
+
+    def is_primary(self, sid: str, ws: WebSocket) -> bool:
+        """True for the session's oldest open socket. Work every tab would
+        request alike (interval ticks) is only done for that one."""
+        sockets = self.sockets.get(sid)
+        return not sockets or next(iter(sockets)) is ws
+
+    def _submit(self, sid: str, put: Callable, *args):
+        """Call an Outbox method on the loop that owns it. Pushes also come
+        from actions in the threadpool, background tasks and broadcasts
+        running their own loops."""
+        box = self.outboxes.get(sid)
+        if box is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is box.loop:
+            put(box, *args)
+        else:
+            box.loop.call_soon_threadsafe(put, box, *args)
+
+    async def send(self, sid: str, message: Dict):
+        """Queue a message for a session's sockets."""
+        self._submit(sid, Outbox.put, 'message', message)
+
+    @staticmethod
+    async def send_to(ws: WebSocket, codec, message: Dict):
+        """Write a message to a socket in its negotiated format."""
+        await WsEngine._send_frame(ws, codec, codec.encode(message))
+
+    @staticmethod
+    async def _send_frame(ws: WebSocket, codec, data):
+        if codec.binary:
+            await ws.send_bytes(data)
+        else:
+            await ws.send_text(data)
+
+    async def _fan_out(self, sid: str, message: Dict):
+        """Write a message to every socket of a session, encoding it once
+        per wire format. A socket that fails is dropped from the session
+        (its receive loop cleans up)."""
+        sockets = list(self.sockets.get(sid, {}).items())
+        encoded: Dict[str, Any] = {}
+        sends = []
+        for ws, codec in sockets:
+            data = encoded.get(codec.name)
+            if data is None:
+                data = encoded[codec.name] = codec.encode(message)
+            sends.append(self._send_frame(ws, codec, data))
+        if len(sends) == 1:
+            results = [None]
+            try:
+                await sends[0]
+            except Exception as e:
+                results = [e]
+        else:
+            results = await asyncio.gather(*sends, return_exceptions=True)
+        for (ws, _), result in zip(sockets, results):
+            if isinstance(result, Exception):
+                self.sockets.get(sid, {}).pop(ws, None)
         
     async def push_updates(self, sid: str, components: List[Component], is_navigation: bool = False):
-        """Push component updates to client
+        """Queue component updates for the client
+        
+        Returns without waiting for the sockets: the session's writer task
+        sends them to every tab of the session, coalesced with other pending
+        updates. Components whose HTML is unchanged since the last push are
+        dropped at that point; no message is sent if none is left.
         
         Args:
             sid: Session ID
@@ -32,15 +422,110 @@ class WsEngine:
             is_navigation: If True, apply smooth page transition animation.
                           If False (default), update immediately without animation.
         """
-        if sid in self.sockets:
-            payload = [{"id": c.id, "html": c.render()} for c in components]
-            await self.sockets[sid].send_json({
-                "type": "update", 
-                "payload": payload,
-                "isNavigation": is_navigation  # Flag for client to determine animation
-            })
+        self._submit(sid, Outbox.put_updates, list(components), is_navigation)
 
     async def push_eval(self, sid: str, code: str):
-        if sid in self.sockets:
-            await self.sockets[sid].send_json({"type": "eval", "code": code})
+        self._submit(sid, Outbox.put, 'eval', code)
+
+    async def _writer(self, sid: str, box: Outbox):
+        """Write a session's queued messages; the only sender on its sockets.
+        
+        Each message is built and encoded once and written to all tabs
+        concurrently; the next batch is taken when every tab has it, so the
+        slowest tab paces the coalescing of updates.
+        
+        Send errors are handled per socket by _fan_out; a batch that fails
+        to build (render, parse, diff) is logged and dropped, and the writer
+        goes on with the next one.
+        """
+        try:
+            while True:
+                await box.wakeup.wait()
+                if box.overflowed:
+                    self.stats['overflows'] += 1
+                    # The clients reload the page on close, which resyncs them
+                    for ws in list(self.sockets.get(sid, {})):
+                        try:
+                            await ws.close(code=1013)
+                        except Exception:
+                            pass
+                    return
+                entries, dropped, stale = box.take()
+                self.stats['coalesced_updates'] += dropped
+                try:
+                    if stale:
+                        # Last: their current HTML overrides any older
+                        # update of a component containing them
+                        entries += [['update', c, False] for c in await self.rerender(sid, stale)]
+                    for message, post in self._frames(sid, entries):
+                        await self._fan_out(sid, message)
+                        post()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logging.getLogger(__name__).exception(
+                        "Failed to send updates to session %s", sid)
+        finally:
+            box.closed = True
+            # A later connect starts a new writer
+            if self.outboxes.get(sid) is box:
+                del self.outboxes[sid]
+
+    def _frames(self, sid: str, entries: List[list]):
+        """Yield (message, after-send callback), one update message per run of
+        updates with the same navigation flag."""
+        i = 0
+        while i < len(entries):
+            kind, value = entries[i][0], entries[i][1]
+            if kind == 'eval':
+                # The script may change any component's DOM (e.g. broadcast lists)
+                yield {"type": "eval", "code": value}, lambda: self.sent.reset(sid)
+                i += 1
+            elif kind == 'message':
+                yield value, lambda: None
+                i += 1
+            else:
+                is_navigation = entries[i][2]
+                items = []
+                while i < len(entries) and entries[i][0] == 'update' and entries[i][2] == is_navigation:
+                    item = self._payload_item(sid, entries[i][1], diffable=not is_navigation)
+                    if item is not None:
+                        items.append(item)
+                    i += 1
+                if not items:
+                    self.sent.stats['saved_messages'] += 1
+                    continue
+                yield {
+                    "type": "update",
+                    "payload": [payload for payload, _, _ in items],
+                    "isNavigation": is_navigation  # Flag for client to determine animation
+                }, lambda items=items: self._remember(sid, items)
+
+    def _remember(self, sid: str, items: List[tuple]):
+        for payload, html, parsed in items:
+            if html is None:
+                inner = "".join(op.get("html", "") for op in payload["ops"])
+                self.sent.remember(sid, payload["id"], inner_html=inner)
+            else:
+                self.sent.remember(sid, payload["id"], html, parsed)
 
+    def _payload_item(self, sid: str, c: Component, diffable: bool = True
+                      ) -> Optional[Tuple[Dict, Optional[str], Optional[ParsedHTML]]]:
+        """(payload, html, parsed html) for one component, None to skip it."""
+        ops = getattr(c, 'ops', None)
+        if ops is not None:
+            # PatchComponent: per-item DOM ops instead of full HTML
+            return {"id": c.id, "target": c.target, "ops": ops}, None, None
+        html = c.render()
+        if self.sent.unchanged(sid, c.id, html):
+            return None
+        if (not diffable or c.id.split('_')[0] in _HTML_ONLY_WIDGETS
+                or any(tag in html for tag in _HTML_ONLY_MARKUP)):
+            return {"id": c.id, "html": html}, html, None
+        parsed = parse(html)
+        old = self.sent.get(sid, c.id)
+        if parsed is not None and old is not None and old.parsed is not None:
+            patch = diff(old.parsed, parsed)
+            if patch is not None and len(json.dumps(patch)) < len(html):
+                return {"id": c.id, "patch": patch}, html, parsed
+        return {"id": c.id, "html": html}, html, parsed
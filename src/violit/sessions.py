@@ -0,0 +1,712 @@
+"""Session state backends.
+
+A session store (see state.get_session_store) holds two kinds of data: the
+values of the session's states, which belong to the user, and what this
+process needs to serve them (builders, actions, the dependency tracker,
+render caches). Only the state values go through a backend; the rest stays
+in-process and is rebuilt on whichever worker handles the session by
+rendering the page once (App._ensure_registered), since builders and
+actions are closures.
+
+Backends:
+
+    MemoryBackend   values live in the process (default; single worker)
+    SQLiteBackend   a local SQLite file shared by all workers on one host
+    RedisBackend    any server speaking the Redis protocol (Redis, Valkey,
+                    KeyDB, or a local stand-in such as fakeredis); needs the
+                    optional ``redis`` package (``pip install violit[redis]``)
+
+With SQLiteBackend or RedisBackend, uvicorn can run the app with
+``--workers N``. Values are serialized lazily: a value is pickled when the
+request that set it is done (StateMap.flush), and unpickled the first time
+a worker reads it after it changed. Mutating a value in place without
+``set()`` is not seen by other workers.
+
+SessionCache holds the per-process part of the session stores and keeps
+it within the App's capacity policy (max sessions, idle TTL, bytes per
+session), spilling the state values of evicted sessions to disk.
+"""
+import atexit
+import logging
+import os
+import pickle
+import secrets
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class SessionBackend(ABC):
+    """Where the state values of sessions live.
+
+    ``states(sid)`` returns the mapping installed as ``store['states']``;
+    the App calls ``sync`` with it before handling a request or message of
+    the session and ``flush`` after. ``secret()`` is shared by all workers
+    using the backend (CSRF tokens must verify on any of them).
+    """
+    shared = False
+
+    @abstractmethod
+    def states(self, sid: str) -> MutableMapping:
+        """The state values of a session, loaded lazily or not."""
+
+    def sync(self, states: MutableMapping) -> bool:
+        """Pick up values other workers set since the last sync; True if any."""
+        return False
+
+    def flush(self, states: MutableMapping) -> bool:
+        """Persist values set since the last flush. True if other workers
+        had set values meanwhile (they are picked up as by ``sync``)."""
+        return False
+
+    def delete(self, sid: str):
+        """Forget a session."""
+
+    @abstractmethod
+    def secret(self) -> str:
+        """Key for signing CSRF tokens."""
+
+
+class MemoryBackend(SessionBackend):
+    """Values in a plain dict per session, inside this process."""
+
+    def __init__(self):
+        self._secret = secrets.token_urlsafe(32)
+
+    def states(self, sid: str) -> MutableMapping:
+        return {}
+
+    def secret(self) -> str:
+        return self._secret
+
+
+class StateMap(MutableMapping):
+    """``store['states']`` of a session kept by a serializing backend.
+
+    Decoded values are cached per name. Writes are kept in ``dirty`` until
+    flush(); sync() drops the cache when the session's revision in the
+    backend moved (another worker flushed), keeping unflushed local writes,
+    and so does flush() when it finds another worker flushed in between.
+    Both return True when that happened.
+    Iteration covers the values loaded in this process only.
+    """
+
+    def __init__(self, backend: 'SerializingBackend', sid: str):
+        self.backend = backend
+        self.sid = sid
+        self.values: Dict[str, Any] = {}
+        self.dirty: set = set()
+        self.revision = 0  # last one seen; the first sync() reports existing values
+        self.lock = threading.Lock()
+
+    def get(self, name: str, default: Any = None) -> Any:
+        # Under the lock: a load must not land in a cache that sync/flush
+        # replaced meanwhile, nor overwrite a value set or adopted since
+        with self.lock:
+            value = self.values.get(name, _MISSING)
+            if value is _MISSING:
+                data = self.backend.load(self.sid, name)
+                value = _MISSING if data is None else self.backend.loads(data)
+                self.values[name] = value
+        return default if value is _MISSING else value
+
+    def __getitem__(self, name: str) -> Any:
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: Any):
+        with self.lock:
+            self.values[name] = value
+            self.dirty.add(name)
+
+    def __delitem__(self, name: str):
+        self[name]  # KeyError if absent
+        self[name] = _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, value in self.values.items() if value is not _MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def sync(self) -> bool:
+        revision = self.backend.revision(self.sid)
+        if revision == self.revision:
+            return False
+        with self.lock:
+            self.values = {name: self.values[name] for name in self.dirty}
+            self.revision = revision
+        return True
+
+    def flush(self) -> bool:
+        with self.lock:
+            if not self.dirty:
+                return False
+            values = {name: self.values[name] for name in self.dirty}
+            self.dirty = set()
+        encoded = {name: (None if value is _MISSING else self.backend.dumps(value))
+                   for name, value in values.items()}
+        revision = self.backend.save(self.sid, encoded)
+        foreign = revision != self.revision + 1
+        if foreign:
+            # Someone else flushed in between: re-read what we didn't write
+            with self.lock:
+                self.values = {name: self.values[name] for name in values.keys() | self.dirty
+                               if name in self.values}
+        self.revision = revision
+        return foreign
+
+
+class SerializingBackend(SessionBackend):
+    """Base for backends storing pickled values outside the process.
+
+    Subclasses implement load/save/revision/delete and _shared_secret.
+    ``dumps``/``loads`` default to pickle; only the app writes these
+    values, but anyone with write access to the backend can run code
+    through them, so keep the store private to the app's workers.
+    """
+    shared = True
+
+    def __init__(self, dumps: Callable[[Any], bytes] = None, loads: Callable[[bytes], Any] = None):
+        self.dumps = dumps or (lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        self.loads = loads or pickle.loads
+        self._secret: Optional[str] = None
+
+    def states(self, sid: str) -> StateMap:
+        return StateMap(self, sid)
+
+    def sync(self, states: MutableMapping) -> bool:
+        # Only sessions have a StateMap, not the static store
+        return isinstance(states, StateMap) and states.sync()
+
+    def flush(self, states: MutableMapping) -> bool:
+        return isinstance(states, StateMap) and states.flush()
+
+    def secret(self) -> str:
+        if self._secret is None:
+            self._secret = self._shared_secret()
+        return self._secret
+
+    @abstractmethod
+    def load(self, sid: str, name: str) -> Optional[bytes]:
+        """A value as stored, None if the session doesn't have it."""
+
+    @abstractmethod
+    def save(self, sid: str, values: Dict[str, Optional[bytes]]) -> int:
+        """Write (None = delete) values and return the session's new revision."""
+
+    @abstractmethod
+    def revision(self, sid: str) -> int:
+        """The session's current revision, 0 if it has none."""
+
+    @abstractmethod
+    def delete(self, sid: str):
+        """Forget a session."""
+
+    @abstractmethod
+    def _shared_secret(self) -> str:
+        """Read the secret from the store, creating it on first use."""
+
+
+class SQLiteBackend(SerializingBackend):
+    """State values in a SQLite database file, for workers on one host.
+
+    Sessions not written or synced for ``ttl`` seconds are deleted.
+    """
+
+    def __init__(self, path: str = "violit_sessions.db", ttl: float = 1800, **kwargs):
+        super().__init__(**kwargs)
+        self.path = os.path.abspath(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self._touched: Dict[str, float] = {}
+        self._last_expire = 0.0
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, revision INTEGER NOT NULL, touched REAL NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS states (sid TEXT NOT NULL, name TEXT NOT NULL, value BLOB NOT NULL, PRIMARY KEY (sid, name))")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def _db(self) -> sqlite3.Connection:
+        # One connection per thread: actions may run in the threadpool
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def load(self, sid: str, name: str) -> Optional[bytes]:
+        row = self._db().execute("SELECT value FROM states WHERE sid = ? AND name = ?", (sid, name)).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid: str, values: Dict[str, Optional[bytes]]) -> int:
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for name, data in values.items():
+                if data is None:
+                    db.execute("DELETE FROM states WHERE sid = ? AND name = ?", (sid, name))
+                else:
+                    db.execute("INSERT OR REPLACE INTO states (sid, name, value) VALUES (?, ?, ?)", (sid, name, data))
+            db.execute("INSERT INTO sessions (sid, revision, touched) VALUES (?, 1, ?) "
+                       "ON CONFLICT(sid) DO UPDATE SET revision = revision + 1, touched = excluded.touched",
+                       (sid, now))
+            revision = db.execute("SELECT revision FROM sessions WHERE sid = ?", (sid,)).fetchone()[0]
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._touched[sid] = now
+        if now - self._last_expire > min(self.ttl, 60):
+            self._last_expire = now
+            self._expire(now)
+        return revision
+
+    def revision(self, sid: str) -> int:
+        db = self._db()
+        now = time.time()
+        if now - self._touched.get(sid, 0) > min(self.ttl / 10, 60):
+            # Reading a session keeps it alive too (not on every message)
+            self._touched[sid] = now
+            db.execute("UPDATE sessions SET touched = ? WHERE sid = ?", (now, sid))
+        row = db.execute("SELECT revision FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        return row[0] if row else 0
+
+    def load_all(self, sid: str) -> Dict[str, bytes]:
+        rows = self._db().execute("SELECT name, value FROM states WHERE sid = ?", (sid,)).fetchall()
+        return dict(rows)
+
+    def sids(self) -> list:
+        """The sessions that have values."""
+        return [row[0] for row in self._db().execute("SELECT DISTINCT sid FROM states")]
+
+    def close(self):
+        """Close this thread's connection (other threads' close with them)."""
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    def delete(self, sid: str):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        db.execute("DELETE FROM states WHERE sid = ?", (sid,))
+        db.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+        db.execute("COMMIT")
+        self._touched.pop(sid, None)
+
+    def _expire(self, now: float):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        db.execute("DELETE FROM states WHERE sid IN (SELECT sid FROM sessions WHERE touched < ?)", (now - self.ttl,))
+        db.execute("DELETE FROM sessions WHERE touched < ?", (now - self.ttl,))
+        db.execute("COMMIT")
+
+    def _shared_secret(self) -> str:
+        db = self._db()
+        db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('secret', ?)", (secrets.token_urlsafe(32),))
+        return db.execute("SELECT value FROM meta WHERE key = 'secret'").fetchone()[0]
+
+
+class RedisBackend(SerializingBackend):
+    """State values in a Redis-protocol server, for workers on any host.
+
+    Each session is a hash ``<prefix>s:<sid>`` (state name -> pickled value)
+    plus a revision counter ``<prefix>rev:<sid>``; both expire after ``ttl``
+    seconds without a write or sync. Pass ``client`` to use an existing
+    redis-py compatible client (e.g. ``fakeredis.FakeRedis()`` in tests).
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", client: Any = None,
+                 prefix: str = "violit:", ttl: int = 1800, **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            if redis is None:
+                raise ImportError("RedisBackend needs the redis package (pip install violit[redis])")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = int(ttl)
+
+    def _keys(self, sid: str):
+        return f"{self.prefix}s:{sid}", f"{self.prefix}rev:{sid}"
+
+    def load(self, sid: str, name: str) -> Optional[bytes]:
+        return self.client.hget(self._keys(sid)[0], name)
+
+    def save(self, sid: str, values: Dict[str, Optional[bytes]]) -> int:
+        values_key, revision_key = self._keys(sid)
+        pipe = self.client.pipeline(transaction=True)
+        written = {name: data for name, data in values.items() if data is not None}
+        if written:
+            pipe.hset(values_key, mapping=written)
+        deleted = [name for name, data in values.items() if data is None]
+        if deleted:
+            pipe.hdel(values_key, *deleted)
+        pipe.incr(revision_key)
+        pipe.expire(values_key, self.ttl)
+        pipe.expire(revision_key, self.ttl)
+        results = pipe.execute()
+        return int(results[-3])
+
+    def revision(self, sid: str) -> int:
+        values_key, revision_key = self._keys(sid)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(revision_key)
+        pipe.expire(values_key, self.ttl)
+        pipe.expire(revision_key, self.ttl)
+        revision = pipe.execute()[0]
+        return int(revision) if revision is not None else 0
+
+    def delete(self, sid: str):
+        self.client.delete(*self._keys(sid))
+
+    def _shared_secret(self) -> str:
+        key = f"{self.prefix}secret"
+        self.client.set(key, secrets.token_urlsafe(32), nx=True)
+        secret = self.client.get(key)
+        return secret.decode() if isinstance(secret, bytes) else secret
+
+
+def approx_size(value: Any, _seen: Optional[set] = None, _depth: int = 0, _budget: Optional[list] = None) -> int:
+    """Approximate memory held by ``value``, in bytes.
+
+    Arrays and DataFrames report their buffers (``nbytes`` /
+    ``memory_usage()``), objects defining ``__sizeof__`` report that.
+    Containers and other objects are walked up to 6 levels and 10,000
+    objects deep, and ones with more than 100 items are estimated from a
+    sample of their first 100. Shared objects are counted once.
+    """
+    if _seen is None:
+        _seen, _budget = set(), [10_000]
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value, 0)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):  # numpy arrays (getsizeof counts the buffer they own)
+        return max(size, nbytes)
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage) and hasattr(value, 'dtypes'):  # pandas
+        try:
+            usage = memory_usage(index=True)
+            return max(size, int(getattr(usage, 'sum', lambda: usage)()))
+        except Exception:
+            pass
+    _budget[0] -= 1
+    if _depth >= 6 or _budget[0] <= 0:
+        return size
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    elif hasattr(value, '__dict__') and type(value).__sizeof__ is object.__sizeof__:
+        items = vars(value).items()
+    else:
+        return size
+    count = len(items)
+    sample = total = 0
+    for item in items:
+        if sample == 100:
+            break
+        sample += 1
+        if isinstance(item, tuple) and items is not value:  # dict items
+            total += sum(approx_size(part, _seen, _depth + 1, _budget) for part in item)
+        else:
+            total += approx_size(item, _seen, _depth + 1, _budget)
+    return size + (total * count // sample if sample else 0)
+
+
+class SessionCache:
+    """The session stores held by this process (``state.GLOBAL_STORE``).
+
+    Kept within a capacity policy set by App(max_sessions=..., session_ttl=...,
+    max_session_bytes=..., session_spill=...):
+
+    - a session not used for ``ttl`` seconds expires;
+    - past ``max_sessions``, the least recently used idle session (one
+      without an open WebSocket, see ``is_active``) is evicted. When every
+      session is active the limit is exceeded instead, with a warning;
+    - with ``max_session_bytes``, the approximate size of a session (state
+      values and render caches, see approx_size) is measured after each
+      request. A session over budget first loses its render caches; if it
+      is still over, it is evicted before any other idle session;
+    - the state values of an evicted session are spilled to a local SQLite
+      file and restored when the session comes back, its components being
+      re-registered by a page render (App._ensure_registered). Values that
+      can't be pickled are lost. Shared backends keep the values already,
+      so nothing is spilled for them.
+
+    The App also reclaims sessions whose WebSocket stayed disconnected for
+    a grace period (see reclaim and App(disconnect_reclaim=...)).
+
+    Evictions are logged and counted in ``stats``.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 1800):
+        self.stores: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()  # least recently used first
+        self.sizes: Dict[str, int] = {}
+        self.oversized: set = set()
+        self.stats = {'expired': 0, 'evicted': 0, 'spilled': 0, 'restored': 0, 'oversized': 0,
+                      'reclaimed': 0, 'reclaimed_bytes': 0}
+        self._touched: Dict[str, float] = {}
+        self._measured: Dict[str, Dict[str, tuple]] = {}
+        self._spill_backend: Optional[SQLiteBackend] = None
+        self._spill_dir: Optional[str] = None  # private directory of a temporary spill file
+        self._last_sweep = time.monotonic()
+        self._warned_full = False
+        self._lock = threading.RLock()
+        self.configure(max_sessions, ttl)
+
+    def configure(self, max_sessions: int = 1000, ttl: float = 1800, max_session_bytes: Optional[int] = None,
+                  spill: Union[bool, str] = True, is_active: Optional[Callable[[str], bool]] = None):
+        """Set the policy. ``spill`` is a file path, True (a private
+        temporary file, created on the first eviction) or False.
+
+        Values already spilled move to the new spill file, if any; a
+        private temporary file that is no longer used is deleted.
+        """
+        with self._lock:
+            self.max_sessions = max_sessions
+            self.ttl = ttl
+            self.max_session_bytes = max_session_bytes
+            self.is_active = is_active or (lambda sid: False)
+            old = self._spill_backend
+            if old is not None and spill == self.spill:
+                old.ttl = ttl
+                return
+            self.spill = spill
+            self._spill_backend = None
+            if old is not None:
+                self._replace_spill_store(old)
+
+    def _replace_spill_store(self, old: SQLiteBackend):
+        old_dir, self._spill_dir = self._spill_dir, None
+        sids = old.sids()
+        new = self._spill_store(create=True) if sids else None
+        for sid in sids:
+            if new is not None:
+                new.save(sid, old.load_all(sid))
+            else:
+                logger.warning("[session] Spilling disabled: values of evicted session %s... are lost", sid[:8])
+        old.close()
+        if old_dir is not None:
+            shutil.rmtree(old_dir, True)
+
+    def __contains__(self, sid: str) -> bool:
+        return self.get(sid) is not None
+
+    def __getitem__(self, sid: str) -> Dict[str, Any]:
+        store = self.get(sid)
+        if store is None:
+            raise KeyError(sid)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.stores)
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        """The session's store, marking it used; None if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            store = self.stores.get(sid)
+            if store is None:
+                return None
+            if now - self._touched[sid] > self.ttl and not self.is_active(sid):
+                self._drop(sid)
+                self.stats['expired'] += 1
+                return None
+            self._touched[sid] = now
+            self.stores.move_to_end(sid)
+            return store
+
+    def add(self, sid: str, store: Dict[str, Any]):
+        """Insert a new session store, then evict to stay within the policy."""
+        with self._lock:
+            self.stores[sid] = store
+            self._touched[sid] = time.monotonic()
+            self._expire()
+            while len(self.stores) > self.max_sessions:
+                victim = self._victim()
+                if victim is None:
+                    if not self._warned_full:
+                        self._warned_full = True
+                        logger.warning("[session] %d sessions exceed max_sessions=%d, but all of them are connected",
+                                       len(self.stores), self.max_sessions)
+                    break
+                self.evict(victim, "max_sessions reached")
+
+    def evict(self, sid: str, reason: str, level: int = logging.WARNING) -> Optional[Dict[str, Any]]:
+        """Drop a session from this process, spilling its state values.
+        Returns its store."""
+        with self._lock:
+            store = self._drop(sid)
+            if store is None:
+                return None
+            self.stats['evicted'] += 1
+            spilled = self._spill(sid, store['states'])
+        logger.log(level, "[session] Evicted session %s... (%s); state %s", sid[:8], reason,
+                   "spilled to disk" if spilled else "not kept")
+        return store
+
+    def reclaim(self, sid: str, reset: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> int:
+        """Free the memory of a disconnected session; returns the bytes
+        reclaimed (approx_size of what was dropped).
+
+        With ``reset`` (state.reset_session_store), only the session's
+        runtime data is dropped and its state values stay in memory;
+        without, the whole session is evicted (values spilled to disk).
+        """
+        with self._lock:
+            store = self.stores.get(sid)
+            if store is None:
+                return 0
+            if reset is not None:
+                dropped = list(reset(store).values())
+                self._measured.pop(sid, None)
+                self.sizes.pop(sid, None)
+                self.oversized.discard(sid)
+            else:
+                dropped = list(self.evict(sid, "disconnected", logging.INFO).values())
+        size = sum(approx_size(value) for value in dropped)
+        with self._lock:
+            self.stats['reclaimed'] += 1
+            self.stats['reclaimed_bytes'] += size
+        logger.info("[session] Reclaimed ~%d bytes from disconnected session %s...", size, sid[:8])
+        return size
+
+    def restore(self, sid: str, states: MutableMapping) -> bool:
+        """Fill a new session's states with the values spilled when it was
+        evicted; True if there were any."""
+        with self._lock:
+            backend = self._spill_store(create=isinstance(self.spill, str))
+            values = backend.load_all(sid) if backend is not None else None
+            if not values:
+                return False
+            for name, data in values.items():
+                try:
+                    states[name] = pickle.loads(data)
+                except Exception as e:
+                    logger.warning("[session] Could not restore state %s: %s", name, e)
+            backend.delete(sid)
+            self.stats['restored'] += 1
+            return True
+
+    def account(self, sid: str, store: Dict[str, Any]) -> int:
+        """Measure a session against max_session_bytes (after a request)."""
+        if self.max_session_bytes is None or sid is None:
+            return 0
+        size = self._measure(sid, store)
+        if size > self.max_session_bytes:
+            # Render caches are only a speedup: drop them before the session
+            store['render_cache'].clear()
+            store['for_cache'].clear()
+            size = self._measure(sid, store)
+        with self._lock:
+            if sid not in self.stores:
+                return size
+            self.sizes[sid] = size
+            if size <= self.max_session_bytes:
+                self.oversized.discard(sid)
+            elif sid not in self.oversized:
+                self.oversized.add(sid)
+                self.stats['oversized'] += 1
+                logger.warning("[session] Session %s... holds ~%d bytes (max_session_bytes=%d); "
+                               "it will be evicted first once idle", sid[:8], size, self.max_session_bytes)
+        return size
+
+    def _measure(self, sid: str, store: Dict[str, Any]) -> int:
+        # Values are re-measured only when replaced (set()), not when
+        # mutated in place
+        measured = self._measured.get(sid, {})
+        current = {}
+        states = store['states']
+        for name in list(states):
+            value = states.get(name)
+            entry = measured.get(name)
+            if entry is None or entry[0] != id(value):
+                entry = (id(value), approx_size(value))
+            current[name] = entry
+        self._measured[sid] = current
+        total = sum(size for _, size in current.values())
+        total += sum(sys.getsizeof(entry[2].props.get('content', '')) for entry in list(store['render_cache'].values()))
+        for cache in list(store['for_cache'].values()):
+            total += sum(sys.getsizeof(entry['html']) for entry in cache['entries'].values())
+        return total
+
+    def _victim(self) -> Optional[str]:
+        newest = next(reversed(self.stores))
+        for sid in self.oversized:
+            if sid != newest and not self.is_active(sid):
+                return sid
+        for sid in self.stores:
+            if sid != newest and not self.is_active(sid):
+                return sid
+        return None
+
+    def _expire(self):
+        now = time.monotonic()
+        if now - self._last_sweep < min(self.ttl, 60):
+            return
+        self._last_sweep = now
+        for sid in list(self.stores):
+            if now - self._touched[sid] <= self.ttl:
+                break  # the rest were used more recently
+            if not self.is_active(sid):
+                self._drop(sid)
+                self.stats['expired'] += 1
+
+    def _drop(self, sid: str) -> Optional[Dict[str, Any]]:
+        self._touched.pop(sid, None)
+        self._measured.pop(sid, None)
+        self.sizes.pop(sid, None)
+        self.oversized.discard(sid)
+        return self.stores.pop(sid, None)
+
+    def _spill(self, sid: str, states: MutableMapping) -> bool:
+        if not self.spill or not isinstance(states, dict) or not states:
+            return False
+        encoded = {}
+        for name, value in states.items():
+            try:
+                encoded[name] = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.debug("[session] State %s can't be spilled: %s", name, e)
+        if not encoded:
+            return False
+        self._spill_store(create=True).save(sid, encoded)
+        self.stats['spilled'] += 1
+        return True
+
+    def _spill_store(self, create: bool) -> Optional[SQLiteBackend]:
+        if self._spill_backend is None and create and self.spill:
+            if isinstance(self.spill, str):
+                path = self.spill
+            else:
+                # Private directory: spilled values are unpickled when restored
+                directory = self._spill_dir = tempfile.mkdtemp(prefix="violit-sessions-")
+                atexit.register(shutil.rmtree, directory, True)
+                path = os.path.join(directory, "spill.db")
+            self._spill_backend = SQLiteBackend(path, ttl=self.ttl)
+        return self._spill_backend
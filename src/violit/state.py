@@ -1,19 +1,114 @@
-from typing import Any, Dict, Set
-from cachetools import TTLCache
+import sys
+import itertools
+import threading
+import inspect
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Set
 from .context import session_ctx, rendering_ctx, app_instance_ref
+from .sessions import MemoryBackend, SessionCache
 from .theme import Theme
 
 class DependencyTracker:
-    def __init__(self):
+    """Bidirectional index between states and the components that read them.
+
+    ``subscribers`` maps state name -> component IDs (used to find dirty
+    components), ``dependencies`` maps component ID -> state names (used to
+    unregister a component without scanning every state). Keys are interned
+    so the many repeated names across both indexes share one string object.
+    Updates are locked, since dirty components may be rendered in parallel
+    threads (see App(render_workers=...)).
+
+    A session's tracker is a copy-on-write overlay over ``base``, the App's
+    tracker of shared initial renders (see App._build): a static component
+    rendered from a shared render keeps its dependencies in the base only.
+    The first local registration or unregistration of such a component
+    shadows its base entry, and the session's own registrations apply from
+    then on.
+    """
+    def __init__(self, base: Optional['DependencyTracker'] = None):
         self.subscribers: Dict[str, Set[str]] = {}
-    
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.base = base
+        self.shadowed: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    def __sizeof__(self) -> int:
+        # Own indexes only, not the base
+        return object.__sizeof__(self) + sys.getsizeof(self.shadowed) + sum(
+            sys.getsizeof(index) + sum(sys.getsizeof(names) for names in index.values())
+            for index in (self.subscribers, self.dependencies))
+
+    def inherits(self, component_id: str) -> bool:
+        """True if the component's dependencies come from the base."""
+        return (self.base is not None and component_id not in self.shadowed
+                and component_id in self.base.dependencies)
+
+    def _shadow(self, component_id: str) -> Set[str]:
+        # Hide the base entry of a component; returns its base dependencies
+        if self.inherits(component_id):
+            self.shadowed.add(component_id)
+            return set(self.base.dependencies.get(component_id, ()))
+        return set()
+
+    def share(self, component_id: str, state_names):
+        """Set a component's dependencies in a base tracker.
+
+        Sets are replaced, not mutated, so sessions may read them while
+        another thread shares a render.
+        """
+        component_id = sys.intern(component_id)
+        state_names = {sys.intern(name) for name in state_names}
+        with self._lock:
+            for state_name in self.dependencies.get(component_id, ()):
+                if state_name not in state_names:
+                    self.subscribers[state_name] = self.subscribers[state_name] - {component_id}
+            for state_name in state_names:
+                self.subscribers[state_name] = self.subscribers.get(state_name, frozenset()) | {component_id}
+            self.dependencies[component_id] = state_names
+
     def register_dependency(self, state_name: str, component_id: str):
-        if state_name not in self.subscribers:
-            self.subscribers[state_name] = set()
-        self.subscribers[state_name].add(component_id)
+        state_name = sys.intern(state_name)
+        component_id = sys.intern(component_id)
+        with self._lock:
+            if self.base is not None:
+                self._shadow(component_id)
+            cids = self.subscribers.get(state_name)
+            if cids is None:
+                cids = self.subscribers[state_name] = set()
+            cids.add(component_id)
+            deps = self.dependencies.get(component_id)
+            if deps is None:
+                deps = self.dependencies[component_id] = set()
+            deps.add(state_name)
+
+    @contextmanager
+    def recording(self, component_id: str):
+        """Collect the states registered for ``component_id`` inside the block.
+
+        Yields a set that is filled on exit. The registrations themselves are
+        kept (merged with the ones made before the block).
+        """
+        with self._lock:
+            outer = self.dependencies.pop(component_id, None)
+            if self.base is not None:
+                outer = (outer or set()) | self._shadow(component_id)
+        recorded: Set[str] = set()
+        try:
+            yield recorded
+        finally:
+            with self._lock:
+                recorded.update(self.dependencies.pop(component_id, ()))
+                if outer or recorded:
+                    self.dependencies[component_id] = (outer or set()) | recorded
 
     def get_dirty_components(self, state_name: str) -> Set[str]:
-        return self.subscribers.get(state_name, set())
+        own = self.subscribers.get(state_name, set())
+        inherited = self.base.subscribers.get(state_name) if self.base is not None else None
+        if not inherited:
+            return own
+        return {cid for cid in inherited if cid not in self.shadowed} | own
 
     def unregister_component(self, component_id: str):
         """Remove a component from all subscriber sets.
@@ -21,20 +116,36 @@ class DependencyTracker:
         Call this before re-rendering a component (so stale deps are cleared
         and fresh ones are registered by the upcoming builder() call), or when
         a component is permanently gone (builder lookup returned None).
-        Empty subscriber sets are pruned to prevent dict bloat.
+        Only the component's own states are visited (via ``dependencies``),
+        and empty subscriber sets are pruned to prevent dict bloat.
         """
-        empty_keys = []
-        for state_name, cids in self.subscribers.items():
-            cids.discard(component_id)
-            if not cids:
-                empty_keys.append(state_name)
-        for k in empty_keys:
-            del self.subscribers[k]
+        with self._lock:
+            if self.base is not None:
+                self._shadow(component_id)
+            state_names = self.dependencies.pop(component_id, None)
+            if not state_names:
+                return
+            for state_name in state_names:
+                cids = self.subscribers.get(state_name)
+                if cids is None:
+                    continue
+                cids.discard(component_id)
+                if not cids:
+                    del self.subscribers[state_name]
 
 # Persistent store for static components (created during app initialization)
 STATIC_STORE = {}
-# TTL-cached store for user sessions (expires after 1800s of inactivity)
-GLOBAL_STORE = TTLCache(maxsize=1000, ttl=1800)
+# Stores of user sessions, evicted by the App's capacity policy (see
+# sessions.SessionCache). Their state values live in the App's session
+# backend: with a shared backend an evicted entry only costs a re-render.
+GLOBAL_STORE = SessionCache(max_sessions=1000, ttl=1800)
+_DEFAULT_BACKEND = MemoryBackend()
+
+
+def session_backend():
+    app = app_instance_ref[0]
+    return getattr(app, 'session_backend', None) or _DEFAULT_BACKEND
+
 
 def get_session_store():
     sid = session_ctx.get()
@@ -55,30 +166,222 @@ def get_session_store():
                 'fragment_components': {},
                 'order': [],
                 'sidebar_order': [],
+                'computed': {},
+                'versions': {},
+                'render_cache': {},
+                'for_cache': {},
+                'for_owners': {},
                 'theme': Theme(initial_theme)
             })
         return STATIC_STORE
         
     # User Session context
-    if sid not in GLOBAL_STORE:
-        initial_theme = 'light'
-        base_count = STATIC_STORE.get('component_count', 0)
-        
-        if app_instance_ref[0]:
-            initial_theme = app_instance_ref[0].theme_manager.preset_name
-            
-        GLOBAL_STORE[sid] = {
-            'states': {}, 
-            'tracker': DependencyTracker(),
-            'builders': {},
-            'actions': {},
-            'component_count': base_count,  # Start from where initial build left off
-            'fragment_components': {},
-            'order': [],
-            'sidebar_order': [],
-            'theme': Theme(initial_theme)
-        }
-    return GLOBAL_STORE[sid]
+    store = GLOBAL_STORE.get(sid)
+    if store is None:
+        states = session_backend().states(sid)
+        store = _new_session_store(states)
+        if GLOBAL_STORE.restore(sid, states):  # evicted earlier: values spilled to disk
+            # Their versions are lost: don't reuse renders made at defaults
+            store['foreign_states'] = True
+        GLOBAL_STORE.add(sid, store)
+    return store
+
+
+def _new_session_store(states) -> Dict[str, Any]:
+    initial_theme = 'light'
+    base_count = STATIC_STORE.get('component_count', 0)
+    
+    if app_instance_ref[0]:
+        initial_theme = app_instance_ref[0].theme_manager.preset_name
+    
+    return {
+        'states': states,
+        'tracker': DependencyTracker(getattr(app_instance_ref[0], '_shared_tracker', None)),
+        'builders': {},
+        'actions': {},
+        'component_count': base_count,  # Start from where initial build left off
+        'fragment_components': {},
+        'order': [],
+        'sidebar_order': [],
+        'computed': {},
+        'versions': {},
+        'render_cache': {},
+        'for_cache': {},
+        'for_owners': {},
+        'theme': Theme(initial_theme)
+    }
+
+
+# What a session keeps when its runtime data is reclaimed
+_PERSISTENT_KEYS = ('states', 'versions', 'theme', 'foreign_states')
+
+
+def reset_session_store(store: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a session's runtime data (builders, actions, tracker, render
+    caches) with a fresh store's, in place, keeping its state values.
+
+    Returns what was dropped. The components are registered again by the
+    next page render (see App._ensure_registered).
+    """
+    dropped = {key: value for key, value in store.items() if key not in _PERSISTENT_KEYS}
+    fresh = _new_session_store(store['states'])
+    fresh.update((key, store[key]) for key in _PERSISTENT_KEYS if key in store)
+    for key in dropped.keys() - fresh.keys():
+        del store[key]
+    store.update(fresh)
+    return dropped
+
+
+# Prefix of ComputedState names. They share the DependencyTracker with
+# components (as subscribers of the states they read), but have no builder.
+COMPUTED_PREFIX = "__computed_"
+_computed_ids = itertools.count()
+
+
+def _mark_dirty(store: Dict[str, Any], name: str, dirty: Optional[Set[str]] = None):
+    """Add a state to dirty_states, bump its version and drop ComputedState
+    caches derived from it.
+
+    ``store['versions']`` holds a per-session counter for every state that
+    was ever set (missing = 0), so cached renders can be validated against
+    the states they read (see recording_reads). Invalidated computed states
+    are unregistered from the tracker (their deps are re-recorded on the next
+    evaluation) and marked dirty themselves, so components reading them are
+    re-rendered. ``dirty`` overrides the target
+    set (used by Batch to hold names back until the batch exits).
+    """
+    if dirty is None:
+        if 'dirty_states' not in store: store['dirty_states'] = set()
+        dirty = store['dirty_states']
+    dirty.add(name)
+    versions = store['versions']
+    versions[name] = versions.get(name, 0) + 1
+    cache = store.get('computed')
+    if not cache:
+        return
+    tracker = store['tracker']
+    for dep in list(tracker.get_dirty_components(name)):
+        if dep in cache:
+            del cache[dep]
+            tracker.unregister_component(dep)
+            _mark_dirty(store, dep, dirty)
+
+
+# States read by the render in progress (see recording_reads). A context
+# variable rather than a store slot, so builders rendered in parallel
+# threads (each in a copy of the context) record separately.
+_render_reads: contextvars.ContextVar = contextvars.ContextVar('render_reads', default=None)
+
+
+@contextmanager
+def recording_reads():
+    """Collect the names of all states read in the block, at any nesting.
+
+    Yields a set that is filled while the block runs and merged into the
+    enclosing recording (if any) on exit. Unlike DependencyTracker.recording,
+    reads made by nested components are included, which is what a cached
+    render that contains their HTML has to be validated against. ``None`` in
+    the set means an input that cannot be versioned was read.
+    """
+    outer = _render_reads.get()
+    reads: Set[Optional[str]] = set()
+    token = _render_reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _render_reads.reset(token)
+        if outer is not None:
+            outer.update(reads)
+
+
+def current_reads() -> Optional[Set[Optional[str]]]:
+    """The set of the innermost recording_reads() block, or None."""
+    return _render_reads.get()
+
+
+def _log_read(name: Optional[str]):
+    reads = _render_reads.get()
+    if reads is not None:
+        reads.add(name)
+
+
+def read_versions(store: Dict[str, Any], names) -> Dict[Optional[str], int]:
+    """Snapshot the current version of each state in ``names``."""
+    versions = store['versions']
+    return {name: versions.get(name, 0) for name in names}
+
+
+def versions_current(store: Dict[str, Any], snapshot: Dict[Optional[str], int]) -> bool:
+    """True if none of the states in a read_versions() snapshot was set since."""
+    versions = store['versions']
+    for name, version in snapshot.items():
+        if name is None or versions.get(name, 0) != version:
+            return False
+    return True
+
+
+def invoke(callback, *args):
+    """Call a user callback (action, on_change, subscriber, ...).
+    
+    If it is an ``async def``, the coroutine is queued in the session's
+    ``pending_awaits`` together with the calling context, and awaited on the
+    event loop once the synchronous part of the request is done (see
+    App._settle). Returns the callback's result.
+    """
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        store = get_session_store()
+        store.setdefault('pending_awaits', []).append((result, contextvars.copy_context()))
+    return result
+
+
+class Batch:
+    """Context manager returned by app.batch() to coalesce State.set() calls.
+
+    Inside the block, values are written (and reads see them) immediately, but
+    dirty states are only published to the session when the outermost batch
+    exits, so _get_dirty_rendered() (and background flushes) compute the
+    affected components once. Subscribers fire once per state with the final
+    value and the value from before the batch.
+
+    The batch is per session: set() calls from any thread in the same session
+    are coalesced while it is open. Batches may be nested.
+
+    Usage::
+
+        with app.batch():
+            for row in rows:
+                total.set(total.value + row.amount)
+            status.set("done")
+    """
+
+    def __enter__(self):
+        store = get_session_store()
+        batch = store.get('batch')
+        if batch is None:
+            batch = store['batch'] = {'depth': 0, 'dirty': set(), 'pending': {}}
+        batch['depth'] += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        store = get_session_store()
+        batch = store.get('batch')
+        if batch is None:
+            return False
+        batch['depth'] -= 1
+        if batch['depth'] > 0:
+            return False
+        store['batch'] = None
+
+        if batch['dirty']:
+            if 'dirty_states' not in store: store['dirty_states'] = set()
+            store['dirty_states'].update(batch['dirty'])
+        for state, old_value in batch['pending'].values():
+            new_value = store['states'].get(state.name, state.default_value)
+            if _values_equal(state._equality_policy(), old_value, new_value):
+                continue
+            state._notify(new_value, old_value)
+        return False
 
 
 class Subscription:
@@ -103,10 +406,39 @@ class Subscription:
             self._active = False
 
 
+# Equality policies accepted by State(equals=...) and App(state_equality=...)
+EQUALITY_POLICIES = ('identity', 'eq')
+
+
+def _validate_equality(policy):
+    if policy is None or callable(policy) or policy in EQUALITY_POLICIES:
+        return policy
+    raise ValueError(
+        f"Unknown equality policy: {policy!r}. "
+        f"Supported: None, 'identity', 'eq', or a callable(old, new) -> bool."
+    )
+
+
+def _values_equal(policy, old_value: Any, new_value: Any) -> bool:
+    """Return True if set(new_value) should be treated as a no-op."""
+    if policy is None:
+        return False
+    if policy == 'identity':
+        return old_value is new_value
+    try:
+        if policy == 'eq':
+            return old_value is new_value or bool(old_value == new_value)
+        return bool(policy(old_value, new_value))
+    except Exception:
+        # e.g. DataFrame/ndarray '==' is elementwise and has no truth value
+        return False
+
+
 class State:
-    def __init__(self, name: str, default_value: Any):
+    def __init__(self, name: str, default_value: Any, equals=None):
         object.__setattr__(self, 'name', name)
         object.__setattr__(self, 'default_value', default_value)
+        object.__setattr__(self, 'equals', _validate_equality(equals))  # None -> app-wide policy
         object.__setattr__(self, '_subscribers', [])  # list of (callback, wants_old_val)
 
     @property
@@ -115,6 +447,7 @@ class State:
         current_comp_id = rendering_ctx.get()
         if current_comp_id:
             store['tracker'].register_dependency(self.name, current_comp_id)
+        _log_read(self.name)
         return store['states'].get(self.name, self.default_value)
     
     @value.setter
@@ -122,21 +455,56 @@ class State:
         self.set(new_value)
 
     def set(self, new_value: Any):
+        self._set(new_value)
+
+    def _set(self, new_value: Any, op: Optional[Dict[str, Any]] = None):
         store = get_session_store()
         old_value = store['states'].get(self.name, self.default_value)
+        if _values_equal(self._equality_policy(), old_value, new_value):
+            return
         store['states'][self.name] = new_value
-        if 'dirty_states' not in store: store['dirty_states'] = set()
-        store['dirty_states'].add(self.name)
-        # Fire side-effect subscribers
+        self._record_patch(store, op)
+
+        batch = store.get('batch')
+        if batch is not None:
+            # Inside app.batch(): defer dirty publication and subscribers
+            _mark_dirty(store, self.name, batch['dirty'])
+            if self._subscribers and self.name not in batch['pending']:
+                batch['pending'][self.name] = (self, old_value)
+            return
+
+        _mark_dirty(store, self.name)
+        self._notify(new_value, old_value)
+
+    def _record_patch(self, store: Dict[str, Any], op: Optional[Dict[str, Any]]):
+        """Hook for collection states to log structural ops (no-op for State)."""
+
+    def _equality_policy(self):
+        if self.equals is not None or app_instance_ref[0] is None:
+            return self.equals
+        return getattr(app_instance_ref[0], 'state_equality', None)
+
+    def _notify(self, new_value: Any, old_value: Any):
+        """Fire side-effect subscribers"""
         for cb, wants_old in list(self._subscribers):
             try:
-                cb(new_value, old_value) if wants_old else cb(new_value)
+                result = cb(new_value, old_value) if wants_old else cb(new_value)
+                if inspect.isawaitable(result):
+                    invoke(self._await_subscriber, result)
             except Exception as e:
-                import logging
                 logging.getLogger(__name__).error(
                     f"[state] subscriber error on '{self.name}': {e}"
                 )
 
+    async def _await_subscriber(self, awaitable):
+        """Await an async subscriber, logging errors like sync ones."""
+        try:
+            await awaitable
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                f"[state] subscriber error on '{self.name}': {e}"
+            )
+
     def subscribe(self, callback) -> 'Subscription':
         """Register a side-effect callback fired on every set().
 
@@ -144,9 +512,11 @@ class State:
             callback(new_val)            – receives new value only
             callback(new_val, old_val)   – receives new and previous value
 
+        ``async def`` callbacks are awaited on the event loop after the
+        action (or background flush) that set the state.
+
         Returns a Subscription object. Call .cancel() to unsubscribe.
         """
-        import inspect
         try:
             wants_old = len(inspect.signature(callback).parameters) >= 2
         except (ValueError, TypeError):
@@ -283,14 +653,189 @@ class State:
         return format(self.value, format_spec)
 
 
+# Pending structural ops per state are capped; past this the consumer
+# re-renders the whole container anyway.
+MAX_PATCH_OPS = 256
+
+
+class CollectionState(State):
+    """Base for states whose mutations are recorded as structural patches.
+
+    Every mutation writes a new container (the previous value is never
+    modified in place) and appends an op to ``store['patches'][name]``::
+
+        {'op': 'insert' | 'remove' | 'update', 'index': i, 'item': x, 'size': n}
+
+    ``index`` is the position in iteration order at the time of the op and
+    ``size`` the length after it. A plain ``set()`` records ``None`` (full
+    reset). ``_get_dirty_rendered`` hands the ops to For / reactive_list so
+    they can send per-item DOM updates instead of the whole container.
+    """
+
+    def _current(self):
+        return get_session_store()['states'].get(self.name, self.default_value)
+
+    def _record_patch(self, store: Dict[str, Any], op: Optional[Dict[str, Any]]):
+        if 'patches' not in store: store['patches'] = {}
+        patches = store['patches']
+        ops = patches.get(self.name, [])
+        if op is None or ops is None or len(ops) >= MAX_PATCH_OPS:
+            patches[self.name] = None
+        else:
+            ops.append(op)
+            patches[self.name] = ops
+
+
+class ListState(CollectionState):
+    """List state with append/insert/remove/pop/update_at.
+
+    Usage::
+
+        todos = app.list_state(["Write docs"])
+        todos.append("Ship it")
+        todos.update_at(0, "Write more docs")
+        todos.remove("Ship it")
+    """
+
+    def __init__(self, name: str, default_value: Any = None, equals=None):
+        super().__init__(name, list(default_value or []), equals=equals)
+
+    def append(self, item: Any):
+        current = self._current()
+        size = len(current) + 1
+        self._set([*current, item], {'op': 'insert', 'index': size - 1, 'item': item, 'size': size})
+
+    def insert(self, index: int, item: Any):
+        current = self._current()
+        n = len(current)
+        if index < 0:
+            index = max(0, n + index)
+        index = min(index, n)
+        new_value = list(current)
+        new_value.insert(index, item)
+        self._set(new_value, {'op': 'insert', 'index': index, 'item': item, 'size': n + 1})
+
+    def pop(self, index: int = -1) -> Any:
+        current = self._current()
+        n = len(current)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("pop index out of range")
+        item = current[index]
+        new_value = list(current)
+        del new_value[index]
+        self._set(new_value, {'op': 'remove', 'index': index, 'item': item, 'size': n - 1})
+        return item
+
+    def remove(self, item: Any):
+        """Remove the first occurrence of item (ValueError if absent)."""
+        self.pop(list(self._current()).index(item))
+
+    def update_at(self, index: int, item: Any):
+        current = self._current()
+        n = len(current)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("update_at index out of range")
+        new_value = list(current)
+        new_value[index] = item
+        self._set(new_value, {'op': 'update', 'index': index, 'item': item, 'size': n})
+
+
+class DictState(CollectionState):
+    """Dict state with item set/delete. Iteration order (and thus the
+    position used in patches) follows the dict's insertion order, and the
+    iterated item is the key.
+
+    Usage::
+
+        scores = app.dict_state({"alice": 3})
+        scores["bob"] = 5          # or scores.set_item("bob", 5)
+        del scores["alice"]        # or scores.delete_item("alice")
+    """
+
+    def __init__(self, name: str, default_value: Any = None, equals=None):
+        super().__init__(name, dict(default_value or {}), equals=equals)
+
+    def set_item(self, key: Any, value: Any):
+        current = self._current()
+        new_value = dict(current)
+        new_value[key] = value
+        if key in current:
+            op = {'op': 'update', 'index': list(current).index(key), 'item': key, 'size': len(current)}
+        else:
+            op = {'op': 'insert', 'index': len(current), 'item': key, 'size': len(current) + 1}
+        self._set(new_value, op)
+
+    def delete_item(self, key: Any):
+        current = self._current()
+        if key not in current:
+            raise KeyError(key)
+        index = list(current).index(key)
+        new_value = dict(current)
+        del new_value[key]
+        self._set(new_value, {'op': 'remove', 'index': index, 'item': key, 'size': len(current) - 1})
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __setitem__(self, key, value):
+        self.set_item(key, value)
+
+    def __delitem__(self, key):
+        self.delete_item(key)
+
+
 class ComputedState:
-    """A state derived from other states (e.g. expressions)"""
+    """A state derived from other states (e.g. expressions)
+
+    The result is memoized per session. While ``func`` runs, every state it
+    reads is registered in the session's DependencyTracker with this computed
+    state as the subscriber, so ``State.set()`` drops the cached value and
+    marks the components reading it dirty. A func that reads no states is
+    not cached (it may depend on plain Python values).
+
+    A ComputedState created while a session is handled or a component
+    renders (e.g. ``(count * 2).value`` inside a builder or an action) is a
+    new object every time, so it is not memoized: ``func`` runs on each
+    read and the states it reads are registered for the reading component
+    directly, leaving nothing behind in the session.
+    """
     def __init__(self, func):
         self.func = func
+        self.name = f"{COMPUTED_PREFIX}{next(_computed_ids)}__"
+        self.memoized = session_ctx.get() is None and current_reads() is None
 
     @property
     def value(self):
-        return self.func()
+        if not self.memoized:
+            return self.func()
+        store = get_session_store()
+        tracker = store['tracker']
+        current_comp_id = rendering_ctx.get()
+        if current_comp_id:
+            tracker.register_dependency(self.name, current_comp_id)
+        _log_read(self.name)
+        cache = store['computed']
+        if self.name in cache:
+            return cache[self.name]
+
+        token = rendering_ctx.set(self.name)
+        try:
+            result = self.func()
+        except Exception:
+            tracker.unregister_component(self.name)
+            raise
+        finally:
+            rendering_ctx.reset(token)
+        if self.name in tracker.dependencies:
+            cache[self.name] = result
+        else:
+            # Not memoized, so never invalidated: renders reading it can't be cached
+            _log_read(None)
+        return result
 
     def __bool__(self):
         return bool(self.value)
@@ -1296,15 +1296,21 @@ class Theme:
     
     def __init__(self, preset: str = 'dark'):
         self.preset_name = preset
-        self.current = self.PRESETS.get(preset, self.PRESETS['dark']).copy()
+        # Copy-on-write: every session starts with a Theme, most never change it
+        self.current = self.PRESETS.get(preset, self.PRESETS['dark'])
+        self._owned = False
     
     def set_preset(self, preset: str):
         if preset in self.PRESETS:
             self.preset_name = preset
-            self.current = self.PRESETS[preset].copy()
+            self.current = self.PRESETS[preset]
+            self._owned = False
     
     def set_color(self, key: str, value: str):
         if key in self.current:
+            if not self._owned:
+                self.current = self.current.copy()
+                self._owned = True
             self.current[key] = value
     
     def to_css_vars(self) -> str:
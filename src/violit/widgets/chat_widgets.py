@@ -1,7 +1,7 @@
 from typing import Optional, Union, Callable
 from ..component import Component
 from ..context import fragment_ctx
-from ..state import get_session_store
+from ..state import get_session_store, invoke
 from ..style_utils import merge_cls, merge_style
 
 class ChatWidgetsMixin:
@@ -110,7 +110,7 @@ class ChatWidgetsMixin:
         # This ensures each session has its own handler
         def handler(val):
             if on_submit:
-                on_submit(val)
+                invoke(on_submit, val)
         
         # Use static_actions for initial registration, but the handler
         # captures the session-specific on_submit callback via closure
@@ -5,7 +5,7 @@ import json
 import pandas as pd
 from ..component import Component
 from ..context import rendering_ctx
-from ..state import State
+from ..state import State, invoke
 from ..style_utils import merge_cls, merge_style, resolve_value
 
 
@@ -20,7 +20,7 @@ class DataWidgetsMixin:
         def action(v):
             """Handle cell click events"""
             if on_cell_clicked and callable(on_cell_clicked):
-                on_cell_clicked(v)
+                invoke(on_cell_clicked, v)
         
         def builder():
             # Handle Signal
@@ -153,7 +153,7 @@ class DataWidgetsMixin:
             try:
                 new_data = json.loads(v) if isinstance(v, str) else v
                 s.set(new_data)
-                if on_change: on_change(pd.DataFrame(new_data))
+                if on_change: invoke(on_change, pd.DataFrame(new_data))
             except: pass
         
         def builder():
@@ -338,7 +338,7 @@ class DataWidgetsMixin:
         def action(v):
             """Handle cell click events"""
             if on_cell_clicked and callable(on_cell_clicked):
-                on_cell_clicked(v)
+                invoke(on_cell_clicked, v)
         
         def builder():
             # Handle Signal/Callable
@@ -3,7 +3,7 @@
 from typing import Union, Callable, Optional
 from ..component import Component
 from ..context import rendering_ctx, fragment_ctx
-from ..state import get_session_store
+from ..state import get_session_store, invoke
 from ..style_utils import merge_cls, merge_style
 
 
@@ -293,7 +293,7 @@ class FormWidgetsMixin:
         def action():
             # Collect form data and call on_click
             if on_click:
-                on_click()
+                invoke(on_click)
         
         def builder():
             attrs = self.engine.click_attrs(cid)
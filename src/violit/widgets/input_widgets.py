@@ -7,7 +7,7 @@ import io
 import json
 from ..component import Component
 from ..context import rendering_ctx, layout_ctx
-from ..state import State
+from ..state import State, invoke
 from ..style_utils import merge_cls, merge_style, wrap_html
 
 
@@ -35,16 +35,78 @@ class UploadedFile(io.BytesIO):
         return f"<UploadedFile name='{self.name}' type='{self.type}' size={self.size}>"
 
 
+def _lite_trigger(event: str, debounce_ms: Optional[int], throttle_ms: Optional[int]) -> str:
+    """hx-trigger for a value input.
+
+    With debounce_ms/throttle_ms the live ``sl-input`` events are posted,
+    rate-limited by htmx, and ``sl-change`` still posts the final value.
+    """
+    if not debounce_ms and not throttle_ms:
+        return event
+    modifiers = ""
+    if throttle_ms: modifiers += f" throttle:{int(throttle_ms)}ms"
+    if debounce_ms: modifiers += f" delay:{int(debounce_ms)}ms"
+    return f"sl-input{modifiers}, sl-change"
+
+
+def _ws_listener(cid: str, event: str, debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None) -> str:
+    """WS-mode script sending the element's value on ``event``.
+
+    With debounce_ms/throttle_ms the live ``sl-input`` events are sent too,
+    rate-limited on the client (window.sendActionLimited); ``sl-change``
+    cancels a pending send and sends the final value at once.
+    """
+    if debounce_ms or throttle_ms:
+        d, t = int(debounce_ms or 0), int(throttle_ms or 0)
+        listen = f"""
+                        el.addEventListener('sl-input', function(e) {{
+                            window.sendActionLimited('{cid}', el.value, {d}, {t});
+                        }});
+                        el.addEventListener('sl-change', function(e) {{
+                            window.sendActionLimited('{cid}', el.value, 0, 0);
+                        }});"""
+    else:
+        listen = f"""
+                        el.addEventListener('{event}', function(e) {{
+                            window.sendAction('{cid}', el.value);
+                        }});"""
+    return f'''
+                <script>
+                (function() {{
+                    const el = document.getElementById('{cid}');
+                    if (el && !el.hasAttribute('data-ws-listener')) {{
+                        el.setAttribute('data-ws-listener', 'true');{listen}
+                    }}
+                }})();
+                </script>
+                '''
+
+
 class InputWidgetsMixin:
     
-    def text_input(self, label, value="", key=None, on_change=None, cls: str = "", style: str = "", **props):
-        """Single-line text input"""
-        return self._input_component("input", "sl-input", label, value, on_change, key, cls=cls, style=style, **props)
+    def text_input(self, label, value="", key=None, on_change=None, cls: str = "", style: str = "",
+                   debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None, **props):
+        """Single-line text input
 
-    def slider(self, label, min_value=0, max_value=100, value=None, step=1, key=None, on_change=None, cls: str = "", style: str = "", **props):
-        """Slider widget"""
+        By default the value is sent when the input changes (blur/Enter).
+        With debounce_ms/throttle_ms it is also sent while typing: after a
+        pause of debounce_ms, and/or at most once every throttle_ms.
+        """
+        return self._input_component("input", "sl-input", label, value, on_change, key, cls=cls, style=style,
+                                     debounce_ms=debounce_ms, throttle_ms=throttle_ms, **props)
+
+    def slider(self, label, min_value=0, max_value=100, value=None, step=1, key=None, on_change=None, cls: str = "", style: str = "",
+               debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None, **props):
+        """Slider widget
+
+        By default the value is sent when the slider is released. With
+        debounce_ms/throttle_ms it is also sent while dragging: after a pause
+        of debounce_ms, and/or at most once every throttle_ms.
+        """
         if value is None: value = min_value
-        return self._input_component("slider", "sl-range", label, value, on_change, key, cls=cls, style=style, min=min_value, max=max_value, step=step, **props)
+        return self._input_component("slider", "sl-range", label, value, on_change, key, cls=cls, style=style,
+                                     debounce_ms=debounce_ms, throttle_ms=throttle_ms,
+                                     min=min_value, max=max_value, step=step, **props)
 
     def checkbox(self, label, value=False, key=None, on_change=None, cls: str = "", style: str = "", **props):
         """Checkbox widget"""
@@ -56,7 +118,7 @@ class InputWidgetsMixin:
         def action(v):
             real_val = str(v).lower() == 'true'
             s.set(real_val)
-            if on_change: on_change(real_val)
+            if on_change: invoke(on_change, real_val)
         
         def builder():
             # Subscribe to own state - client-side will handle smart updates
@@ -105,7 +167,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
             
         def builder():
             token = rendering_ctx.set(cid)
@@ -160,7 +222,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
             
         def builder():
             token = rendering_ctx.set(cid)
@@ -224,7 +286,7 @@ class InputWidgetsMixin:
             else:
                 selected = []
             s.set(selected)
-            if on_change: on_change(selected)
+            if on_change: invoke(on_change, selected)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -292,8 +354,14 @@ class InputWidgetsMixin:
         
         return s
 
-    def text_area(self, label, value="", height=None, key=None, on_change=None, cls: str = "", style: str = "", **props):
-        """Multi-line text input"""
+    def text_area(self, label, value="", height=None, key=None, on_change=None, cls: str = "", style: str = "",
+                  debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None, **props):
+        """Multi-line text input
+
+        The value is sent while typing; debounce_ms/throttle_ms limit how
+        often (after a pause of debounce_ms, and/or at most once every
+        throttle_ms).
+        """
         cid = self._get_next_cid("textarea")
         
         state_key = key or f"textarea:{label}"
@@ -301,7 +369,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -309,24 +377,13 @@ class InputWidgetsMixin:
             rendering_ctx.reset(token)
             
             if self.mode == 'lite':
-                attrs = {"hx-post": f"/action/{cid}", "hx-trigger": "sl-input delay:50ms", "hx-swap": "none", "name": "value"}
+                trigger = _lite_trigger("sl-input", debounce_ms, throttle_ms) if debounce_ms or throttle_ms else "sl-input delay:50ms"
+                attrs = {"hx-post": f"/action/{cid}", "hx-trigger": trigger, "hx-swap": "none", "name": "value"}
                 listener_script = ""
             else:
                 # WS mode: use addEventListener for Shoelace custom events
                 attrs = {}
-                listener_script = f'''
-                <script>
-                (function() {{
-                    const el = document.getElementById('{cid}');
-                    if (el && !el.hasAttribute('data-ws-listener')) {{
-                        el.setAttribute('data-ws-listener', 'true');
-                        el.addEventListener('sl-input', function(e) {{
-                            window.sendAction('{cid}', el.value);
-                        }});
-                    }}
-                }})();
-                </script>
-                '''
+                listener_script = _ws_listener(cid, "sl-input", debounce_ms, throttle_ms)
             
             textarea_props = {"rows": height or 3, "resize": "auto"}
             # Remove attrs from args to Component and inject script after
@@ -341,11 +398,17 @@ class InputWidgetsMixin:
             _fs = merge_style(_wd.get("style", ""), style)
             return Component(None, id=cid, content=wrap_html(html, _fc, _fs))
         
-        self._register_component(cid, builder, action=action)
+        self._register_component(cid, builder, action=action, latest_wins=on_change is None)
         return s
 
-    def number_input(self, label, value=0, min_value=None, max_value=None, step=1, key=None, on_change=None, cls: str = "", style: str = "", **props):
-        """Numeric input"""
+    def number_input(self, label, value=0, min_value=None, max_value=None, step=1, key=None, on_change=None, cls: str = "", style: str = "",
+                     debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None, **props):
+        """Numeric input
+
+        The value is sent while typing; debounce_ms/throttle_ms limit how
+        often (after a pause of debounce_ms, and/or at most once every
+        throttle_ms).
+        """
         cid = self._get_next_cid("number")
         
         state_key = key or f"number:{label}"
@@ -355,7 +418,7 @@ class InputWidgetsMixin:
             try:
                 num_val = float(v) if '.' in str(v) else int(v)
                 s.set(num_val)
-                if on_change: on_change(num_val)
+                if on_change: invoke(on_change, num_val)
             except (ValueError, TypeError):
                 pass
         
@@ -365,24 +428,13 @@ class InputWidgetsMixin:
             rendering_ctx.reset(token)
             
             if self.mode == 'lite':
-                attrs = {"hx-post": f"/action/{cid}", "hx-trigger": "sl-input delay:50ms", "hx-swap": "none", "name": "value"}
+                trigger = _lite_trigger("sl-input", debounce_ms, throttle_ms) if debounce_ms or throttle_ms else "sl-input delay:50ms"
+                attrs = {"hx-post": f"/action/{cid}", "hx-trigger": trigger, "hx-swap": "none", "name": "value"}
                 listener_script = ""
             else:
                 # WS mode: use addEventListener
                 attrs = {}
-                listener_script = f'''
-                <script>
-                (function() {{
-                    const el = document.getElementById('{cid}');
-                    if (el && !el.hasAttribute('data-ws-listener')) {{
-                        el.setAttribute('data-ws-listener', 'true');
-                        el.addEventListener('sl-input', function(e) {{
-                            window.sendAction('{cid}', el.value);
-                        }});
-                    }}
-                }})();
-                </script>
-                '''
+                listener_script = _ws_listener(cid, "sl-input", debounce_ms, throttle_ms)
             
             num_props = {"type": "number"}
             if min_value is not None: num_props["min"] = min_value
@@ -400,7 +452,7 @@ class InputWidgetsMixin:
             _fs = merge_style(_wd.get("style", ""), style)
             return Component(None, id=cid, content=wrap_html(html, _fc, _fs))
         
-        self._register_component(cid, builder, action=action)
+        self._register_component(cid, builder, action=action, latest_wins=on_change is None)
         return s
 
     def file_uploader(self, label, accept=None, multiple=False, key=None, on_change=None, help=None, cls: str = "", style: str = "", **props):
@@ -427,7 +479,7 @@ class InputWidgetsMixin:
                             # Single file
                             uf = UploadedFile(data.get("name"), data.get("type"), data.get("size"), data.get("content"))
                             s.set(uf)
-                            if on_change: on_change(uf)
+                            if on_change: invoke(on_change, uf)
                             return
                         elif "files" in data:
                              # Multiple files
@@ -435,13 +487,13 @@ class InputWidgetsMixin:
                              for f_data in data["files"]:
                                  files.append(UploadedFile(f_data.get("name"), f_data.get("type"), f_data.get("size"), f_data.get("content")))
                              s.set(files)
-                             if on_change: on_change(files)
+                             if on_change: invoke(on_change, files)
                              return
                 except Exception as e:
                     print(f"File upload error: {e}")
             
             s.set(None)
-            if on_change: on_change(None)
+            if on_change: invoke(on_change, None)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -558,7 +610,7 @@ class InputWidgetsMixin:
         def action(v):
             real_val = str(v).lower() == 'true'
             s.set(real_val)
-            if on_change: on_change(real_val)
+            if on_change: invoke(on_change, real_val)
         
         def builder():
             # Subscribe to own state - client-side will handle smart updates
@@ -597,8 +649,14 @@ class InputWidgetsMixin:
         self._register_component(cid, builder, action=action)
         return s
 
-    def color_picker(self, label="Pick a color", value="#000000", key=None, on_change=None, cls: str = "", style: str = "", **props):
-        """Color picker widget"""
+    def color_picker(self, label="Pick a color", value="#000000", key=None, on_change=None, cls: str = "", style: str = "",
+                     debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None, **props):
+        """Color picker widget
+
+        By default the value is sent when a color is picked. With
+        debounce_ms/throttle_ms it is also sent while dragging: after a pause
+        of debounce_ms, and/or at most once every throttle_ms.
+        """
         cid = self._get_next_cid("color")
         
         state_key = key or f"color:{label}"
@@ -606,7 +664,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -614,19 +672,23 @@ class InputWidgetsMixin:
             rendering_ctx.reset(token)
             
             if self.mode == 'lite':
-                attrs = {"hx-post": f"/action/{cid}", "hx-trigger": "sl-change", "hx-swap": "none", "name": "value"}
+                attrs = {"hx-post": f"/action/{cid}", "hx-trigger": _lite_trigger("sl-change", debounce_ms, throttle_ms), "hx-swap": "none", "name": "value"}
+                listener_script = ""
             else:
-                attrs = {"on_sl_change": f"window.sendAction('{cid}', this.value)"}
+                attrs = {}
+                listener_script = _ws_listener(cid, "sl-change", debounce_ms, throttle_ms)
             
             inner = Component("sl-color-picker", id=cid, label=label, value=cv, **attrs, **props)
             _wd = self._get_widget_defaults("color_picker")
             _fc = merge_cls(_wd.get("cls", ""), cls)
             _fs = merge_style(_wd.get("style", ""), style)
             if _fc or _fs:
-                return Component("div", id=f"{cid}_wrap", content=inner.render(), class_=_fc or None, style=_fs or None)
+                return Component("div", id=f"{cid}_wrap", content=inner.render() + listener_script, class_=_fc or None, style=_fs or None)
+            if listener_script:
+                return Component(None, id=cid, content=inner.render() + listener_script)
             return inner
         
-        self._register_component(cid, builder, action=action)
+        self._register_component(cid, builder, action=action, latest_wins=on_change is None)
         return s
 
     def date_input(self, label="Select date", value=None, key=None, on_change=None, cls: str = "", style: str = "", **props):
@@ -640,7 +702,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -679,7 +741,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -718,7 +780,7 @@ class InputWidgetsMixin:
         
         def action(v):
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -746,7 +808,8 @@ class InputWidgetsMixin:
         self._register_component(cid, builder, action=action)
         return s
 
-    def _input_component(self, type_name, tag_name, label, value, on_change, key=None, cls: str = "", style: str = "", **props):
+    def _input_component(self, type_name, tag_name, label, value, on_change, key=None, cls: str = "", style: str = "",
+                         debounce_ms: Optional[int] = None, throttle_ms: Optional[int] = None, **props):
         """Generic input component builder"""
         cid = self._get_next_cid(type_name)
         
@@ -757,7 +820,7 @@ class InputWidgetsMixin:
             if type_name == 'slider': 
                 v = float(v) if '.' in str(v) else int(v)
             s.set(v)
-            if on_change: on_change(v)
+            if on_change: invoke(on_change, v)
         
         def builder():
             token = rendering_ctx.set(cid)
@@ -765,24 +828,12 @@ class InputWidgetsMixin:
             rendering_ctx.reset(token)
             
             if self.mode == 'lite':
-                attrs_str = f'hx-post="/action/{cid}" hx-trigger="sl-change" hx-swap="none" name="value"'
+                attrs_str = f'hx-post="/action/{cid}" hx-trigger="{_lite_trigger("sl-change", debounce_ms, throttle_ms)}" hx-swap="none" name="value"'
                 listener_script = ""
             else:
                 # WS mode: use addEventListener for Shoelace custom events
                 attrs_str = ""
-                listener_script = f'''
-                <script>
-                (function() {{
-                    const el = document.getElementById('{cid}');
-                    if (el && !el.hasAttribute('data-ws-listener')) {{
-                        el.setAttribute('data-ws-listener', 'true');
-                        el.addEventListener('sl-change', function(e) {{
-                            window.sendAction('{cid}', el.value);
-                        }});
-                    }}
-                }})();
-                </script>
-                '''
+                listener_script = _ws_listener(cid, "sl-change", debounce_ms, throttle_ms)
             
             props_str = ' '.join(f'{k}="{v}"' for k, v in props.items() if v is not None and v is not False)
             escaped_cv = html_lib.escape(str(cv), quote=True)
@@ -792,5 +843,5 @@ class InputWidgetsMixin:
             _fc = merge_cls(_wd.get("cls", ""), cls)
             _fs = merge_style(_wd.get("style", ""), style)
             return Component(None, id=cid, content=wrap_html(html, _fc, _fs))
-        self._register_component(cid, builder, action=action)
+        self._register_component(cid, builder, action=action, latest_wins=on_change is None)
         return s
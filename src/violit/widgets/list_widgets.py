@@ -1,9 +1,9 @@
 """List widgets for reactive list management"""
 
 from typing import Callable, Any, List as ListType
-from ..component import Component
+from ..component import Component, PatchComponent
 from ..context import rendering_ctx
-from ..state import State
+from ..state import State, CollectionState
 from ..style_utils import merge_cls, merge_style
 
 
@@ -29,11 +29,28 @@ class ListWidgetsMixin:
         else:
             list_state = self.state(items or [], key=state_key)
         
+        # ListState/DictState items are wrapped one element per item so
+        # recorded structural ops can address them by position.
+        wrap_items = isinstance(list_state, CollectionState)
+        
+        def render_one(item, idx=None):
+            item_html = render_item(item) if render_item else f'<div style="padding: 0.5rem;">{item}</div>'
+            if wrap_items:
+                return f'<div class="list-item" style="display:contents">{item_html}</div>'
+            return item_html
+        
         def builder():
+            patch_ops = self._take_patch_ops(cid, list_state)
             token = rendering_ctx.set(cid)
             current_items = list_state.value
             rendering_ctx.reset(token)
             
+            # Structural patch: send only inserted/removed/updated items
+            if patch_ops is not None:
+                dom_ops = self._patch_ops(patch_ops, len(current_items), render_one, reverse=reverse)
+                if dom_ops is not None:
+                    return PatchComponent(cid, dom_ops, target=container_id)
+            
             if not current_items:
                 if empty_message:
                     content = f'<div style="text-align: center; padding: 2rem; color: var(--sl-text-muted);">{empty_message}</div>'
@@ -41,15 +58,7 @@ class ListWidgetsMixin:
                     content = ''
             else:
                 items_to_render = list(reversed(current_items)) if reverse else current_items
-                
-                if render_item:
-                    rendered_items = []
-                    for item in items_to_render:
-                        item_html = render_item(item)
-                        rendered_items.append(item_html)
-                    content = ''.join(rendered_items)
-                else:
-                    content = ''.join([f'<div style="padding: 0.5rem;">{item}</div>' for item in items_to_render])
+                content = ''.join(render_one(item) for item in items_to_render)
             
             html = f'''
             <div id="{container_id}" style="display: flex; flex-direction: column; gap: {item_gap}; width: 100%;">
@@ -0,0 +1,83 @@
+"""WebSocket wire formats.
+
+The client offers the formats it can speak as WebSocket subprotocols
+(``violit.msgpack``, ``violit.json``) and the server accepts the first one it
+supports. msgpack frames are binary and need the optional ``msgpack`` package
+(``pip install violit[msgpack]``); without it, or with clients that offer no
+subprotocol, messages are JSON text frames as before.
+
+Compression is not done here: uvicorn negotiates permessage-deflate for the
+whole socket (see ``App(ws_compression=...)``).
+"""
+import json
+from typing import Any, Iterable, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+SUBPROTOCOL_PREFIX = "violit."
+
+
+class JsonCodec:
+    name = "json"
+    binary = False
+
+    @staticmethod
+    def encode(message: Any) -> str:
+        # Same encoding as Starlette's send_json
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def decode(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    binary = True
+
+    @staticmethod
+    def encode(message: Any) -> bytes:
+        return msgpack.packb(message, use_bin_type=True)
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+JSON = JsonCodec()
+CODECS = {JSON.name: JSON}
+if msgpack is not None:
+    CODECS[MsgpackCodec.name] = MsgpackCodec()
+
+
+def available_formats() -> list:
+    """Formats this server can speak, preferred first."""
+    return [name for name in ("msgpack", "json") if name in CODECS]
+
+
+def negotiate(subprotocols: Iterable[str]) -> tuple:
+    """Pick the codec for a connection from the client's offered subprotocols.
+
+    Returns (codec, subprotocol to accept or None).
+    """
+    for proto in subprotocols:
+        if proto.startswith(SUBPROTOCOL_PREFIX):
+            codec = CODECS.get(proto[len(SUBPROTOCOL_PREFIX):])
+            if codec is not None:
+                return codec, proto
+    return JSON, None
+
+
+def decode_frame(codec, message: dict) -> Optional[Any]:
+    """Decode an ASGI ``websocket.receive`` message with ``codec``.
+
+    Text frames are always JSON, so a client may fall back at any time.
+    """
+    if message.get("bytes") is not None:
+        return codec.decode(message["bytes"])
+    if message.get("text") is not None:
+        return JSON.decode(message["text"])
+    return None
@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+from violit.state import GLOBAL_STORE
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions():
+    """Sessions of one test's app must not leak into the next."""
+    GLOBAL_STORE.stores.clear()
+    yield
+    GLOBAL_STORE.stores.clear()
+
+
+class Page:
+    """What a test needs from a rendered page: its HTML, CSRF token and the
+    ids of its buttons, in order."""
+
+    def __init__(self, html: str):
+        self.html = html
+        self.token = re.search(r'window._csrf_token = "([^"]+)"', html).group(1)
+        self.buttons = re.findall(r"sendAction\('(btn_\d+)'\)", html)
+
+    def click(self, ws, index: int = 0, value=None):
+        ws.send_json({"type": "click", "id": self.buttons[index], "value": value,
+                      "_csrf_token": self.token})
+
+
+@pytest.fixture
+def load_page():
+    return lambda client: Page(client.get("/").text)
@@ -0,0 +1,57 @@
+import asyncio
+import re
+
+from starlette.testclient import TestClient
+
+import violit as vl
+
+
+def test_async_reactivity_update_targets_the_wrapper(load_page):
+    app = vl.App(mode="ws")
+    count = app.state(0, key="count")
+
+    @app.reactivity
+    async def block():
+        await asyncio.sleep(0)
+        app.text(f"count {count.value}")
+    block()
+    app.button("inc", on_click=lambda: count.set(count.value + 1))
+
+    client = TestClient(app.fastapi)
+    page = load_page(client)
+    assert 'id="reactivity_0_wrapper"' in page.html
+    with client.websocket_connect("/ws") as ws:
+        page.click(ws)
+        message = ws.receive_json()
+    (update,) = message["payload"]
+    # The same id as a sync reactivity block, which is what the page holds
+    assert update["id"] == "reactivity_0_wrapper"
+    if "html" in update:
+        assert update["html"].startswith('<div id="reactivity_0_wrapper"')
+    assert "count 1" in str(update)
+
+
+def test_queued_input_values_all_reach_on_change(load_page):
+    app = vl.App(mode="ws")
+    calls = []
+
+    async def changed(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)  # let the next values queue up meanwhile
+    app.slider("s", 0, 100, on_change=changed)
+    coalesced = app.slider("t", 0, 100)
+    app.text(lambda: f"t={coalesced.value}")
+
+    client = TestClient(app.fastapi)
+    page = load_page(client)
+    with_callback, without = re.findall(r'<sl-range id="(slider_\d+)"', page.html)
+    with client.websocket_connect("/ws") as ws:
+        for cid in (with_callback, without):
+            for value in range(1, 21):
+                ws.send_json({"type": "click", "id": cid, "value": value, "_csrf_token": page.token})
+        for _ in range(40):
+            if "t=20" in str(ws.receive_json()):
+                break
+    assert calls == list(range(1, 21))
+    # Without on_change, queued values are skipped for the latest
+    assert app.ws_engine.stats['coalesced_clicks'] > 0
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+from violit.component import Component
+from violit.engine import WsEngine
+
+
+class SlowSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.messages = []
+        self.closed = None
+
+    async def send_text(self, data):
+        await asyncio.sleep(self.delay)
+        self.messages.append(json.loads(data))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+def shown(socket):
+    """Component id -> the HTML the client ends up with."""
+    html = {}
+    for message in socket.messages:
+        for item in message.get("payload", []):
+            html[item["id"]] = item["html"]
+    return html
+
+
+def test_burst_of_updates_to_many_components_keeps_the_connection():
+    async def scenario():
+        engine = WsEngine()
+        engine.max_pending = 10
+        current = {}
+
+        async def rerender(sid, cids):
+            return [Component("p", id=cid, content=current[cid]) for cid in cids]
+        engine.rerender = rerender
+        socket = SlowSocket(0.05)
+        engine.connect("s", socket)
+        for round_ in range(3):
+            for i in range(30):
+                cid = f"c{i}"
+                current[cid] = f"{cid} v{round_}"
+                await engine.push_updates("s", [Component("p", id=cid, content=current[cid])])
+            await engine.push_eval("s", f"round({round_})")
+        await asyncio.sleep(0.5)
+        engine.disconnect("s")
+        return engine, socket, current
+
+    engine, socket, current = asyncio.run(scenario())
+    assert socket.closed is None
+    assert engine.stats['overflows'] == 0
+    assert [m["code"] for m in socket.messages if m["type"] == "eval"] == ["round(0)", "round(1)", "round(2)"]
+    assert shown(socket) == {cid: f'<p id="{cid}" >{text}</p>' for cid, text in current.items()}
+
+
+def test_queue_of_scripts_past_the_limit_closes_the_connection():
+    async def scenario():
+        engine = WsEngine()
+        engine.max_pending = 10
+
+        async def rerender(sid, cids):
+            return []
+        engine.rerender = rerender
+        socket = SlowSocket(0.2)
+        engine.connect("s", socket)
+        await engine.push_eval("s", "first()")
+        await asyncio.sleep(0.01)
+        for i in range(20):
+            await engine.push_eval("s", f"script({i})")
+        await asyncio.sleep(0.3)
+        return engine, socket
+
+    engine, socket = asyncio.run(scenario())
+    assert socket.closed == 1013
+    assert engine.stats['overflows'] == 1
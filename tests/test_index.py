@@ -0,0 +1,53 @@
+import asyncio
+
+import violit as vl
+
+
+def body_chunks(app):
+    """The body messages of a GET / through the ASGI app, as sent."""
+    chunks = []
+
+    async def scenario():
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                 "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/",
+                 "root_path": "", "query_string": b"", "headers": [(b"host", b"test")],
+                 "client": ("test", 1), "server": ("test", 80)}
+
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()  # the client never disconnects
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                chunks.append(message["body"].decode())
+        await app.fastapi(scope, receive, send)
+    asyncio.run(scenario())
+    return chunks
+
+
+def test_streamed_index_sends_main_components_one_by_one():
+    app = vl.App(stream_index=True)
+    for i in range(3):
+        app.text(f"item {i}")
+    app.sidebar.text("in the sidebar")
+
+    chunks = body_chunks(app)
+    assert "</head>" in chunks[0] and "item 0" not in chunks[0]
+    # Each after the built-in updater components, in its own chunk
+    assert [f"item {i}" in chunk for i, chunk in enumerate(chunks[-5:-2])] == [True] * 3
+    sidebar = chunks[-2]
+    assert sidebar.startswith('<template id="violit-sidebar">') and "in the sidebar" in sidebar
+    page = "".join(chunks)
+    assert page.count("in the sidebar") == 1 and page.rstrip().endswith("</html>")
+
+
+def test_streamed_index_without_sidebar_keeps_it_hidden():
+    app = vl.App(stream_index=True)
+    app.text("only main")
+
+    page = "".join(body_chunks(app))
+    assert '<div id="sidebar" style="display: none;">' in page
+    assert "violit-sidebar" not in page
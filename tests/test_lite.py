@@ -0,0 +1,27 @@
+import re
+
+from starlette.testclient import TestClient
+
+import violit as vl
+
+
+def test_swaps_are_skipped_per_tab_not_per_session():
+    app = vl.App(mode="lite")
+    n = app.state(0, key="n")
+    app.text(lambda: f"n={n.value}")
+    app.button("one", on_click=lambda: n.set(1))
+    client = TestClient(app.fastapi)
+
+    def load():
+        html = client.get("/").text
+        data = {"_csrf_token": re.search(r'window._csrf_token = "([^"]+)"', html).group(1),
+                "_tab": re.search(r'window._tab_id = "([^"]+)"', html).group(1)}
+        button = re.search(r'hx-post="/action/(btn_\d+)"', html).group(1)
+        return lambda: client.post(f"/action/{button}", data=data).text
+
+    click_a, click_b = load(), load()
+    assert "n=1" in click_a()
+    # Tab B still shows n=0: the same HTML must be swapped into it too
+    assert "n=1" in click_b()
+    # ... but not again into a tab that already shows it
+    assert "n=1" not in click_b()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import re
+import threading
+
+import httpx
+
+import violit as vl
+from violit.sessions import SessionCache
+
+
+def test_page_render_waits_for_a_running_threadpool_action():
+    app = vl.App(mode="lite", action_policy="threadpool")
+    n = app.state(0, key="n")
+    started, release = threading.Event(), threading.Event()
+
+    def slow_action():
+        started.set()
+        release.wait(5)
+        n.set(1)
+    app.text(lambda: f"n={n.value}")
+    app.button("go", on_click=slow_action)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app.fastapi)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            html = (await client.get("/")).text
+            token = re.search(r'window._csrf_token = "([^"]+)"', html).group(1)
+            button = re.search(r'hx-post="/action/(btn_\d+)"', html).group(1)
+            action = asyncio.create_task(client.post(f"/action/{button}", data={"_csrf_token": token}))
+            assert await asyncio.to_thread(started.wait, 5)
+            # A reload of the same session while the action runs off the loop
+            reload = asyncio.create_task(client.get("/"))
+            await asyncio.sleep(0.2)
+            assert not reload.done()
+            release.set()
+            await action
+            return (await reload).text
+
+    assert "n=1" in asyncio.run(scenario())
+
+
+def test_reconfiguring_the_spill_file_keeps_spilled_sessions(tmp_path):
+    cache = SessionCache(max_sessions=1)
+    cache._spill("s1", {"a": 1})
+    temporary = cache._spill_dir
+    cache.configure(max_sessions=1, spill=str(tmp_path / "spill.db"))
+    assert not os.path.exists(temporary)
+    states = {}
+    assert cache.restore("s1", states)
+    assert states == {"a": 1}
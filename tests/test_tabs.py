@@ -0,0 +1,49 @@
+import re
+
+from starlette.testclient import TestClient
+
+import violit as vl
+from violit.state import GLOBAL_STORE
+
+
+def build_app():
+    app = vl.App(mode="ws")
+    n = app.state(0, key="n")
+
+    def home():
+        app.text(lambda: f"n={n.value}")
+        app.button("inc", on_click=lambda: n.set(n.value + 1))
+    app.navigation([vl.Page(home, title="Home")])
+    return app
+
+
+def test_reloads_replace_the_previous_page_components(load_page):
+    client = TestClient(build_app().fastapi)
+    for _ in range(3):
+        page = load_page(client)
+        with client.websocket_connect("/ws") as ws:
+            page.click(ws, -1)
+            ws.receive_json()
+    store = GLOBAL_STORE.get(client.cookies["ss_sid"])
+    # Only the last load's text and button
+    assert len(store['builders']) == 2
+    assert len(store['tracker'].get_dirty_components("n")) == 1
+
+
+def test_open_tab_gets_the_page_another_tab_reloaded(load_page):
+    client = TestClient(build_app().fastapi)
+    page_a = load_page(client)
+    with client.websocket_connect("/ws") as tab_a:
+        page_a.click(tab_a, -1)
+        tab_a.receive_json()
+        page_b = load_page(client)  # re-runs the page with new component ids
+        message = tab_a.receive_json()
+        (update,) = message["payload"]
+        assert update["id"].startswith("page_renderer")
+        new_text = re.search(r'id="(text_\d+)"', page_b.html).group(1)
+        assert new_text in str(update)
+        with client.websocket_connect("/ws") as tab_b:
+            page_b.click(tab_b, -1)
+            ids_a = [p["id"] for p in tab_a.receive_json()["payload"]]
+            ids_b = [p["id"] for p in tab_b.receive_json()["payload"]]
+    assert ids_a == ids_b == [new_text]